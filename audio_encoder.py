@@ -0,0 +1,134 @@
+import os
+import wave
+import queue
+import logging
+import time
+import threading
+import subprocess
+
+# Defaults for audio_output in recording_config.json. directory_codecs maps an output
+# directory to its codec, e.g. lossless locally and Opus for the Google Drive mount.
+DEFAULT_AUDIO_OUTPUT = {
+    'codec': 'wav',                 # wav, flac or opus
+    'directory_codecs': {},
+    'flac_compression_level': 5,
+    'opus_bitrate': '48k',
+    'queue_blocks': 1024,           # Capture blocks buffered per writer before blocks are dropped
+}
+
+EXTENSIONS = {
+    'wav': 'wav',
+    'flac': 'flac',
+    'opus': 'opus',
+}
+
+
+def audio_output_settings(config):
+    settings = dict(DEFAULT_AUDIO_OUTPUT)
+    settings.update(config.get('audio_output', {}))
+    return settings
+
+
+def codec_for_directory(settings, output_dir):
+    directory_codecs = {os.path.abspath(path): codec for path, codec in settings['directory_codecs'].items()}
+    codec = directory_codecs.get(os.path.abspath(output_dir), settings['codec'])
+    if codec not in EXTENSIONS:
+        raise ValueError(f"Unsupported audio codec for {output_dir}: {codec}")
+    return codec
+
+
+def audio_path(base_path, codec):
+    return f"{base_path}.{EXTENSIONS[codec]}"
+
+
+def ffmpeg_encode_command(codec, samplerate, channels, output_path, settings):
+    command = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        "-f", "s16le", "-ar", str(samplerate), "-ac", str(channels), "-i", "pipe:0",
+    ]
+    if codec == 'flac':
+        command += ["-c:a", "flac", "-compression_level", str(settings['flac_compression_level'])]
+    else:
+        # libopus only takes 8/12/16/24/48 kHz input
+        command += ["-c:a", "libopus", "-b:a", settings['opus_bitrate'], "-application", "voip", "-ar", "48000"]
+    return command + [output_path]
+
+
+class StreamingAudioWriter:
+    # Takes int16 capture blocks from the audio callback and encodes them on a background thread
+    def __init__(self, base_path, codec, samplerate, channels, settings=None, metrics=None):
+        self.settings = settings or dict(DEFAULT_AUDIO_OUTPUT)
+        self.codec = codec
+        self.path = audio_path(base_path, codec)
+        self.queue = queue.Queue(maxsize=self.settings['queue_blocks'])
+        self.dropped_blocks = 0
+        self.frames_written = 0
+        self.error = None
+        self.closed = False
+        self.metrics = metrics  # Optional capture_metrics stream
+        if metrics is not None:
+            metrics.set_gauge('queue_depth', self.queue.qsize)
+            metrics.set_gauge('queue_capacity', self.queue.maxsize)
+        if codec == 'wav':
+            self.sink = wave.open(self.path, 'wb')
+            self.sink.setnchannels(channels)
+            self.sink.setsampwidth(2)  # 16-bit
+            self.sink.setframerate(samplerate)
+            self.process = None
+        else:
+            self.process = subprocess.Popen(ffmpeg_encode_command(codec, samplerate, channels, self.path, self.settings), stdin=subprocess.PIPE)
+            self.sink = None
+        self.thread = threading.Thread(target=self._run, name=f"audio-writer-{codec}", daemon=True)
+        self.thread.start()
+        logging.info(f"Streaming {codec} audio to {self.path}")
+
+    def write(self, block):
+        # Called from the capture callback; never blocks it
+        try:
+            self.queue.put_nowait(block)
+        except queue.Full:
+            self.dropped_blocks += 1
+            if self.metrics is not None:
+                self.metrics.increment('blocks_dropped')
+
+    def _run(self):
+        while True:
+            block = self.queue.get()
+            if block is None:
+                return
+            if self.error:
+                continue
+            try:
+                started = time.perf_counter()
+                data = block.tobytes()
+                if self.process is None:
+                    self.sink.writeframes(data)
+                else:
+                    self.process.stdin.write(data)
+                self.frames_written += len(block)
+                if self.metrics is not None:
+                    self.metrics.observe('write_latency', time.perf_counter() - started)
+                    self.metrics.increment('frames_written', len(block))
+            except Exception as e:
+                self.error = e
+                logging.error(f"Audio writer for {self.path} failed: {e}")
+
+    def close(self):
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join()
+        if self.process is None:
+            self.sink.close()
+        else:
+            try:
+                self.process.stdin.close()
+            except BrokenPipeError:
+                pass
+            if self.process.wait() != 0:
+                self.error = self.error or RuntimeError(f"ffmpeg exited with {self.process.returncode}")
+        if self.dropped_blocks:
+            logging.warning(f"Audio writer for {self.path} dropped {self.dropped_blocks} blocks")
+        if self.error:
+            raise RuntimeError(f"Failed to write {self.path}: {self.error}")
+        logging.info(f"Audio saved to: {self.path} ({self.frames_written} frames)")
+        return self.path
@@ -0,0 +1,63 @@
+import logging
+import numpy as np
+
+# Defaults for audio_only_recording.processing in recording_config.json.
+# The ReSpeaker 4 Mic Array (6 channel firmware) delivers channel 0 as the on-board processed
+# signal, channels 1-4 as the raw microphones and channel 5 as playback.
+DEFAULT_PROCESSING = {
+    'channels': None,   # Indices to keep; None keeps every channel the device delivers
+    'mix': 'none',      # none, mean or delay_and_sum
+    'delays': None,     # Per selected channel delay in samples for delay_and_sum
+}
+
+MIX_MODES = ('none', 'mean', 'delay_and_sum')
+
+
+def processing_settings(config):
+    settings = dict(DEFAULT_PROCESSING)
+    settings.update(config.get('audio_only_recording', {}).get('processing', {}))
+    if settings['mix'] not in MIX_MODES:
+        raise ValueError(f"Unsupported audio mix mode: {settings['mix']}")
+    return settings
+
+
+class ChannelProcessor:
+    # Applied to every capture block: select channels, then optionally mix them down to mono
+    def __init__(self, input_channels, settings=None):
+        settings = settings or dict(DEFAULT_PROCESSING)
+        self.selection = list(settings['channels']) if settings['channels'] is not None else list(range(input_channels))
+        invalid = [channel for channel in self.selection if not 0 <= channel < input_channels]
+        if invalid:
+            raise ValueError(f"Channels {invalid} not available on a {input_channels} channel device")
+        self.mix = settings['mix']
+        self.output_channels = len(self.selection) if self.mix == 'none' else 1
+
+        self.delays = None
+        self.history = None
+        if self.mix == 'delay_and_sum':
+            delays = settings['delays'] or [0] * len(self.selection)
+            if len(delays) != len(self.selection):
+                raise ValueError("delay_and_sum needs one delay per selected channel")
+            self.delays = np.asarray(delays, dtype=np.int64)
+            if (self.delays < 0).any():
+                raise ValueError("delay_and_sum delays must be non-negative sample counts")
+            # Carried between blocks so delayed samples line up across block boundaries
+            self.history = np.zeros((int(self.delays.max()), len(self.selection)), dtype=np.int16)
+        logging.info(f"Audio processing: channels {self.selection} of {input_channels}, mix={self.mix}, output channels={self.output_channels}")
+
+    def process(self, block):
+        selected = block[:, self.selection]
+        if self.mix == 'none':
+            return np.ascontiguousarray(selected)
+        if self.mix == 'mean':
+            return selected.mean(axis=1, dtype=np.float32).round().astype(np.int16)[:, None]
+
+        frames = selected.shape[0]
+        buffered = np.concatenate([self.history, selected], axis=0)
+        history_len = self.history.shape[0]
+        # Row index per output sample and channel: sample n of channel k is taken from n - delay_k
+        rows = (history_len - self.delays)[None, :] + np.arange(frames)[:, None]
+        aligned = buffered[rows, np.arange(len(self.selection))[None, :]]
+        if history_len:
+            self.history = buffered[-history_len:]
+        return aligned.mean(axis=1, dtype=np.float32).round().astype(np.int16)[:, None]
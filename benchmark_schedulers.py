@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import resource
+import tempfile
+import importlib
+import subprocess
+from datetime import date, timedelta
+from generate_synthetic_exports import generate_exports
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+BENCHMARK_STORE = {'scheduler': {'job_store': {'path': './jobs/benchmark.sqlite'}}}
+
+SCHEDULERS = {
+    'recording': 'ubuntu_create_local_singular_recording',
+    'screen': 'screen_capture_scheduler',
+    'unified': 'capture_scheduler',
+}
+
+
+def time_restart(name):
+    # A daemon restart against the store just written: load the stored jobs and resume them.
+    # The export scan runs on a background thread after that, so it is not part of this time.
+    from job_store import create_scheduler
+    start = time.perf_counter()
+    scheduler = create_scheduler(BENCHMARK_STORE, f"benchmark_{name}")
+    scheduler.start(paused=True)
+    scheduler.get_jobs()
+    scheduler.resume()
+    elapsed = time.perf_counter() - start
+    scheduler.shutdown(wait=False)
+    return round(elapsed, 4)
+
+
+def run_child(name, event_limit, job_store, log_level, result_file):
+    # Runs inside a fresh interpreter whose cwd holds media/exports, so import and scan are cold
+    start = time.perf_counter()
+    module = importlib.import_module(SCHEDULERS[name])
+    imported = time.perf_counter()
+    logging.getLogger().setLevel(log_level)
+    module.CONFIG['EVENT_LIMIT'] = event_limit
+
+    if job_store == 'sqlite':
+        from job_store import create_scheduler
+        scheduler = create_scheduler(BENCHMARK_STORE, f"benchmark_{name}")
+    else:
+        from apscheduler.schedulers.background import BackgroundScheduler
+        scheduler = BackgroundScheduler()
+    # Jobs added before start() stay pending, so the job store write is timed on its own
+    module.schedule_events(scheduler)
+    scheduled = time.perf_counter()
+    scheduler.start(paused=True)
+    stored = time.perf_counter()
+    # Counted from the store, where a replaced duplicate is one job
+    count = len(scheduler.get_jobs())
+    scheduler.shutdown(wait=False)
+    restart_s = time_restart(name) if job_store == 'sqlite' else None
+
+    schedule_time = stored - imported
+    result = {
+        'scheduler': name,
+        'jobs': count,
+        'import_s': round(imported - start, 4),
+        'schedule_s': round(schedule_time, 4),
+        'store_s': round(stored - scheduled, 4),
+        'cold_start_s': round(stored - start, 4),
+        'restart_s': restart_s,
+        'jobs_per_s': round(count / schedule_time, 1) if schedule_time > 0 else None,
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+    with open(result_file, 'w') as f:
+        json.dump(result, f)
+
+
+def benchmark(name, workdir, event_limit, job_store, log_level):
+    result_file = os.path.join(workdir, f"result_{name}.json")
+    jobs_db = os.path.join(workdir, 'jobs', 'benchmark.sqlite')
+    if os.path.exists(jobs_db):
+        os.remove(jobs_db)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SCRIPT_DIR, os.environ.get('PYTHONPATH')])))
+    command = [sys.executable, os.path.abspath(__file__), "--child", name,
+               "--event-limit", str(event_limit), "--job-store", job_store,
+               "--log-level", log_level, "--result-file", result_file]
+    subprocess.run(command, cwd=workdir, env=env, check=True, stdout=subprocess.DEVNULL)
+    with open(result_file, 'r') as f:
+        return json.load(f)
+
+
+def print_results(results):
+    columns = ['scheduler', 'jobs', 'cold_start_s', 'import_s', 'schedule_s', 'store_s', 'restart_s', 'jobs_per_s', 'peak_rss_mb']
+    print(" ".join(f"{column:>13}" for column in columns))
+    for result in results:
+        print(" ".join(f"{str(result[column]):>13}" for column in columns))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark load_events()/schedule_events() against synthetic exports")
+    parser.add_argument("--events", type=int, default=10000, help="Synthetic events to generate (ignored with --exports)")
+    parser.add_argument("--days", type=int, default=90, help="Days to spread synthetic events across")
+    parser.add_argument("--exports", help="Benchmark an existing media/exports tree instead of generating one")
+    parser.add_argument("--schedulers", nargs="+", choices=list(SCHEDULERS), default=list(SCHEDULERS))
+    parser.add_argument("--event-limit", type=int, help="EVENT_LIMIT for the run, defaults to scheduling everything")
+    parser.add_argument("--job-store", choices=['memory', 'sqlite'], default='memory')
+    parser.add_argument("--log-level", default='DEBUG', help="Root log level after import; DEBUG matches production")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated work directory")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--child", choices=list(SCHEDULERS), help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.event_limit, args.job_store, args.log_level, args.result_file)
+        sys.exit(0)
+
+    workdir = tempfile.mkdtemp(prefix="scheduler_benchmark_")
+    export_dir = os.path.join(workdir, 'media', 'exports')
+    try:
+        if args.exports:
+            os.makedirs(os.path.dirname(export_dir))
+            os.symlink(os.path.abspath(args.exports), export_dir)
+            event_limit = args.event_limit or sys.maxsize
+        else:
+            generate_start = time.perf_counter()
+            generate_exports(export_dir, args.events, date.today() + timedelta(days=1), args.days, args.seed)
+            print(f"Generated {args.events} events in {time.perf_counter() - generate_start:.1f}s", file=sys.stderr)
+            event_limit = args.event_limit or args.events
+
+        results = []
+        for name in args.schedulers:
+            print(f"Benchmarking {name} scheduler...", file=sys.stderr)
+            results.append(benchmark(name, workdir, event_limit, args.job_store, args.log_level))
+
+        if args.json:
+            print(json.dumps(results, indent=2))
+        else:
+            print_results(results)
+    finally:
+        if args.keep:
+            print(f"Work directory kept at {workdir}", file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
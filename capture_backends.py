@@ -0,0 +1,216 @@
+import os
+import time
+import logging
+import threading
+import numpy as np
+from periodic_ticker import PeriodicTicker
+
+# Backends mirror the slices of the cv2.VideoCapture, sounddevice and pyautogui APIs the recorders use,
+# so the device backends are the libraries themselves and the synthetic ones are drop-in stand-ins.
+# Select with capture_backend.type in recording_config.json or CAPTURE_BACKEND=synthetic in the environment.
+DEFAULT_SYNTHETIC = {
+    'width': 1920,
+    'height': 1080,
+    'fps': 30,
+    'audio_source': 'tone',  # tone or noise
+    'tone_hz': 440.0,
+    'samplerate': 48000,
+    'channels': 6,           # Matches the ReSpeaker 4 Mic Array firmware
+    'screen_width': 1920,
+    'screen_height': 1080,
+    'realtime': True,        # Pace reads like real hardware; False runs as fast as the pipeline allows
+}
+
+# Same values as cv2.CAP_PROP_FRAME_WIDTH, CAP_PROP_FRAME_HEIGHT and CAP_PROP_FPS
+CAP_PROP_FRAME_WIDTH = 3
+CAP_PROP_FRAME_HEIGHT = 4
+CAP_PROP_FPS = 5
+
+
+def backend_type(config):
+    return os.environ.get('CAPTURE_BACKEND') or config.get('capture_backend', {}).get('type', 'device')
+
+
+def synthetic_settings(config):
+    settings = dict(DEFAULT_SYNTHETIC)
+    settings.update(config.get('capture_backend', {}).get('synthetic', {}))
+    return settings
+
+
+class Pacer:
+    # Synthetic sources run at their nominal rate; a late frame is followed by catch-up frames
+    # like a real device draining its buffer, so no ticks are skipped
+    def __init__(self, rate, realtime=True):
+        self.realtime = realtime
+        self.ticker = PeriodicTicker(1.0 / rate, skip_missed=False)
+
+    def wait(self):
+        if self.realtime:
+            self.ticker.wait()
+
+
+class SyntheticCamera:
+    def __init__(self, width, height, fps, realtime=True):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frame_index = 0
+        self.opened = True
+        self.pacer = Pacer(fps, realtime)
+        # One precomputed gradient, scrolled per frame, keeps generation cost far below a real encode
+        x = np.linspace(0, 255, width, dtype=np.uint8)
+        y = np.linspace(0, 255, height, dtype=np.uint8)
+        self.base = np.stack([np.broadcast_to(x, (height, width)),
+                              np.broadcast_to(y[:, None], (height, width)),
+                              np.full((height, width), 128, dtype=np.uint8)], axis=2).copy()
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self):
+        if not self.opened:
+            return False, None
+        self.pacer.wait()
+        frame = np.roll(self.base, self.frame_index * 8, axis=1)
+        # Frame counter as a white bar so dropped frames are visible in the output
+        bar = min(self.width, (self.frame_index % self.fps + 1) * self.width // self.fps)
+        frame[:16, :bar] = 255
+        self.frame_index += 1
+        return True, frame
+
+    def get(self, prop):
+        return {CAP_PROP_FRAME_WIDTH: self.width, CAP_PROP_FRAME_HEIGHT: self.height, CAP_PROP_FPS: self.fps}.get(prop, 0)
+
+    def release(self):
+        self.opened = False
+
+
+class SyntheticInputStream:
+    def __init__(self, source, samplerate, channels, callback, blocksize=None, dtype='float32'):
+        self.source = source
+        self.samplerate = samplerate
+        self.channels = channels
+        self.callback = callback
+        self.blocksize = blocksize or max(1, samplerate // 100)
+        self.dtype = dtype
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def _run(self):
+        pacer = Pacer(self.samplerate / self.blocksize, self.source.realtime)
+        while not self.stop_event.is_set():
+            pacer.wait()
+            block = self.source.generate(self.blocksize, self.channels, self.dtype)
+            self.callback(block, self.blocksize, None, None)
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="synthetic-audio", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+    close = stop
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+class SyntheticAudio:
+    # Tone or noise source exposing the sounddevice calls the recorders make
+    def __init__(self, source='tone', tone_hz=440.0, samplerate=48000, channels=6, realtime=True):
+        self.source = source
+        self.tone_hz = tone_hz
+        self.samplerate = samplerate
+        self.channels = channels
+        self.realtime = realtime
+        self.position = 0
+        self.rng = np.random.default_rng(0)
+        self.rec_deadline = None
+
+    def query_devices(self, device=None, kind=None):
+        return {'name': f"Synthetic {self.source} source", 'default_samplerate': float(self.samplerate), 'max_input_channels': self.channels}
+
+    def generate(self, frames, channels, dtype='float32'):
+        if self.source == 'noise':
+            block = self.rng.normal(0, 0.1, (frames, channels))
+        else:
+            t = (np.arange(frames) + self.position) / self.samplerate
+            block = np.repeat((0.3 * np.sin(2 * np.pi * self.tone_hz * t))[:, None], channels, axis=1)
+        self.position += frames
+        if np.dtype(dtype) == np.int16:
+            return (block * 32767).astype(np.int16)
+        return block.astype(dtype)
+
+    def InputStream(self, samplerate=None, device=None, channels=1, callback=None, blocksize=None, dtype='float32', **kwargs):
+        return SyntheticInputStream(self, samplerate or self.samplerate, channels, callback, blocksize, dtype)
+
+    def rec(self, frames, samplerate=None, channels=1, dtype='float32', device=None, **kwargs):
+        if self.realtime:
+            self.rec_deadline = time.monotonic() + frames / (samplerate or self.samplerate)
+        return self.generate(frames, channels, dtype)
+
+    def wait(self):
+        if self.rec_deadline is not None:
+            time.sleep(max(0, self.rec_deadline - time.monotonic()))
+            self.rec_deadline = None
+
+    def stop(self):
+        self.rec_deadline = None
+
+
+class FakeScreenshot:
+    # Same shape as an mss screenshot, which image_encoder.to_image accepts
+    def __init__(self, size, rgb):
+        self.size = size
+        self.rgb = rgb
+
+
+class FakeScreen:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.count = 0
+        self.base = np.zeros((height, width, 3), dtype=np.uint8)
+        self.base[:, :, 2] = 96
+
+    def screenshot(self):
+        # A "cursor" block moves across the screen so consecutive frames differ
+        frame = self.base.copy()
+        x = (self.count * 32) % max(1, self.width - 64)
+        frame[self.height // 2:self.height // 2 + 64, x:x + 64] = 255
+        self.count += 1
+        return FakeScreenshot((self.width, self.height), frame.tobytes())
+
+
+def open_camera(config, device_path):
+    if backend_type(config) == 'synthetic':
+        settings = synthetic_settings(config)
+        logging.info(f"Using synthetic camera {settings['width']}x{settings['height']} @ {settings['fps']} fps")
+        return SyntheticCamera(settings['width'], settings['height'], settings['fps'], settings['realtime'])
+    import cv2
+    return cv2.VideoCapture(device_path)
+
+
+def audio_backend(config):
+    if backend_type(config) == 'synthetic':
+        settings = synthetic_settings(config)
+        logging.info(f"Using synthetic {settings['audio_source']} audio at {settings['samplerate']} Hz")
+        return SyntheticAudio(settings['audio_source'], settings['tone_hz'], settings['samplerate'], settings['channels'], settings['realtime'])
+    import sounddevice as sd
+    return sd
+
+
+def screen_backend(config):
+    if backend_type(config) == 'synthetic':
+        settings = synthetic_settings(config)
+        logging.info(f"Using fake screen {settings['screen_width']}x{settings['screen_height']}")
+        return FakeScreen(settings['screen_width'], settings['screen_height'])
+    import pyautogui
+    return pyautogui
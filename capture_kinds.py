@@ -0,0 +1,148 @@
+import os
+import abc
+import sys
+import glob
+import shlex
+import logging
+from datetime import datetime
+from display_geometry import capture_region, x11grab_input
+from audio_encoder import audio_output_settings, codec_for_directory, audio_path
+from replicator import recording_directories, enqueue_replication
+from pipeline_trace import trace_environment, env_prefix
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def tee_escape(path):
+    # Characters with a meaning in the tee muxer's slave specification
+    for char in '\\|[]:;,':
+        path = path.replace(char, '\\' + char)
+    return path
+
+
+def build_single_capture_command(screen_config, output_paths, duration):
+    display = screen_config.get('display', ':0')
+    width, height, x, y = capture_region(display, screen_config.get('monitor', 'all'))
+    output_format = screen_config.get('output_format', 'mp4')
+    # onfail=ignore keeps the local copy recording if a slower destination fails
+    tee_outputs = '|'.join(f"[f={output_format}:onfail=ignore]{tee_escape(path)}" for path in output_paths)
+    return [
+        "ffmpeg",
+        "-f", "x11grab",
+        "-framerate", str(screen_config['framerate']),
+        "-video_size", f"{width}x{height}",
+        "-i", x11grab_input(display, x, y),
+        "-t", str(duration),
+        "-c:v", "libx264",
+        "-preset", "ultrafast",
+        "-crf", "23",
+        "-map", "0:v",
+        "-f", "tee",
+        tee_outputs,
+    ]
+
+
+def latest_file(pattern):
+    matches = glob.glob(pattern)
+    return max(matches, key=os.path.getmtime) if matches else None
+
+
+class CaptureKind(abc.ABC):
+    # A capture kind knows which devices it holds, how to launch its recorder and what to do afterwards
+    name = None
+    session_prefix = None
+    devices = ()
+    released_devices = ()   # What TmuxSessionManager.release_devices() resets once the devices are free
+
+    def session_name(self, event):
+        # Keyed by event ID: two events may share a title, and starting one must not kill the other
+        return f"{self.session_prefix}_{event.event_id}"
+
+    @abc.abstractmethod
+    def command(self, event, duration, config):
+        pass
+
+    def finish(self, event, config, tmux_manager):
+        pass
+
+
+class AudioCapture(CaptureKind):
+    name = 'audio'
+    session_prefix = 'audio'
+    devices = ('mic_array',)
+    released_devices = ('audio',)
+
+    def command(self, event, duration, config):
+        script_path = os.path.join(SCRIPT_DIR, "ubuntu_create_local_singular_audio_recording.py")
+        return [sys.executable, script_path, str(duration), event.title]
+
+
+class WebcamCapture(CaptureKind):
+    name = 'webcam'
+    session_prefix = 'video'
+    devices = ('camera', 'camera_mic')
+    released_devices = ('video', 'audio')
+
+    def command(self, event, duration, config):
+        script_path = os.path.join(SCRIPT_DIR, "ubuntu_create_local_singular_video_recording.py")
+        return [sys.executable, script_path, str(duration), event.title]
+
+    def finish(self, event, config, tmux_manager):
+        date_folder = datetime.now().strftime("%Y-%m-%d")
+        output_settings = audio_output_settings(config)
+        for output_dir in recording_directories(config):
+            output_folder = os.path.join(output_dir, date_folder)
+            video_file = latest_file(os.path.join(output_folder, f"video_{glob.escape(event.title)}_*.mp4"))
+            if video_file is None:
+                logging.warning(f"No webcam recording found for '{event.title}' in {output_folder}")
+                continue
+            # The recorder names its files with the timestamp it started at
+            timestamp = os.path.basename(video_file)[len(f"video_{event.title}_"):-len(".mp4")]
+            audio_file = audio_path(os.path.join(output_folder, f"audio_{event.title}_{timestamp}"), codec_for_directory(output_settings, output_dir))
+            output_file = os.path.join(output_folder, f"combined_{event.title}_{timestamp}.mp4")
+            combine_session = tmux_manager.start_combination_process(video_file, audio_file, output_file, env_prefix(trace_environment(config, event.event_id)))
+            logging.info(f"Started combination process for {event.title} in session {combine_session}")
+
+
+class ScreenCapture(CaptureKind):
+    name = 'screen'
+    session_prefix = 'screen'
+    devices = ('display',)
+
+    def command(self, event, duration, config):
+        screen_config = config['screen_capture']
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_paths = []
+        for output_dir in recording_directories(config):
+            event_dir = os.path.join(output_dir, 'screen_captures', event.title)
+            os.makedirs(event_dir, exist_ok=True)
+            output_paths.append(os.path.join(event_dir, f"{event.title}_{timestamp}.{screen_config.get('output_format', 'mp4')}"))
+        return build_single_capture_command(screen_config, output_paths, duration)
+
+    def finish(self, event, config, tmux_manager):
+        finished = []
+        for output_dir in recording_directories(config):
+            event_dir = os.path.join(output_dir, 'screen_captures', event.title)
+            screen_file = latest_file(os.path.join(glob.escape(event_dir), f"*.{config['screen_capture'].get('output_format', 'mp4')}"))
+            if screen_file:
+                finished.append(screen_file)
+        enqueue_replication(config, finished)
+
+
+CAPTURE_KINDS = {kind.name: kind for kind in (AudioCapture(), WebcamCapture(), ScreenCapture())}
+
+
+def kinds_for_event(event, config):
+    # Events may list the capture kinds they need; otherwise the scheduler default applies
+    names = event.capture or config.get('scheduler', {}).get('capture_kinds', list(CAPTURE_KINDS))
+    kinds = []
+    for name in names:
+        if name not in CAPTURE_KINDS:
+            logging.warning(f"Unknown capture kind '{name}' for event '{event.title}', skipping")
+            continue
+        kinds.append(CAPTURE_KINDS[name])
+    return kinds
+
+
+def shell_command(argv):
+    return shlex.join(argv)
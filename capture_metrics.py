@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+from collections import deque
+from periodic_ticker import PeriodicTicker
+from replicator import write_json_atomic
+from config_service import load_config
+
+# Defaults for metrics in recording_config.json. Each recorder process rewrites one JSON file
+# every interval_s while it captures, so a run can be watched with `capture_metrics.py --watch`.
+DEFAULT_METRICS = {
+    'enabled': True,
+    'directory': './logs/metrics',
+    'interval_s': 5,
+    'latency_window': 2048,     # Most recent samples kept per latency for the percentiles
+}
+
+PERCENTILES = (50, 95, 99)
+
+
+def metrics_settings(config):
+    settings = dict(DEFAULT_METRICS)
+    settings.update(config.get('metrics', {}))
+    return settings
+
+
+class LatencyStats:
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def summary(self):
+        # Milliseconds; percentiles cover the recent window, mean and max the whole run
+        summary = {'count': self.count, 'mean_ms': round(self.total / self.count * 1000, 3) if self.count else None, 'max_ms': round(self.max * 1000, 3)}
+        ordered = sorted(self.samples)
+        for percentile in PERCENTILES:
+            value = ordered[min(len(ordered) - 1, len(ordered) * percentile // 100)] if ordered else None
+            summary[f"p{percentile}_ms"] = round(value * 1000, 3) if value is not None else None
+        return summary
+
+
+class StreamMetrics:
+    # Counters, gauges and latencies for one stream (video, an audio writer, the screen grabber).
+    # Updates are a lock and an addition so they are safe to call from capture callbacks.
+    def __init__(self, name, window):
+        self.name = name
+        self.window = window
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.latencies = {}
+
+    def increment(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_gauge(self, name, value):
+        # A callable is sampled when the metrics are published rather than on every update
+        with self.lock:
+            self.gauges[name] = value
+
+    def observe(self, name, seconds):
+        with self.lock:
+            stats = self.latencies.get(name)
+            if stats is None:
+                stats = self.latencies[name] = LatencyStats(self.window)
+            stats.add(seconds)
+
+    def timed(self, name):
+        return _Timer(self, name)
+
+    def snapshot(self):
+        with self.lock:
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+            latencies = {name: stats.summary() for name, stats in self.latencies.items()}
+        for name, value in gauges.items():
+            if callable(value):
+                try:
+                    gauges[name] = value()
+                except Exception as e:
+                    gauges[name] = None
+                    logging.debug(f"Gauge {self.name}.{name} failed: {e}")
+        return {'counters': counters, 'gauges': gauges, 'latency': latencies}
+
+
+class _Timer:
+    def __init__(self, stream, name):
+        self.stream = stream
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stream.observe(self.name, time.perf_counter() - self.start)
+
+
+class MetricsPublisher:
+    def __init__(self, path, interval, window=DEFAULT_METRICS['latency_window']):
+        self.path = path
+        self.interval = interval
+        self.window = window
+        self.streams = {}
+        self.started_at = time.time()
+        self._previous = None
+        self._ticker = PeriodicTicker(interval)
+        self._thread = None
+
+    def stream(self, name):
+        if name not in self.streams:
+            self.streams[name] = StreamMetrics(name, self.window)
+        return self.streams[name]
+
+    def snapshot(self):
+        now = time.monotonic()
+        streams = {name: stream.snapshot() for name, stream in list(self.streams.items())}
+        # Per-second rates over the last interval, e.g. frames_written gives the live fps
+        if self._previous is not None:
+            previous_at, previous = self._previous
+            elapsed = now - previous_at
+            for name, data in streams.items():
+                before = previous.get(name, {}).get('counters', {})
+                data['rates'] = {counter: round((value - before.get(counter, 0)) / elapsed, 3) for counter, value in data['counters'].items()} if elapsed > 0 else {}
+        self._previous = (now, streams)
+        return {'pid': os.getpid(), 'started_at': self.started_at, 'updated_at': time.time(), 'streams': streams}
+
+    def publish(self):
+        if self.path is None:
+            return
+        try:
+            write_json_atomic(self.path, self.snapshot())
+        except Exception as e:
+            logging.warning(f"Failed to write metrics to {self.path}: {e}")
+
+    def _run(self):
+        for _ in self._ticker:
+            self.publish()
+
+    def start(self):
+        if self.path is not None and self._thread is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name="metrics", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        # One last write so the file holds the final totals
+        self._ticker.stop()
+        if self._thread:
+            self._thread.join()
+        self.publish()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def start_metrics(config, name):
+    settings = metrics_settings(config)
+    path = os.path.join(settings['directory'], f"{name}.json") if settings['enabled'] else None
+    return MetricsPublisher(path, settings['interval_s'], settings['latency_window']).start()
+
+
+def print_metrics(path):
+    with open(path, 'r') as f:
+        data = json.load(f)
+    age = time.time() - data['updated_at']
+    print(f"{os.path.basename(path)} (pid {data['pid']}, updated {age:.0f}s ago)")
+    for name, stream in sorted(data['streams'].items()):
+        print(f"  {name}")
+        for counter, value in sorted(stream['counters'].items()):
+            rate = stream.get('rates', {}).get(counter)
+            print(f"    {counter:<24} {value:>12}" + (f"  {rate:>10.2f}/s" if rate is not None else ""))
+        for gauge, value in sorted(stream['gauges'].items()):
+            print(f"    {gauge:<24} {value!s:>12}")
+        for latency, summary in sorted(stream['latency'].items()):
+            print(f"    {latency:<24} p50 {summary['p50_ms']} ms, p95 {summary['p95_ms']} ms, p99 {summary['p99_ms']} ms, max {summary['max_ms']} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show live capture metrics written by the recorders")
+    parser.add_argument("paths", nargs="*", help="Metrics files (default: every file in metrics.directory)")
+    parser.add_argument("--watch", type=float, metavar="SECONDS", help="Refresh every SECONDS")
+    args = parser.parse_args()
+
+    while True:
+        paths = args.paths
+        if not paths:
+            directory = metrics_settings(load_config())['directory']
+            paths = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.json')) if os.path.isdir(directory) else []
+        if not paths:
+            sys.exit("No metrics files found")
+        if args.watch:
+            print("\033[2J\033[H", end="")
+        for path in paths:
+            try:
+                print_metrics(path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"{path}: {e}")
+        if not args.watch:
+            break
+        time.sleep(args.watch)
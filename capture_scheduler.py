@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import sys
+import logging
+import argparse
+import threading
+import asyncio
+import time
+import psutil
+from tmux_session_manager import TmuxSessionManager
+from capture_kinds import CAPTURE_KINDS, kinds_for_event, shell_command
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.schedulers.base import STATE_PAUSED
+from job_store import create_scheduler, start_scheduler
+from replicator import start_replicator
+from event_model import Event, local_now, sanitize_title
+from conflict_planner import plan, problem_count
+from control_socket import ControlServer, CommandError, socket_path
+from dataclasses import replace
+from datetime import timedelta
+from structured_logging import setup_logging
+from pipeline_trace import open_tracer, trace_environment, env_prefix, merge_trace
+from config_service import load_config, watch_config, ConfigError
+
+# Configuration
+CONFIG = {
+    'EVENT_LIMIT': 20,
+    'CHECK_INTERVAL': 60,
+    'MIN_DISK_SPACE': 1000000000,  # 1 GB in bytes
+    'MAX_CPU_USAGE': 90,  # 90%
+    'WAIT_BUFFER': 60,  # Seconds past the event end before sessions are killed
+    'POLL_INTERVAL': 5,
+    'KILL_TIMEOUT': 10,  # Seconds a recorder gets to exit after SIGTERM before it is killed, asyncio mode
+    'PLAN_WARNINGS': 20,  # Per device and problem type; conflict_planner.py prints the full report
+}
+
+setup_logging('capture_scheduler_log.txt')
+
+class EventIndex:
+    # One scan of the export tree shared by every capture kind
+    def __init__(self, export_dir=None):
+        self.export_dir = export_dir or os.path.abspath(os.path.join('.', 'media', 'exports'))
+        self.events = {}
+
+    def load_file(self, file_path):
+        event = Event.load(file_path)
+        self.events[event.event_id] = event
+        return event.event_id
+
+    def load(self):
+        logging.debug(f"Looking for events in directory: {self.export_dir}")
+        if not os.path.exists(self.export_dir):
+            logging.warning(f"Export directory does not exist: {self.export_dir}")
+            return 0
+
+        for root, dirs, files in os.walk(self.export_dir):
+            logging.debug(f"Scanning directory: {root}")
+            for file in files:
+                if not file.endswith('.json'):
+                    continue
+                file_path = os.path.join(root, file)
+                try:
+                    self.load_file(file_path)
+                except json.JSONDecodeError as e:
+                    logging.error(f"Error decoding JSON from {file_path}: {e}")
+                except ValueError as e:
+                    logging.error(f"Invalid event in {file_path}: {e}")
+                except Exception as e:
+                    logging.error(f"Unexpected error loading {file_path}: {e}")
+        logging.info(f"Indexed {len(self.events)} events")
+        return len(self.events)
+
+    def get(self, event_id, event_path=None):
+        # Jobs restored from the job store only carry the ID and path, so load the one file on demand
+        if event_id not in self.events and event_path and os.path.exists(event_path):
+            self.load_file(event_path)
+        return self.events.get(event_id)
+
+    def upcoming(self, now):
+        return sorted((event for event in list(self.events.values()) if event.start >= now), key=lambda event: event.start)
+
+class ResourceMonitor:
+    # System checks plus the single record of which event holds which capture device
+    def __init__(self):
+        self.device_owners = {}
+        self._lock = threading.Lock()
+
+    def check_system_resources(self):
+        disk_space = psutil.disk_usage('/').free
+        cpu_usage = psutil.cpu_percent(interval=1)
+        if disk_space < CONFIG['MIN_DISK_SPACE']:
+            logging.error(f"Low disk space: {disk_space} bytes available")
+            return False
+        if cpu_usage > CONFIG['MAX_CPU_USAGE']:
+            logging.error(f"High CPU usage: {cpu_usage}%")
+            return False
+        return True
+
+    def claim(self, event_id, devices):
+        # The newest event wins a contended device; returns the events it takes devices from
+        with self._lock:
+            preempted = {self.device_owners[device] for device in devices if self.device_owners.get(device) not in (None, event_id)}
+            for device in devices:
+                self.device_owners[device] = event_id
+            return preempted
+
+    def release(self, event_id):
+        with self._lock:
+            released = [device for device, owner in self.device_owners.items() if owner == event_id]
+            for device in released:
+                del self.device_owners[device]
+            return released
+
+event_index = EventIndex()
+resource_monitor = ResourceMonitor()
+tmux_manager = None
+active_sessions = {}  # event_id -> {kind name: session name}
+active_processes = {}  # event_id -> {kind name: asyncio child process}, asyncio mode only
+extensions = {}  # event_id -> extra seconds to record once the current sessions end
+
+def stop_event_captures(event_id):
+    extensions.pop(event_id, None)
+    for kind_name, session_name in active_sessions.pop(event_id, {}).items():
+        if tmux_manager.session_exists(session_name):
+            tmux_manager.kill_session(session_name)
+            logging.warning(f"Stopped {kind_name} session {session_name} of event {event_id}")
+    for kind_name, process in active_processes.get(event_id, {}).items():
+        if process.returncode is None:
+            process.terminate()
+            logging.warning(f"Stopped {kind_name} process {process.pid} of event {event_id}")
+            # Runs on the event loop; a child stuck on SIGTERM would keep its job waiting and its devices claimed
+            asyncio.get_running_loop().call_later(CONFIG['KILL_TIMEOUT'], kill_process, process, kind_name)
+
+def kill_process(process, kind_name):
+    if process.returncode is None:
+        process.kill()
+        logging.error(f"{kind_name} process {process.pid} did not exit after SIGTERM and was killed")
+
+async def stop_processes(processes):
+    for kind_name, process in processes.items():
+        if process.returncode is None:
+            process.terminate()
+            logging.warning(f"{kind_name} process {process.pid} exceeded max duration and was terminated.")
+    try:
+        await asyncio.wait_for(asyncio.gather(*(process.wait() for process in processes.values())), timeout=CONFIG['KILL_TIMEOUT'])
+    except asyncio.TimeoutError:
+        for kind_name, process in processes.items():
+            kill_process(process, kind_name)
+        await asyncio.gather(*(process.wait() for process in processes.values()))
+
+def prepare_event(event_id, event_path=None):
+    event = event_index.get(event_id, event_path)
+    if event is None:
+        logging.error(f"Event {event_id} is not in the event index")
+        return None
+
+    config = load_config()
+    duration = event.remaining()
+    if duration <= 0:
+        logging.warning(f"Event {event_id} already ended, skipping")
+        return None
+    logging.debug(f"Event duration calculated: {duration} seconds")
+    kinds = kinds_for_event(event, config)
+    if not kinds:
+        logging.warning(f"No capture kinds for event {event_id}")
+        return None
+
+    if not resource_monitor.check_system_resources():
+        logging.warning(f"Starting event {event_id} despite resource warnings")
+
+    devices = [device for kind in kinds for device in kind.devices]
+    preempted = resource_monitor.claim(event_id, devices)
+    for kind in kinds:
+        tmux_manager.devices_in_use.update(kind.released_devices)
+    return event, config, duration, kinds, preempted
+
+def preempt_events(event_id, preempted):
+    # Called by the job itself rather than prepare_event, which asyncio mode runs on a worker
+    # thread where the preempted event's asyncio processes must not be touched
+    for preempted_id in preempted:
+        logging.warning(f"Event {event_id} takes over devices from event {preempted_id}")
+        stop_event_captures(preempted_id)
+
+def finish_event(event, config, kinds, actual_duration, tracer):
+    logging.info(f"Completed event: {event.title}. Duration: {actual_duration:.2f}s")
+    for kind in kinds:
+        with tracer.span('finish', kind=kind.name):
+            kind.finish(event, config, tmux_manager)
+
+def release_event(event_id):
+    resource_monitor.release(event_id)
+    if not resource_monitor.device_owners:
+        tmux_manager.release_devices()
+
+def close_trace(tracer):
+    # The combine step merges again when it finishes, so its spans make it into the file too
+    if tracer.enabled:
+        tracer.close()
+        try:
+            logging.info(f"Trace for this event written to {merge_trace(tracer.trace_dir)}")
+        except OSError as e:
+            logging.warning(f"Failed to merge trace {tracer.trace_dir}: {e}")
+
+def run_event(event_id, event_path=None):
+    tracer = open_tracer(load_config(), event_id, 'scheduler')
+    try:
+        with tracer.span('prepare_event'):
+            prepared = prepare_event(event_id, event_path)
+        if prepared is None:
+            return
+        event, config, duration, kinds, preempted = prepared
+        preempt_events(event_id, preempted)
+        environment = env_prefix(trace_environment(config, event_id))
+
+        # An extend-event command while recording adds another segment after this one
+        while duration > 0:
+            sessions = {}
+            for kind in kinds:
+                session_name = kind.session_name(event)
+                with tracer.span('tmux_spawn', kind=kind.name, session=session_name):
+                    tmux_manager.kill_session(session_name)
+                    tmux_manager.create_session(session_name, environment + shell_command(kind.command(event, duration, config)))
+                sessions[kind.name] = session_name
+            active_sessions[event_id] = sessions
+            logging.info(f"Started {', '.join(sessions)} capture for event {event_id}")
+
+            # Wait for every session to finish or time out
+            recording_start_time = time.time()
+            max_wait_time = duration + CONFIG['WAIT_BUFFER']
+            with tracer.span('wait_for_sessions', seconds=duration):
+                while time.time() - recording_start_time < max_wait_time:
+                    if not any(tmux_manager.session_exists(session) for session in sessions.values()):
+                        break
+                    time.sleep(CONFIG['POLL_INTERVAL'])
+
+            for kind_name, session_name in sessions.items():
+                if tmux_manager.session_exists(session_name):
+                    tmux_manager.kill_session(session_name)
+                    logging.warning(f"{kind_name} session {session_name} exceeded max duration and was terminated.")
+            active_sessions.pop(event_id, None)
+
+            finish_event(event, config, kinds, time.time() - recording_start_time, tracer)
+            duration = extensions.pop(event_id, 0)
+
+    except Exception as e:
+        logging.error(f"Error running capture for event '{event_id}': {e}")
+        logging.debug("Exception details:", exc_info=True)
+        stop_event_captures(event_id)
+    finally:
+        release_event(event_id)
+        close_trace(tracer)
+
+async def run_event_async(event_id, event_path=None):
+    # Asyncio mode: recorders are direct child processes and the job just awaits their exit,
+    # so a running event holds no thread. Short blocking steps are pushed to worker threads.
+    tracer = open_tracer(load_config(), event_id, 'scheduler')
+    try:
+        with tracer.span('prepare_event'):
+            prepared = await asyncio.to_thread(prepare_event, event_id, event_path)
+        if prepared is None:
+            return
+        event, config, duration, kinds, preempted = prepared
+        preempt_events(event_id, preempted)
+        environment = dict(os.environ, **trace_environment(config, event_id))
+
+        while duration > 0:
+            processes = {}
+            active_processes[event_id] = processes
+            for kind in kinds:
+                with tracer.span('spawn', kind=kind.name):
+                    processes[kind.name] = await asyncio.create_subprocess_exec(*kind.command(event, duration, config), stdin=asyncio.subprocess.DEVNULL, env=environment)
+            logging.info(f"Started {', '.join(processes)} capture for event {event_id}")
+
+            recording_start_time = time.time()
+            with tracer.span('wait_for_processes', seconds=duration):
+                try:
+                    await asyncio.wait_for(asyncio.gather(*(process.wait() for process in processes.values())), timeout=duration + CONFIG['WAIT_BUFFER'])
+                except asyncio.TimeoutError:
+                    await stop_processes(processes)
+            active_processes.pop(event_id, None)
+
+            await asyncio.to_thread(finish_event, event, config, kinds, time.time() - recording_start_time, tracer)
+            duration = extensions.pop(event_id, 0)
+
+    except Exception as e:
+        logging.error(f"Error running capture for event '{event_id}': {e}")
+        logging.debug("Exception details:", exc_info=True)
+        stop_event_captures(event_id)
+        active_processes.pop(event_id, None)
+    finally:
+        await asyncio.to_thread(release_event, event_id)
+        await asyncio.to_thread(close_trace, tracer)
+
+def schedule_events(scheduler, job=run_event):
+    event_index.load()
+    scheduled_count = 0
+
+    for event in event_index.upcoming(local_now()):
+        scheduler.add_job(
+            job,
+            'date',
+            run_date=event.start,
+            args=[event.event_id, event.source_path],
+            id=event.event_id,
+            replace_existing=True
+        )
+        logging.info(f"Scheduled capture for '{event.title}' at {event.start}")
+
+        scheduled_count += 1
+        if scheduled_count >= CONFIG['EVENT_LIMIT']:
+            logging.info(f"Reached scheduled events limit of {CONFIG['EVENT_LIMIT']}")
+            break
+
+    logging.info(f"Total events scheduled: {scheduled_count}")
+    log_plan(event_index.upcoming(local_now())[:scheduled_count], load_config())
+    return scheduled_count
+
+def log_plan(events, config):
+    # Surfaces device contention at scheduling time instead of when a session gets preempted
+    report = plan(events, config)
+    for device, details in report['devices'].items():
+        for conflict in details['conflicts'][:CONFIG['PLAN_WARNINGS']]:
+            logging.warning(f"{device}: {conflict['first']} overlaps {conflict['second']} by {conflict['overlap_s']:.0f}s; the later event will take the device over")
+        for gap in details['short_gaps'][:CONFIG['PLAN_WARNINGS']]:
+            logging.warning(f"{device}: only {gap['gap_s']:.1f}s between {gap['first']} and {gap['second']}, device needs {gap['reset_s']:.1f}s")
+    logging.info(f"Scheduled events need at most {report['peak_streams']} concurrent streams, {problem_count(report)} device problem(s)")
+
+def control_handlers(scheduler, job, loop=None):
+    # Commands arrive on the control socket's threads; in asyncio mode anything touching
+    # child processes is handed to the event loop
+    def running_events():
+        return set(active_sessions) | set(active_processes)
+
+    def status():
+        return {
+            'paused': scheduler.state == STATE_PAUSED,
+            'running': sorted(running_events()),
+            'devices': dict(resource_monitor.device_owners),
+            'extensions': dict(extensions),
+            'upcoming': [{'event_id': job.id, 'run_at': job.next_run_time} for job in scheduler.get_jobs()[:CONFIG['EVENT_LIMIT']]],
+        }
+
+    def list_sessions():
+        return {
+            'tmux': tmux_manager.get_active_sessions(),
+            'sessions': active_sessions,
+            'processes': {event_id: {kind_name: process.pid for kind_name, process in processes.items()} for event_id, processes in active_processes.items()},
+        }
+
+    def start(event_id=None, title=None, minutes=None, capture=None):
+        now = local_now()
+        if event_id:
+            event = event_index.get(event_id)
+            if event is None:
+                raise CommandError(f"Unknown event {event_id}")
+            if event.end <= now:
+                raise CommandError(f"Event {event_id} already ended")
+            # Started early: record from now until the planned end
+            event = replace(event, start=min(event.start, now))
+        else:
+            if not title or not minutes or minutes <= 0:
+                raise CommandError("start needs an event_id, or a title and a positive number of minutes")
+            unknown = [name for name in capture or [] if name not in CAPTURE_KINDS]
+            if unknown:
+                raise CommandError(f"Unknown capture kinds: {', '.join(unknown)}")
+            title = sanitize_title(title)
+            event = Event(f"{title}_{now.strftime('%Y%m%d_%H%M%S')}", title, now, now + timedelta(minutes=minutes), tuple(capture) if capture else None)
+        if event.event_id in running_events():
+            raise CommandError(f"Event {event.event_id} is already recording")
+        event_index.events[event.event_id] = event
+        scheduler.add_job(job, 'date', run_date=now, args=[event.event_id, event.source_path], id=event.event_id, replace_existing=True)
+        logging.info(f"Control socket: starting {event.event_id} until {event.end}")
+        return {'event_id': event.event_id, 'end': event.end}
+
+    def stop(event_id):
+        if event_id not in running_events():
+            raise CommandError(f"Event {event_id} is not recording")
+        if loop is not None:
+            loop.call_soon_threadsafe(stop_event_captures, event_id)
+        else:
+            stop_event_captures(event_id)
+        logging.info(f"Control socket: stopping {event_id}")
+        return {'event_id': event_id}
+
+    def pause():
+        scheduler.pause()
+        logging.info("Control socket: scheduling paused")
+        return {'paused': True}
+
+    def resume():
+        scheduler.resume()
+        logging.info("Control socket: scheduling resumed")
+        return {'paused': False}
+
+    def extend_event(event_id, seconds):
+        if seconds <= 0:
+            raise CommandError("seconds must be positive")
+        event = event_index.get(event_id)
+        if event_id in running_events():
+            # The recorders were started with a fixed duration; the extension runs as a new segment
+            extensions[event_id] = extensions.get(event_id, 0) + seconds
+        elif event is None:
+            raise CommandError(f"Unknown event {event_id}")
+        if event is not None:
+            event_index.events[event_id] = replace(event, end=event.end + timedelta(seconds=seconds))
+        logging.info(f"Control socket: extended {event_id} by {seconds:.0f}s")
+        return {'event_id': event_id, 'pending_extension_s': extensions.get(event_id, 0)}
+
+    return {
+        'status': status,
+        'list-sessions': list_sessions,
+        'start': start,
+        'stop': stop,
+        'pause': pause,
+        'resume': resume,
+        'extend-event': extend_event,
+    }
+
+def start_control_server(config, scheduler, job, loop=None):
+    path = socket_path(config)
+    if not path:
+        return None
+    return ControlServer(path, control_handlers(scheduler, job, loop)).start()
+
+def main(args):
+    global tmux_manager
+    logging.info(f"Starting capture scheduler with kinds: {', '.join(CAPTURE_KINDS)}")
+    # Device and destination edits apply from the next event on
+    watch_config()
+    tmux_manager = TmuxSessionManager()
+    replicator = start_replicator(load_config())
+    scheduler = create_scheduler(load_config(), 'capture_jobs')
+    start_scheduler(scheduler, schedule_events, rescan=args.rescan)
+    control_server = start_control_server(load_config(), scheduler, run_event)
+    logging.info("Scheduler started. Waiting for events...")
+
+    try:
+        # With a control socket the daemon stays up for ad-hoc captures
+        while control_server or scheduler.get_jobs() or active_sessions:
+            time.sleep(CONFIG['CHECK_INTERVAL'])
+            logging.debug(f"Active jobs: {len(scheduler.get_jobs())}, active events: {len(active_sessions)}")
+    except (KeyboardInterrupt, SystemExit):
+        logging.info("Received exit signal. Shutting down scheduler.")
+    finally:
+        if control_server:
+            control_server.stop()
+        scheduler.shutdown()
+        for event_id in list(active_sessions):
+            stop_event_captures(event_id)
+        tmux_manager.cleanup()
+        if replicator:
+            replicator.stop()
+        logging.info("Scheduler stopped. Exiting.")
+
+async def main_async(args):
+    global tmux_manager
+    logging.info(f"Starting asyncio capture scheduler with kinds: {', '.join(CAPTURE_KINDS)}")
+    watch_config()
+    tmux_manager = TmuxSessionManager()
+    replicator = start_replicator(load_config())
+    # Separate table: stored jobs reference the coroutine, not the threaded run_event
+    scheduler = create_scheduler(load_config(), 'capture_jobs_async', scheduler_class=AsyncIOScheduler)
+    start_scheduler(scheduler, lambda scheduler: schedule_events(scheduler, job=run_event_async), rescan=args.rescan)
+    control_server = start_control_server(load_config(), scheduler, run_event_async, asyncio.get_running_loop())
+    logging.info("Scheduler started. Waiting for events...")
+
+    try:
+        while control_server or scheduler.get_jobs() or active_processes:
+            await asyncio.sleep(CONFIG['CHECK_INTERVAL'])
+            logging.debug(f"Active jobs: {len(scheduler.get_jobs())}, active events: {len(active_processes)}")
+    finally:
+        if control_server:
+            control_server.stop()
+        scheduler.shutdown(wait=False)
+        for event_id in list(active_processes):
+            stop_event_captures(event_id)
+        tmux_manager.cleanup()
+        if replicator:
+            replicator.stop()
+        logging.info("Scheduler stopped. Exiting.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Unified audio, webcam and screen capture scheduler")
+    parser.add_argument("--event-limit", type=int, help="Maximum number of events to schedule")
+    parser.add_argument("--check-interval", type=int, help="Interval to check for completed events (seconds)")
+    parser.add_argument("--rescan", action="store_true", help="Drop the stored jobs and rebuild the schedule from the export tree")
+    parser.add_argument("--asyncio", action="store_true", help="Run recordings as coroutines awaiting child processes instead of on scheduler threads")
+    args = parser.parse_args()
+
+    if args.event_limit:
+        CONFIG['EVENT_LIMIT'] = args.event_limit
+    if args.check_interval:
+        CONFIG['CHECK_INTERVAL'] = args.check_interval
+    try:
+        load_config()
+    except ConfigError as e:
+        sys.exit(str(e))
+
+    if args.asyncio:
+        try:
+            asyncio.run(main_async(args))
+        except KeyboardInterrupt:
+            logging.info("Received exit signal. Scheduler stopped.")
+    else:
+        main(args)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import struct
+import argparse
+import threading
+
+# Sidecar written next to each webcam recording: a magic header followed by fixed-size records of
+# (kind, sample count, monotonic ns). Video records are one per frame; audio records are one per
+# capture block, stamped with the time its first sample was captured.
+MAGIC = b'CAPTS\x00\x01\x00'
+RECORD = struct.Struct('<BIq')
+VIDEO = 0
+AUDIO = 1
+
+
+def timestamps_path(video_file):
+    return f"{os.path.splitext(video_file)[0]}.timestamps"
+
+
+class TimestampWriter:
+    # Shared by the capture loop and the audio callback thread
+    def __init__(self, path, samplerate):
+        self.path = path
+        self.samplerate = samplerate
+        self.file = open(path, 'wb')
+        self.file.write(MAGIC)
+        self.lock = threading.Lock()
+
+    def _write(self, kind, count, timestamp_ns):
+        with self.lock:
+            self.file.write(RECORD.pack(kind, count, timestamp_ns))
+
+    def frame(self, timestamp_ns=None):
+        self._write(VIDEO, 1, timestamp_ns if timestamp_ns is not None else time.monotonic_ns())
+
+    def audio_block(self, frames, timestamp_ns=None):
+        if timestamp_ns is None:
+            # The callback runs once the block is complete, so its first sample is one block older
+            timestamp_ns = time.monotonic_ns() - int(frames * 1e9 / self.samplerate)
+        self._write(AUDIO, frames, timestamp_ns)
+
+    def close(self):
+        # Safe to call twice: the recorder closes it again on its error path
+        with self.lock:
+            self.file.close()
+
+
+class CaptureTimestamps:
+    def __init__(self, video_ns, audio_blocks):
+        self.video_ns = video_ns
+        self.audio_blocks = audio_blocks  # (first sample ns, sample count)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a capture timestamp file")
+        body = data[len(MAGIC):]
+        # A recorder killed mid-write can leave a partial record at the end
+        body = body[:len(body) - len(body) % RECORD.size]
+        video_ns, audio_blocks = [], []
+        for kind, count, timestamp_ns in RECORD.iter_unpack(body):
+            if kind == VIDEO:
+                video_ns.append(timestamp_ns)
+            else:
+                audio_blocks.append((timestamp_ns, count))
+        return cls(video_ns, audio_blocks)
+
+    def measured_fps(self):
+        if len(self.video_ns) < 2:
+            return None
+        return (len(self.video_ns) - 1) / ((self.video_ns[-1] - self.video_ns[0]) / 1e9)
+
+    def measured_samplerate(self):
+        # Samples per second of the monotonic clock, from a least-squares fit of block start times
+        # against sample position; the sound card's clock drifts from the nominal rate over a recording
+        if len(self.audio_blocks) < 2:
+            return None
+        positions = []
+        position = 0
+        for _, count in self.audio_blocks:
+            positions.append(position)
+            position += count
+        origin = self.audio_blocks[0][0]
+        times = [(timestamp_ns - origin) / 1e9 for timestamp_ns, _ in self.audio_blocks]
+        mean_time = sum(times) / len(times)
+        mean_position = sum(positions) / len(positions)
+        variance = sum((t - mean_time) ** 2 for t in times)
+        if variance == 0:
+            return None
+        return sum((t - mean_time) * (p - mean_position) for t, p in zip(times, positions)) / variance
+
+    def audio_offset(self):
+        # Seconds from the first video frame to the first audio sample
+        if not self.audio_blocks or not self.video_ns:
+            return 0.0
+        return (self.audio_blocks[0][0] - self.video_ns[0]) / 1e9
+
+    def write_timecodes(self, path):
+        # mkvmerge "timestamp format v2": one presentation time in milliseconds per frame
+        origin = self.video_ns[0]
+        with open(path, 'w') as f:
+            f.write("# timestamp format v2\n")
+            for timestamp_ns in self.video_ns:
+                f.write(f"{(timestamp_ns - origin) / 1e6:.3f}\n")
+        return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a capture timestamp sidecar")
+    parser.add_argument("path")
+    parser.add_argument("--timecodes", help="Also write an mkvmerge v2 timecode file here")
+    args = parser.parse_args()
+
+    timestamps = CaptureTimestamps.load(args.path)
+    print(f"Video frames: {len(timestamps.video_ns)}")
+    fps = timestamps.measured_fps()
+    print(f"Measured FPS: {fps:.3f}" if fps else "Measured FPS: n/a")
+    print(f"Audio blocks: {len(timestamps.audio_blocks)} ({sum(count for _, count in timestamps.audio_blocks)} samples)")
+    print(f"Audio offset: {timestamps.audio_offset():+.3f}s")
+    samplerate = timestamps.measured_samplerate()
+    print(f"Measured audio rate: {samplerate:.2f} Hz" if samplerate else "Measured audio rate: n/a")
+    if args.timecodes:
+        if not timestamps.video_ns:
+            sys.exit("No video frames to write timecodes for")
+        timestamps.write_timecodes(args.timecodes)
+        print(f"Timecodes written to {args.timecodes}")
@@ -1,15 +1,89 @@
-import subprocess
+import os
 import sys
+import shutil
 import logging
+import tempfile
+import subprocess
+from capture_timestamps import CaptureTimestamps, timestamps_path
+from replicator import load_config, enqueue_replication
+from pipeline_trace import current_tracer, merge_current
+
+
+def probe(path, stream, entry):
+    result = subprocess.run(["ffprobe", "-v", "error", "-select_streams", stream, "-show_entries", f"stream={entry}",
+                             "-of", "default=noprint_wrappers=1:nokey=1", path], capture_output=True, text=True, check=True)
+    return result.stdout.strip().splitlines()[0]
+
+
+def probe_rate(path, stream, entry):
+    value = probe(path, stream, entry)
+    numerator, _, denominator = value.partition('/')
+    return float(numerator) / float(denominator or 1)
+
+
+# Audio clock drift below this (100 ppm, about 0.4s over an hour) is left alone
+DRIFT_TOLERANCE = 1e-4
+
+
+def mux(video_input, audio_file, output_file, audio_offset=0.0, audio_tempo=None):
+    # Video is always stream-copied; only the audio is encoded, so stretching it costs nothing extra
+    audio_filter = ["-af", f"atempo={audio_tempo:.6f}"] if audio_tempo else []
+    cmd = ["ffmpeg", "-y", *video_input, "-itsoffset", f"{audio_offset:.6f}", "-i", audio_file,
+           "-map", "0:v:0", "-map", "1:a:0", "-c:v", "copy", *audio_filter, "-c:a", "aac", "-strict", "experimental", output_file]
+    subprocess.run(cmd, check=True)
+
+
+def audio_tempo(audio_file, timestamps):
+    # The frames are stamped with the monotonic clock, the audio only counts samples at the
+    # nominal rate; a card running fast or slow is sped up or slowed down to match the video
+    measured = timestamps.measured_samplerate()
+    if not measured:
+        return None
+    tempo = measured / probe_rate(audio_file, "a:0", "sample_rate")
+    return tempo if abs(tempo - 1) > DRIFT_TOLERANCE else None
+
+
+def combine_with_timestamps(video_file, audio_file, output_file, timestamps):
+    audio_offset = timestamps.audio_offset()
+    tempo = audio_tempo(audio_file, timestamps)
+
+    if shutil.which("mkvmerge"):
+        # Exact per-frame times: retime through Matroska, then remux into mp4 without re-encoding
+        with tempfile.TemporaryDirectory(prefix="combine_") as work_dir:
+            timecodes = timestamps.write_timecodes(os.path.join(work_dir, "timecodes.txt"))
+            retimed = os.path.join(work_dir, "retimed.mkv")
+            subprocess.run(["mkvmerge", "-q", "-o", retimed, "--timestamps", f"0:{timecodes}", "-A", video_file], check=True)
+            mux(["-i", retimed], audio_file, output_file, audio_offset, tempo)
+        logging.info(f"Combined {video_file} with per-frame timestamps ({len(timestamps.video_ns)} frames, audio offset {audio_offset:+.3f}s, audio tempo {tempo or 1:.6f})")
+        return
+
+    # Without mkvmerge the frames are spread evenly over the measured capture span
+    nominal_fps = probe_rate(video_file, "v:0", "avg_frame_rate")
+    scale = nominal_fps / timestamps.measured_fps()
+    mux(["-itsscale", f"{scale:.6f}", "-i", video_file], audio_file, output_file, audio_offset, tempo)
+    logging.info(f"Combined {video_file} rescaled from {nominal_fps:.2f} to {timestamps.measured_fps():.2f} fps (mkvmerge not found)")
+
 
 def combine_audio_video(video_file, audio_file, output_file):
-    cmd = f"ffmpeg -i {video_file} -i {audio_file} -c:v copy -c:a aac -strict experimental {output_file}"
-    subprocess.run(cmd, shell=True, check=True)
+    sidecar = timestamps_path(video_file)
+    if os.path.exists(sidecar):
+        timestamps = CaptureTimestamps.load(sidecar)
+        if len(timestamps.video_ns) >= 2:
+            combine_with_timestamps(video_file, audio_file, output_file, timestamps)
+            return
+    mux(["-i", video_file], audio_file, output_file)
+
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     if len(sys.argv) != 4:
         print("Usage: python combine_audio_video.py <video_file> <audio_file> <output_file>")
         sys.exit(1)
-    
+
     video_file, audio_file, output_file = sys.argv[1:]
-    combine_audio_video(video_file, audio_file, output_file)
+    with current_tracer().span('combine', output=os.path.basename(output_file)):
+        combine_audio_video(video_file, audio_file, output_file)
+    # In tiered storage mode the combined file is only written locally and copied on from here
+    enqueue_replication(load_config(), [output_file])
+    # Combining is the last stage, so the event's trace is complete once it is merged again here
+    merge_current()
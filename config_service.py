@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import logging
+import argparse
+import threading
+from inotify_watch import create_watcher, IN_CLOSE_WRITE, IN_MOVED_TO
+
+# One parsed, validated copy of recording_config.json per process. Daemons call watch() so
+# edits are picked up without a restart; a change that fails validation is logged and the
+# last good configuration stays in use.
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_ENV = 'RECORDING_CONFIG'
+DEFAULT_CONFIG_PATH = os.path.join(SCRIPT_DIR, 'recording_config.json')
+
+NUMBER = (int, float)
+
+
+class Choice:
+    def __init__(self, *values):
+        self.values = values
+
+
+class ConfigError(ValueError):
+    def __init__(self, path, errors):
+        self.errors = errors
+        super().__init__(f"Invalid configuration in {path}:\n  " + "\n  ".join(errors))
+
+
+# Every section and key the capture scripts read. A dict with a single type as its key is a
+# free-form mapping; a tuple allows several types; None allows null. Keys that are not listed
+# are reported as warnings, which is how misspelled keys get noticed before an event.
+SCHEMA = {
+    'output_directories': [str],
+    'video_recording': {
+        'camera': {'vendor_id': str, 'product_id': str, 'name': str, 'device_path': str},
+        'audio': {'use_camera_mic': bool, 'device_index': int, 'sample_rate': int},
+    },
+    'audio_only_recording': {
+        'device': {'vendor_id': str, 'product_id': str, 'name': str, 'device_index': int},
+        'processing': {'channels': ([int], None), 'mix': Choice('none', 'mean', 'delay_and_sum'), 'delays': ([NUMBER], None)},
+        'vad': {
+            'enabled': bool, 'trim': bool, 'frame_ms': NUMBER, 'threshold_db': NUMBER, 'margin_db': NUMBER,
+            'zcr_max': NUMBER, 'loud_db': NUMBER, 'min_speech_s': NUMBER, 'min_silence_s': NUMBER, 'padding_s': NUMBER,
+            'floor_window_s': NUMBER, 'floor_rise_db_s': NUMBER,
+        },
+    },
+    'screen_capture': {
+        'framerate': NUMBER,
+        'display': str,
+        'monitor': (str, int),
+        'single_capture': bool,
+        'output_format': str,
+        'storage': Choice('images', 'timeline'),
+        'image_encoding': {
+            'codec': Choice('png', 'webp', 'jpeg', 'raw'), 'png_compress_level': int, 'jpeg_quality': int,
+            'webp_quality': int, 'webp_lossless': bool, 'queue_size': int, 'workers': int,
+        },
+    },
+    'audio_output': {
+        'codec': Choice('wav', 'flac', 'opus'),
+        'directory_codecs': {str: Choice('wav', 'flac', 'opus')},
+        'flac_compression_level': int,
+        'opus_bitrate': str,
+        'queue_blocks': int,
+    },
+    'capture_backend': {
+        'type': Choice('device', 'synthetic'),
+        'synthetic': {
+            'width': int, 'height': int, 'fps': NUMBER, 'audio_source': str, 'tone_hz': NUMBER, 'samplerate': int,
+            'channels': int, 'screen_width': int, 'screen_height': int, 'realtime': bool,
+        },
+    },
+    'scheduler': {
+        'capture_kinds': [Choice('audio', 'webcam', 'screen')],
+        'control_socket': str,
+        'device_reset_s': {str: NUMBER},
+        'job_store': {'path': str, 'misfire_grace_time': (int, None), 'coalesce': bool},
+    },
+    'storage': {
+        'mode': Choice('direct', 'tiered'), 'primary': (str, None), 'spool_dir': str, 'rate_limit_mb_s': NUMBER,
+        'chunk_kb': int, 'verify': bool, 'poll_interval': NUMBER, 'retry_delay': NUMBER,
+    },
+    'logging': {
+        'level': Choice('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'), 'log_dir': str,
+        'file_format': Choice('json', 'text'), 'console_format': Choice('json', 'text'), 'max_bytes': int,
+        'backup_count': int, 'queue_size': int, 'rate_limit_interval_s': NUMBER, 'rate_limit_burst': int,
+    },
+    'metrics': {'enabled': bool, 'directory': str, 'interval_s': NUMBER, 'latency_window': int},
+    'tracing': {'enabled': bool, 'directory': str},
+}
+
+REQUIRED = ('output_directories',)
+
+
+def type_name(expected):
+    if expected is None:
+        return 'null'
+    if expected == NUMBER:
+        return 'number'
+    if isinstance(expected, tuple):
+        return ' or '.join(type_name(option) for option in expected)
+    if isinstance(expected, Choice):
+        return 'one of ' + ', '.join(repr(value) for value in expected.values)
+    if isinstance(expected, list):
+        return f"list of {type_name(expected[0])}"
+    if isinstance(expected, dict):
+        return 'object'
+    return {int: 'integer', float: 'number', str: 'string', bool: 'true/false'}.get(expected, expected.__name__)
+
+
+def check_value(value, expected, where, errors, warnings):
+    if isinstance(expected, tuple):
+        for option in expected:
+            if matches(value, option):
+                check_value(value, option, where, errors, warnings)
+                return
+        errors.append(f"{where}: expected {type_name(expected)}, got {json.dumps(value)}")
+    elif not matches(value, expected):
+        errors.append(f"{where}: expected {type_name(expected)}, got {json.dumps(value)}")
+    elif isinstance(expected, list):
+        for index, item in enumerate(value):
+            check_value(item, expected[0], f"{where}[{index}]", errors, warnings)
+    elif isinstance(expected, dict):
+        key_type = next(iter(expected))
+        if len(expected) == 1 and isinstance(key_type, type):
+            for key, item in value.items():
+                check_value(item, expected[key_type], f"{where}.{key}", errors, warnings)
+            return
+        for key, item in value.items():
+            if key not in expected:
+                warnings.append(f"{where}.{key}: unknown key")
+            else:
+                check_value(item, expected[key], f"{where}.{key}", errors, warnings)
+
+
+def matches(value, expected):
+    if expected is None:
+        return value is None
+    if isinstance(expected, tuple):
+        return any(matches(value, option) for option in expected)
+    if isinstance(expected, Choice):
+        return value in expected.values
+    if isinstance(expected, list):
+        return isinstance(value, list)
+    if isinstance(expected, dict):
+        return isinstance(value, dict)
+    # JSON true/false are ints to Python; a number field must not accept them
+    if isinstance(value, bool) and expected is not bool:
+        return False
+    return isinstance(value, expected)
+
+
+def validate(config):
+    # Returns (errors, warnings); errors stop a load, warnings are only logged
+    errors, warnings = [], []
+    if not isinstance(config, dict):
+        return ["top level: expected an object"], []
+    for key in REQUIRED:
+        if key not in config:
+            errors.append(f"{key}: missing")
+    for key, value in config.items():
+        if key not in SCHEMA:
+            warnings.append(f"{key}: unknown section")
+        else:
+            check_value(value, SCHEMA[key], key, errors, warnings)
+    return errors, warnings
+
+
+def read_config(path):
+    try:
+        with open(path, 'r') as f:
+            config = json.load(f)
+    except ValueError as e:
+        raise ConfigError(path, [f"not valid JSON: {e}"])
+    errors, warnings = validate(config)
+    if errors:
+        raise ConfigError(path, errors)
+    for warning in warnings:
+        logging.warning(f"{os.path.basename(path)}: {warning}")
+    return config
+
+
+class ConfigService:
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.lock = threading.Lock()
+        self.config = None
+        self.version = 0
+        self.listeners = []
+        self.watcher = None
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def get(self):
+        # Shared by every caller in the process and replaced wholesale on reload, never changed
+        # in place; code that wants to adjust it for one run copies it first
+        with self.lock:
+            if self.config is None:
+                self.config = read_config(self.path)
+                self.version += 1
+            return self.config
+
+    def reload(self):
+        try:
+            config = read_config(self.path)
+        except (OSError, ConfigError) as e:
+            logging.error(f"Keeping the previous configuration: {e}")
+            return False
+        with self.lock:
+            if config == self.config:
+                return False
+            self.config = config
+            self.version += 1
+        logging.info(f"Reloaded {self.path} (version {self.version})")
+        for listener in list(self.listeners):
+            try:
+                listener(config)
+            except Exception as e:
+                logging.error(f"Configuration listener failed: {e}")
+                logging.debug("Exception details:", exc_info=True)
+        return True
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def watch(self, poll_interval=2.0):
+        # Editors usually save by renaming a temp file over the original, so the directory is
+        # watched rather than the file itself
+        with self.lock:
+            if self.thread is not None:
+                return self
+            self.watcher = create_watcher(poll_interval)
+            self.watcher.add(os.path.dirname(self.path))
+            self.thread = threading.Thread(target=self._run, name="config-watch", daemon=True)
+            self.thread.start()
+        return self
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            try:
+                events = self.watcher.read(timeout=1.0)
+            except OSError as e:
+                logging.error(f"Configuration watcher failed: {e}")
+                return
+            if any(path == self.path and mask & (IN_CLOSE_WRITE | IN_MOVED_TO) for path, mask in events):
+                self.reload()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+            self.watcher.close()
+            self.thread = None
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def config_service(path=None):
+    path = os.path.abspath(path or os.environ.get(CONFIG_ENV) or DEFAULT_CONFIG_PATH)
+    with _services_lock:
+        if path not in _services:
+            _services[path] = ConfigService(path)
+        return _services[path]
+
+
+def load_config(path=None):
+    return config_service(path).get()
+
+
+def watch_config(path=None):
+    return config_service(path).watch()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Validate recording_config.json")
+    parser.add_argument("path", nargs="?", help=f"Configuration file (default: ${CONFIG_ENV} or {DEFAULT_CONFIG_PATH})")
+    parser.add_argument("--strict", action="store_true", help="Treat unknown keys as errors")
+    args = parser.parse_args()
+
+    path = args.path or os.environ.get(CONFIG_ENV) or DEFAULT_CONFIG_PATH
+    try:
+        with open(path, 'r') as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        sys.exit(f"{path}: {e}")
+    errors, warnings = validate(config)
+    for problem in errors:
+        print(f"ERROR    {problem}")
+    for problem in warnings:
+        print(f"WARNING  {problem}")
+    if errors or (args.strict and warnings):
+        sys.exit(1)
+    print(f"{path} is valid")
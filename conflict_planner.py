@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import logging
+import argparse
+from datetime import datetime, timedelta
+from event_model import Event, local_now
+from capture_kinds import kinds_for_event
+from config_service import load_config
+
+# Seconds a device needs after one recorder lets go before the next can open it.
+# Overridden by scheduler.device_reset_s in recording_config.json.
+DEFAULT_RESET_S = {
+    'camera': 2.0,
+    'camera_mic': 1.0,
+    'mic_array': 1.0,
+    'display': 0.0,
+}
+
+
+def reset_times(config):
+    reset = dict(DEFAULT_RESET_S)
+    reset.update(config.get('scheduler', {}).get('device_reset_s', {}))
+    return reset
+
+
+class IntervalTree:
+    # Static augmented tree over half-open [start, end) intervals. Intervals are sorted by start
+    # and the tree is implicit: the middle of every slice is its root, and max_end[i] holds the
+    # latest end inside the subtree rooted at i. Build is O(n log n), a query O(log n + k).
+    def __init__(self, intervals):
+        self.items = sorted(intervals, key=lambda item: (item[0], item[1]))
+        self.max_end = [None] * len(self.items)
+        self._build(0, len(self.items))
+
+    def _build(self, low, high):
+        if low >= high:
+            return None
+        mid = (low + high) // 2
+        latest = self.items[mid][1]
+        for child in (self._build(low, mid), self._build(mid + 1, high)):
+            if child is not None and child > latest:
+                latest = child
+        self.max_end[mid] = latest
+        return latest
+
+    def __len__(self):
+        return len(self.items)
+
+    def overlapping(self, start, end):
+        return [self.items[position] for position in self.overlapping_positions(start, end)]
+
+    def overlapping_positions(self, start, end):
+        # Positions in start order of the intervals overlapping [start, end)
+        found = []
+        stack = [(0, len(self.items))]
+        while stack:
+            low, high = stack.pop()
+            if low >= high:
+                continue
+            mid = (low + high) // 2
+            # Nothing in this subtree ends after the query starts
+            if self.max_end[mid] <= start:
+                continue
+            stack.append((low, mid))
+            item = self.items[mid]
+            if item[0] < end:
+                if item[1] > start:
+                    found.append(mid)
+                # Right subtree starts later still; only worth visiting while starts are before the end
+                stack.append((mid + 1, high))
+        return found
+
+
+def device_intervals(events, config):
+    # One interval per (device, event); the payload is the event itself
+    intervals = {}
+    for event in events:
+        for kind in kinds_for_event(event, config):
+            for device in kind.devices:
+                intervals.setdefault(device, []).append((event.start, event.end, event))
+    return intervals
+
+
+def build_index(events, config):
+    return {device: IntervalTree(items) for device, items in device_intervals(events, config).items()}
+
+
+def find_conflicts(tree):
+    # Each pair once: an interval's partners are looked up in the tree, and only the ones after
+    # it in start order are kept. O(n log n + k) for k overlapping pairs.
+    conflicts = []
+    for position, (start, end, event) in enumerate(tree.items):
+        for other_position in sorted(tree.overlapping_positions(start, end)):
+            if other_position <= position:
+                continue
+            other_start, other_end, other = tree.items[other_position]
+            conflicts.append((event, other, min(end, other_end) - other_start))
+    return conflicts
+
+
+def find_short_gaps(tree, reset_s):
+    # Back-to-back events whose gap leaves less than the device reset time
+    gaps = []
+    latest_end, latest_event = None, None
+    for start, end, event in tree.items:
+        if latest_end is not None and latest_end <= start:
+            gap = (start - latest_end).total_seconds()
+            if gap < reset_s:
+                gaps.append((latest_event, event, gap))
+        if latest_end is None or end > latest_end:
+            latest_end, latest_event = end, event
+    return gaps
+
+
+def peak_concurrency(events, config):
+    # Sweep over recorder start/stop edges; ends sort before starts at the same instant
+    edges = []
+    for event in events:
+        streams = len(kinds_for_event(event, config))
+        if streams:
+            edges.append((event.start, 1, streams))
+            edges.append((event.end, 0, -streams))
+    current = peak = 0
+    peak_at = None
+    for moment, _, change in sorted(edges):
+        current += change
+        if current > peak:
+            peak, peak_at = current, moment
+    return peak, peak_at
+
+
+def plan(events, config):
+    reset = reset_times(config)
+    report = {'events': len(events), 'devices': {}}
+    for device, tree in sorted(build_index(events, config).items()):
+        report['devices'][device] = {
+            'events': len(tree),
+            'conflicts': [{'first': first.event_id, 'second': second.event_id, 'overlap_s': overlap.total_seconds()} for first, second, overlap in find_conflicts(tree)],
+            'short_gaps': [{'first': first.event_id, 'second': second.event_id, 'gap_s': gap, 'reset_s': reset.get(device, 0.0)} for first, second, gap in find_short_gaps(tree, reset.get(device, 0.0))],
+        }
+    peak, peak_at = peak_concurrency(events, config)
+    report['peak_streams'] = peak
+    report['peak_at'] = peak_at.isoformat() if peak_at else None
+    return report
+
+
+def problem_count(report):
+    return sum(len(device['conflicts']) + len(device['short_gaps']) for device in report['devices'].values())
+
+
+def load_events(export_dir, start, end):
+    events = []
+    for root, dirs, files in os.walk(export_dir):
+        for file in files:
+            if not file.endswith('.json'):
+                continue
+            file_path = os.path.join(root, file)
+            try:
+                event = Event.load(file_path)
+            except Exception as e:
+                logging.error(f"Skipping {file_path}: {e}")
+                continue
+            if event.end > start and event.start < end:
+                events.append(event)
+    return events
+
+
+def print_report(report, start, end):
+    print(f"Plan for {start:%Y-%m-%d %H:%M} to {end:%Y-%m-%d %H:%M}: {report['events']} events, peak {report['peak_streams']} concurrent streams" + (f" at {report['peak_at']}" if report['peak_at'] else ""))
+    for device, details in report['devices'].items():
+        print(f"\n{device}: {details['events']} events, {len(details['conflicts'])} conflicts, {len(details['short_gaps'])} short gaps")
+        for conflict in details['conflicts']:
+            print(f"  CONFLICT  {conflict['first']} overlaps {conflict['second']} by {conflict['overlap_s']:.0f}s")
+        for gap in details['short_gaps']:
+            print(f"  TIGHT     {gap['first']} -> {gap['second']}: {gap['gap_s']:.1f}s gap, device needs {gap['reset_s']:.1f}s")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Report device conflicts, tight turnarounds and peak load for upcoming events")
+    parser.add_argument("--exports", default=os.path.join('.', 'media', 'exports'), help="Export directory to read events from")
+    parser.add_argument("--hours", type=float, default=24, help="Planning horizon from now")
+    parser.add_argument("--from", dest="start", type=datetime.fromisoformat, help="Horizon start (ISO date/time, default now)")
+    parser.add_argument("--to", dest="end", type=datetime.fromisoformat, help="Horizon end (overrides --hours)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    start = args.start.astimezone() if args.start else local_now()
+    end = args.end.astimezone() if args.end else start + timedelta(hours=args.hours)
+    events = load_events(os.path.abspath(args.exports), start, end)
+    report = plan(events, load_config())
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, start, end)
+    sys.exit(1 if problem_count(report) else 0)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import socket
+import logging
+import argparse
+import threading
+import socketserver
+from config_service import load_config
+
+# One JSON object per line in each direction: {"command": "status", ...} is answered with
+# {"ok": true, "result": ...} or {"ok": false, "error": "..."}.
+DEFAULT_SOCKET_PATH = './jobs/capture_scheduler.sock'
+
+
+def socket_path(config):
+    return config.get('scheduler', {}).get('control_socket', DEFAULT_SOCKET_PATH)
+
+
+class CommandError(Exception):
+    pass
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                command = request.pop('command')
+                handler = self.server.handlers.get(command)
+                if handler is None:
+                    raise CommandError(f"Unknown command '{command}', expected one of: {', '.join(sorted(self.server.handlers))}")
+                response = {'ok': True, 'result': handler(**request)}
+            except (CommandError, KeyError, TypeError, ValueError) as e:
+                response = {'ok': False, 'error': str(e)}
+            except Exception as e:
+                logging.error(f"Control command failed: {e}")
+                logging.debug("Exception details:", exc_info=True)
+                response = {'ok': False, 'error': f"Internal error: {e}"}
+            self.wfile.write(json.dumps(response, default=str).encode() + b'\n')
+            self.wfile.flush()
+
+
+class ControlServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, handlers):
+        self.path = os.path.abspath(path)
+        self.handlers = handlers
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if os.path.exists(self.path):
+            # Only a scheduler answering the ping counts as live; a socket nobody answers on, or
+            # one answered by something else, is stale and gets replaced
+            try:
+                send_command(self.path, 'ping', timeout=1)
+            except (OSError, ValueError, KeyError, TypeError, CommandError):
+                os.remove(self.path)
+            else:
+                raise RuntimeError(f"Another process is already listening on {self.path}")
+        super().__init__(self.path, _RequestHandler)
+        os.chmod(self.path, 0o600)
+        self.handlers.setdefault('ping', lambda: 'pong')
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, name="control-socket", daemon=True)
+        self.thread.start()
+        logging.info(f"Control socket listening on {self.path}")
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def send_command(path, command, timeout=5, **args):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(path)
+        client.sendall(json.dumps(dict(args, command=command)).encode() + b'\n')
+        data = b''
+        while not data.endswith(b'\n'):
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    response = json.loads(data)
+    if not response['ok']:
+        raise CommandError(response['error'])
+    return response['result']
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Send a command to the running capture scheduler")
+    parser.add_argument("--socket", help="Control socket path (default: scheduler.control_socket)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("status", help="Running events, device owners and upcoming jobs")
+    subparsers.add_parser("list-sessions", help="tmux sessions known to the daemon")
+    subparsers.add_parser("pause", help="Stop firing scheduled events until resumed")
+    subparsers.add_parser("resume")
+    start_parser = subparsers.add_parser("start", help="Start an indexed event now, or an ad-hoc capture")
+    start_parser.add_argument("event_id", nargs="?")
+    start_parser.add_argument("--title", help="Title for an ad-hoc capture")
+    start_parser.add_argument("--minutes", type=float, help="Length of an ad-hoc capture")
+    start_parser.add_argument("--capture", nargs="+", help="Capture kinds for an ad-hoc capture")
+    stop_parser = subparsers.add_parser("stop", help="Stop a running event's captures")
+    stop_parser.add_argument("event_id")
+    extend_parser = subparsers.add_parser("extend-event", help="Keep recording an event for longer")
+    extend_parser.add_argument("event_id")
+    extend_parser.add_argument("seconds", type=float)
+    args = parser.parse_args()
+
+    command_args = {key: value for key, value in vars(args).items() if key not in ('socket', 'command') and value is not None}
+    try:
+        result = send_command(args.socket or socket_path(load_config()), args.command, **command_args)
+    except CommandError as e:
+        sys.exit(f"Error: {e}")
+    except OSError as e:
+        sys.exit(f"Could not reach the capture scheduler: {e}")
+    print(json.dumps(result, indent=2, default=str))
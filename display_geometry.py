@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+import re
+import sys
+import logging
+import subprocess
+
+XRANDR_SCREEN = re.compile(r'^Screen \d+:.*current (\d+) x (\d+)')
+XRANDR_MONITOR = re.compile(r'^(\S+) connected (primary )?(\d+)x(\d+)\+(\d+)\+(\d+)')
+
+
+def _query_xlib(display):
+    from Xlib import display as xdisplay
+    from Xlib.ext import randr
+
+    d = xdisplay.Display(display)
+    try:
+        root = d.screen().root
+        root_geometry = root.get_geometry()
+        screen = {'width': root_geometry.width, 'height': root_geometry.height, 'monitors': []}
+        if d.has_extension('RANDR'):
+            for monitor in randr.get_monitors(root).monitors:
+                screen['monitors'].append({
+                    'name': d.get_atom_name(monitor.name),
+                    'primary': bool(monitor.primary),
+                    'width': monitor.width_in_pixels,
+                    'height': monitor.height_in_pixels,
+                    'x': monitor.x,
+                    'y': monitor.y,
+                })
+        return screen
+    finally:
+        d.close()
+
+
+def parse_xrandr(output):
+    screen = {'width': None, 'height': None, 'monitors': []}
+    for line in output.splitlines():
+        match = XRANDR_SCREEN.match(line)
+        if match:
+            screen['width'], screen['height'] = int(match.group(1)), int(match.group(2))
+            continue
+        match = XRANDR_MONITOR.match(line)
+        if match:
+            screen['monitors'].append({
+                'name': match.group(1),
+                'primary': bool(match.group(2)),
+                'width': int(match.group(3)),
+                'height': int(match.group(4)),
+                'x': int(match.group(5)),
+                'y': int(match.group(6)),
+            })
+    if screen['width'] is None:
+        raise ValueError("Could not find the screen size in xrandr output")
+    return screen
+
+
+def _query_xrandr(display):
+    result = subprocess.run(['xrandr', '--display', display, '--query'], check=True, capture_output=True, text=True)
+    return parse_xrandr(result.stdout)
+
+
+def get_screen_geometry(display=':0'):
+    try:
+        return _query_xlib(display)
+    except Exception as e:
+        logging.debug(f"Xlib geometry query failed ({e}), falling back to xrandr")
+    return _query_xrandr(display)
+
+
+def capture_region(display=':0', monitor='all'):
+    # Returns (width, height, x, y) for x11grab; 'all' is the whole virtual screen,
+    # 'primary' the primary output, otherwise a monitor name or index from xrandr order
+    screen = get_screen_geometry(display)
+    if monitor == 'all' or not screen['monitors']:
+        region = (screen['width'], screen['height'], 0, 0)
+    else:
+        monitors = screen['monitors']
+        if monitor == 'primary':
+            selected = next((m for m in monitors if m['primary']), monitors[0])
+        elif isinstance(monitor, int) or str(monitor).isdigit():
+            selected = monitors[int(monitor)]
+        else:
+            selected = next((m for m in monitors if m['name'] == monitor), None)
+            if selected is None:
+                raise ValueError(f"Monitor {monitor} not found on display {display}")
+        region = (selected['width'], selected['height'], selected['x'], selected['y'])
+    width, height, x, y = region
+    # libx264 needs even dimensions
+    return width - width % 2, height - height % 2, x, y
+
+
+def x11grab_input(display, x, y):
+    return f"{display}+{x},{y}"
+
+
+if __name__ == "__main__":
+    display = sys.argv[1] if len(sys.argv) > 1 else ':0'
+    screen = get_screen_geometry(display)
+    print(f"Display {display}: {screen['width']}x{screen['height']}")
+    for monitor in screen['monitors']:
+        primary = " (primary)" if monitor['primary'] else ""
+        print(f"  {monitor['name']}{primary}: {monitor['width']}x{monitor['height']}+{monitor['x']}+{monitor['y']}")
@@ -0,0 +1,63 @@
+import re
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+REQUIRED_FIELDS = ('title', 'start_date', 'start_time', 'end_date', 'end_time')
+
+
+def local_now():
+    return datetime.now().astimezone()
+
+
+def sanitize_title(title):
+    # Titles end up in tmux session names and file names
+    return re.sub(r'[^\w\-]+', '_', title.strip()).strip('_') or 'untitled'
+
+
+def parse_time(data, prefix, timezone):
+    moment = datetime.strptime(f"{data[prefix + '_date']} {data[prefix + '_time']}", TIME_FORMAT)
+    return moment.replace(tzinfo=timezone) if timezone else moment.astimezone()
+
+
+@dataclass(frozen=True, slots=True)
+class Event:
+    # Parsed once when an export file is loaded; the raw dict is not kept
+    event_id: str
+    title: str
+    start: datetime
+    end: datetime
+    capture: tuple = None
+    source_path: str = None
+
+    @classmethod
+    def from_dict(cls, data, source_path=None):
+        missing = [field for field in REQUIRED_FIELDS if not data.get(field)]
+        if missing:
+            raise ValueError(f"Event is missing {', '.join(missing)}")
+        # Export times are wall-clock times; an explicit timezone wins over the machine's
+        timezone = ZoneInfo(data['timezone']) if data.get('timezone') else None
+        start = parse_time(data, 'start', timezone)
+        end = parse_time(data, 'end', timezone)
+        if end <= start:
+            raise ValueError(f"Event '{data['title']}' ends before it starts")
+        title = sanitize_title(data['title'])
+        capture = tuple(data['capture']) if data.get('capture') else None
+        # Same shape as the job IDs already in the job stores
+        event_id = f"{title}_{start.strftime('%Y%m%d_%H%M%S')}"
+        return cls(event_id, title, start, end, capture, source_path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f), source_path=path)
+
+    @property
+    def duration(self):
+        return (self.end - self.start).total_seconds()
+
+    def remaining(self, now=None):
+        # Seconds left to record; a job fired late still stops at the scheduled end
+        return (self.end - max(self.start, now or local_now())).total_seconds()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import random
+import argparse
+from datetime import date, datetime, timedelta
+from event_model import sanitize_title
+
+MEETING_TYPES = ["Standup", "Sync", "Review", "Planning", "Demo", "1:1", "Kickoff", "Retro", "Interview", "Pipeline Review", "Board Prep", "Diligence Call"]
+TOPICS = ["Q3 Forecast", "Onboarding", "Pricing", "Roadmap", "Security Audit", "Hiring", "Partnership", "Renewal", "Integration", "Budget", "Launch", "Support Escalation"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Stark Industries", "Wayne Enterprises", "Hooli", "Vandelay Industries", "Soylent", "Wonka Industries", None, None]
+# Minutes, weighted towards the usual 30 and 60 minute calendar slots
+DURATIONS = [15, 25, 30, 30, 30, 45, 50, 60, 60, 90, 120]
+MAX_ATTEMPTS = 1000
+
+
+def synthetic_event(day, rng):
+    # Business hours on 5-minute boundaries, with the occasional early or late call
+    hour = rng.choice(range(8, 18)) if rng.random() < 0.9 else rng.choice([6, 7, 18, 19, 20])
+    start = datetime.combine(day, datetime.min.time()) + timedelta(hours=hour, minutes=5 * rng.randrange(12))
+    end = start + timedelta(minutes=rng.choice(DURATIONS))
+    company = rng.choice(COMPANIES)
+    title = f"{rng.choice(TOPICS)} {rng.choice(MEETING_TYPES)}"
+    if company:
+        title = f"{company} {title}"
+    return {
+        'title': title if rng.random() < 0.8 else f"  {title} ",  # Exports are not always trimmed
+        'start_date': start.strftime("%Y-%m-%d"),
+        'start_time': start.strftime("%H:%M:%S"),
+        'end_date': end.strftime("%Y-%m-%d"),
+        'end_time': end.strftime("%H:%M:%S"),
+        'company': company,
+        'description': f"Synthetic event generated for scheduler benchmarks ({rng.getrandbits(32):08x})",
+    }
+
+
+def generate_exports(output_dir, count, start_date, days, seed=None):
+    rng = random.Random(seed)
+    # Weekdays carry most of the load, as in real calendars
+    all_days = [start_date + timedelta(days=i) for i in range(days)]
+    weights = [1.0 if day.weekday() < 5 else 0.1 for day in all_days]
+    created_dirs = set()
+    # Event IDs are the title plus the start time, so a repeated pair would be one job in a
+    # scheduler that replaces existing jobs and an ID conflict in one that does not
+    event_ids = set()
+    for i in range(count):
+        for _ in range(MAX_ATTEMPTS):
+            day = rng.choices(all_days, weights)[0]
+            event = synthetic_event(day, rng)
+            event_id = (sanitize_title(event['title']), event['start_date'], event['start_time'])
+            if event_id not in event_ids:
+                event_ids.add(event_id)
+                break
+        else:
+            raise ValueError(f"Could not generate {count} distinct events across {days} days")
+        date_dir = os.path.join(output_dir, day.strftime("%Y-%m-%d"))
+        if date_dir not in created_dirs:
+            os.makedirs(date_dir, exist_ok=True)
+            created_dirs.add(date_dir)
+        slug = event['title'].strip().replace(' ', '_').replace(':', '')
+        with open(os.path.join(date_dir, f"event_{i:07d}_{slug}.json"), 'w') as f:
+            json.dump(event, f)
+        if (i + 1) % 100000 == 0:
+            print(f"Generated {i + 1} events")
+    return len(created_dirs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic event exports in the media/exports/YYYY-MM-DD layout")
+    parser.add_argument("--count", type=int, default=10000, help="Number of event JSON files to write")
+    parser.add_argument("--output", default=os.path.join('.', 'media', 'exports'), help="Export root directory")
+    parser.add_argument("--start-date", type=date.fromisoformat, default=date.today() + timedelta(days=1), help="First date (YYYY-MM-DD), defaults to tomorrow")
+    parser.add_argument("--days", type=int, default=90, help="Number of days to spread events across")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible trees")
+    args = parser.parse_args()
+
+    day_count = generate_exports(os.path.abspath(args.output), args.count, args.start_date, args.days, args.seed)
+    print(f"Wrote {args.count} events across {day_count} date directories under {os.path.abspath(args.output)}")
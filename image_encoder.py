@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import io
+import time
+import queue
+import threading
+import logging
+import argparse
+from PIL import Image
+from pipeline_trace import current_tracer
+
+# Defaults for screen_capture.image_encoding in recording_config.json
+DEFAULT_ENCODING = {
+    'codec': 'png',            # png, webp, jpeg or raw
+    'png_compress_level': 1,   # 0-9, zlib level; 1 keeps 4K frames well under a second
+    'jpeg_quality': 85,
+    'webp_quality': 80,
+    'webp_lossless': False,
+    'queue_size': 16,          # frames waiting to be encoded before new ones are dropped
+    'workers': 2,
+}
+
+EXTENSIONS = {
+    'png': 'png',
+    'webp': 'webp',
+    'jpeg': 'jpg',
+    'raw': 'ppm',
+}
+
+
+def encoding_settings(config):
+    settings = dict(DEFAULT_ENCODING)
+    settings.update(config.get('screen_capture', {}).get('image_encoding', {}))
+    if settings['codec'] not in EXTENSIONS:
+        raise ValueError(f"Unsupported image codec: {settings['codec']}")
+    return settings
+
+
+def to_image(frame):
+    # mss screenshots carry raw BGRA; converting them is left to the encoder thread
+    if isinstance(frame, Image.Image):
+        return frame
+    return Image.frombytes('RGB', frame.size, frame.rgb)
+
+
+def encode_image(image, settings):
+    buffer = io.BytesIO()
+    codec = settings['codec']
+    if codec == 'png':
+        image.save(buffer, format='PNG', compress_level=settings['png_compress_level'])
+    elif codec == 'webp':
+        image.save(buffer, format='WEBP', quality=settings['webp_quality'], lossless=settings['webp_lossless'])
+    elif codec == 'jpeg':
+        image.convert('RGB').save(buffer, format='JPEG', quality=settings['jpeg_quality'])
+    else:
+        # Raw: binary PPM, no compression at all; see compress_raw_images()
+        image.convert('RGB').save(buffer, format='PPM')
+    return buffer.getvalue()
+
+
+class ImageEncoder:
+    def __init__(self, settings=None, sink=None):
+        self.settings = dict(DEFAULT_ENCODING)
+        self.settings.update(settings or {})
+        self.extension = EXTENSIONS[self.settings['codec']]
+        self.queue = queue.Queue(maxsize=self.settings['queue_size'])
+        self.sink = sink
+        self.dropped = 0
+        self.encoded = 0
+        self._seq = 0
+        self._lock = threading.Lock()
+        self.trace = current_tracer()
+        self.workers = []
+        for i in range(max(1, self.settings['workers'])):
+            worker = threading.Thread(target=self._worker, name=f"image-encoder-{i}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+        logging.info(f"Image encoder started: codec={self.settings['codec']}, workers={len(self.workers)}, queue={self.settings['queue_size']}")
+
+    def submit(self, frame, output_paths=None, timestamp=None):
+        # output_paths are paths without extension; the frame is encoded once and written to each.
+        # With a sink (e.g. a screen timeline) the frame goes to the sink in submission order instead.
+        if timestamp is None:
+            timestamp = time.time()
+        try:
+            self.queue.put_nowait((self._seq, timestamp, frame, output_paths))
+            self._seq += 1
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            logging.warning(f"Encoder queue full, dropped frame ({self.dropped} dropped so far)")
+            return False
+
+    def _worker(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+            seq, timestamp, frame, output_paths = item
+            data = None
+            try:
+                with self.trace.span('encode', seq=seq):
+                    data = encode_image(to_image(frame), self.settings)
+                if self.sink is None:
+                    with self.trace.span('write_image', seq=seq):
+                        self.write(data, output_paths)
+                with self._lock:
+                    self.encoded += 1
+            except Exception as e:
+                logging.error(f"Failed to encode frame {seq}: {e}")
+                logging.debug("Exception details:", exc_info=True)
+            finally:
+                if self.sink is not None:
+                    self.sink.write(seq, timestamp, data)
+                self.queue.task_done()
+
+    def write(self, data, output_paths):
+        for path in output_paths:
+            with open(f"{path}.{self.extension}", 'wb') as f:
+                f.write(data)
+
+    def close(self):
+        for _ in self.workers:
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join()
+        if self.sink is not None:
+            self.sink.close()
+        logging.info(f"Image encoder stopped: {self.encoded} frames encoded, {self.dropped} dropped")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def compress_raw_images(directory, codec='png', delete_raw=True, **overrides):
+    settings = dict(DEFAULT_ENCODING)
+    settings.update(overrides)
+    settings['codec'] = codec
+    converted = 0
+    for root, dirs, files in os.walk(directory):
+        for filename in sorted(files):
+            if not filename.endswith('.ppm'):
+                continue
+            raw_path = os.path.join(root, filename)
+            with Image.open(raw_path) as image:
+                data = encode_image(image, settings)
+            with open(f"{os.path.splitext(raw_path)[0]}.{EXTENSIONS[codec]}", 'wb') as f:
+                f.write(data)
+            if delete_raw:
+                os.remove(raw_path)
+            converted += 1
+    logging.info(f"Compressed {converted} raw images in {directory} to {codec}")
+    return converted
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Compress raw screen captures written with codec 'raw'")
+    parser.add_argument("directory", help="Directory containing .ppm captures")
+    parser.add_argument("--codec", choices=['png', 'webp', 'jpeg'], default='png')
+    parser.add_argument("--keep-raw", action="store_true", help="Keep the .ppm files after compressing")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        print(f"Not a directory: {args.directory}")
+        sys.exit(1)
+    compress_raw_images(args.directory, args.codec, delete_raw=not args.keep_raw)
@@ -0,0 +1,139 @@
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
+
+# Linux inotify through ctypes so no extra package is needed; other platforms (or a libc
+# without inotify) fall back to polling directory listings.
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+DEFAULT_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def load_libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+
+class InotifyWatcher:
+    def __init__(self, mask=DEFAULT_MASK, libc=None):
+        self.libc = libc or load_libc()
+        if self.libc is None:
+            raise OSError("inotify is not available")
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.mask = mask
+        self.watches = {}
+
+    def add(self, path, recursive=False):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.mask | IN_CREATE)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        self.watches[wd] = path
+        if recursive:
+            for entry in os.scandir(path):
+                if entry.is_dir(follow_symlinks=False):
+                    self.add(entry.path, recursive=True)
+
+    def read(self, timeout=None):
+        # Returns [(path, mask)] for the events that arrived, or [] after the timeout.
+        # New subdirectories are watched as soon as they show up.
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return []
+            raise
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_len = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+            if wd not in self.watches:
+                continue
+            path = os.path.join(self.watches[wd], os.fsdecode(name))
+            if mask & IN_ISDIR and mask & IN_CREATE:
+                try:
+                    self.add(path, recursive=True)
+                except OSError as e:
+                    logging.warning(f"Could not watch new directory {path}: {e}")
+                # Files written before the watch was added would otherwise be missed
+                for root, _, files in os.walk(path):
+                    events.extend((os.path.join(root, filename), IN_CLOSE_WRITE) for filename in files)
+            events.append((path, mask))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    # Same interface as InotifyWatcher; compares (mtime, size) snapshots every interval
+    def __init__(self, interval=2.0):
+        self.interval = interval
+        self.roots = []
+        self.snapshot = {}
+
+    def add(self, path, recursive=False):
+        self.roots.append((path, recursive))
+        self.snapshot.update(self.scan_root(path, recursive))
+
+    def scan_root(self, path, recursive):
+        snapshot = {}
+        for root, dirs, files in os.walk(path):
+            for filename in files:
+                file_path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+            if not recursive:
+                break
+        return snapshot
+
+    def read(self, timeout=None):
+        time.sleep(self.interval if timeout is None else min(self.interval, timeout))
+        current = {}
+        for path, recursive in self.roots:
+            current.update(self.scan_root(path, recursive))
+        events = [(path, IN_CLOSE_WRITE) for path, stat in current.items() if self.snapshot.get(path) != stat]
+        events += [(path, IN_DELETE) for path in self.snapshot if path not in current]
+        self.snapshot = current
+        return events
+
+    def close(self):
+        pass
+
+
+def create_watcher(poll_interval=2.0):
+    try:
+        return InotifyWatcher()
+    except OSError as e:
+        logging.info(f"inotify unavailable ({e}), polling every {poll_interval}s instead")
+        return PollingWatcher(poll_interval)
@@ -0,0 +1,64 @@
+import os
+import logging
+import threading
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+
+# Defaults for scheduler.job_store in recording_config.json
+DEFAULT_JOB_STORE = {
+    'path': './jobs/scheduler_jobs.sqlite',
+    'misfire_grace_time': 300,  # Seconds late a job may still start, e.g. after a daemon restart
+    'coalesce': True,
+}
+
+
+def job_store_settings(config):
+    settings = dict(DEFAULT_JOB_STORE)
+    settings.update(config.get('scheduler', {}).get('job_store', {}))
+    return settings
+
+
+def create_scheduler(config, table, scheduler_class=BackgroundScheduler, **scheduler_options):
+    # Jobs are kept in SQLite so a restarted daemon picks its schedule back up, including starts
+    # missed by less than the misfire grace time. Job arguments must therefore be plain values
+    # (event IDs and paths), never live objects.
+    settings = job_store_settings(config)
+    path = os.path.abspath(settings['path'])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    logging.info(f"Using job store {path} (table {table}, misfire grace {settings['misfire_grace_time']}s)")
+    return scheduler_class(
+        jobstores={'default': SQLAlchemyJobStore(url=f"sqlite:///{path}", tablename=table)},
+        job_defaults={
+            'misfire_grace_time': settings['misfire_grace_time'],
+            'coalesce': settings['coalesce'],
+            'max_instances': 1,
+        },
+        **scheduler_options
+    )
+
+
+def scan_exports(scheduler, schedule):
+    try:
+        schedule(scheduler)
+    except Exception as e:
+        logging.error(f"Scanning exports for new events failed: {e}")
+        logging.debug("Exception details:", exc_info=True)
+
+
+def start_scheduler(scheduler, schedule, rescan=False):
+    # Start paused so stored jobs load first, then resume them straight away: a restart must not
+    # wait on a scan of the export tree, or a job could miss its grace time. Events exported
+    # while the daemon was down are picked up by a scan in the background, and replace_existing
+    # updates the jobs that are already stored.
+    scheduler.start(paused=True)
+    stored_jobs = len(scheduler.get_jobs())
+    if rescan and stored_jobs:
+        logging.info(f"Dropping {stored_jobs} stored jobs before rescanning exports")
+        scheduler.remove_all_jobs()
+    elif stored_jobs:
+        scheduler.resume()
+        logging.info(f"Resumed {stored_jobs} stored jobs, scanning exports for new events in the background")
+        threading.Thread(target=scan_exports, args=(scheduler, schedule), name="export-scan", daemon=True).start()
+        return
+    schedule(scheduler)
+    scheduler.resume()
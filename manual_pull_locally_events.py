@@ -1,34 +1,177 @@
 import os
+import json
 import shutil
-from datetime import date
+import hashlib
+import argparse
+from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from inotify_watch import create_watcher, IN_CLOSE_WRITE, IN_MOVED_TO
 
 # Source and destination directories
 SOURCE_DIR = '/home/securemeup/workspace/dev-workspace/localdock-to-colab/media/exports'
 DEST_DIR = '/home/securemeup/workspace/dev-workspace/event-scheduler-input-devices/media/exports'
+# No .json suffix: the schedulers load every *.json file under the exports tree
+MANIFEST_NAME = '.sync_manifest'
+
+def file_sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+class EventSync:
+    # Copies only JSON files whose mtime/size (or, with checksum, content) changed since the last sync
+    def __init__(self, source_dir, dest_dir, workers=8, checksum=False):
+        self.source_dir = source_dir
+        self.dest_dir = dest_dir
+        self.workers = workers
+        self.checksum = checksum
+        self.manifest_path = os.path.join(dest_dir, MANIFEST_NAME)
+        self.manifest = self.load_manifest()
+        self.manifest_dirty = False
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_manifest(self):
+        os.makedirs(self.dest_dir, exist_ok=True)
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.manifest_path)
+        self.manifest_dirty = False
+
+    def needs_copy(self, relative, stat):
+        entry = self.manifest.get(relative)
+        if not os.path.exists(os.path.join(self.dest_dir, relative)):
+            return True
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return False
+        if self.checksum and entry and entry.get('sha256') == file_sha256(os.path.join(self.source_dir, relative)):
+            # Touched but unchanged: just record the new stat
+            entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            self.manifest_dirty = True
+            return False
+        return True
+
+    def copy(self, relative):
+        source_file = os.path.join(self.source_dir, relative)
+        dest_file = os.path.join(self.dest_dir, relative)
+        os.makedirs(os.path.dirname(dest_file), exist_ok=True)
+        # Recorded before copying: if the file is rewritten meanwhile, the next pass sees a new stat
+        # and copies it again, instead of the manifest vouching for content that was never copied
+        stat = os.stat(source_file)
+        entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+        if self.checksum:
+            entry['sha256'] = file_sha256(source_file)
+        # Copy then rename so the scheduler never reads a half-written event file
+        temp_file = f"{dest_file}.tmp"
+        shutil.copy2(source_file, temp_file)
+        os.replace(temp_file, dest_file)
+        return relative, entry
+
+    def changed_files(self, date_strs):
+        changed = []
+        for date_str in date_strs:
+            source_path = os.path.join(self.source_dir, date_str)
+            if not os.path.isdir(source_path):
+                continue
+            for entry in os.scandir(source_path):
+                if entry.name.endswith('.json') and entry.is_file():
+                    relative = os.path.join(date_str, entry.name)
+                    if self.needs_copy(relative, entry.stat()):
+                        changed.append(relative)
+        return changed
+
+    def sync_files(self, relatives):
+        copied = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for future in [executor.submit(self.copy, relative) for relative in relatives]:
+                try:
+                    relative, entry = future.result()
+                except OSError as e:
+                    print(f"Failed to copy: {e}")
+                    continue
+                self.manifest[relative] = entry
+                copied.append(relative)
+                print(f"Copied: {os.path.join(self.source_dir, relative)} -> {os.path.join(self.dest_dir, relative)}")
+        # Also saves stat updates for files that were touched but not changed
+        if copied or self.manifest_dirty:
+            self.save_manifest()
+        return copied
+
+    def sync_dates(self, date_strs):
+        return self.sync_files(self.changed_files(date_strs))
+
+    def follow(self, in_range, poll_interval=2.0):
+        # Watches the source tree and copies event files as soon as they are closed after writing
+        watcher = create_watcher(poll_interval)
+        os.makedirs(self.source_dir, exist_ok=True)
+        watcher.add(self.source_dir, recursive=True)
+        print(f"Following {self.source_dir} with {type(watcher).__name__}")
+        try:
+            while True:
+                pending = set()
+                for path, mask in watcher.read(timeout=None):
+                    relative = os.path.relpath(path, self.source_dir)
+                    parts = relative.split(os.sep)
+                    # Creation events arrive while the exporter is still writing; wait for the close or rename
+                    if not mask & (IN_CLOSE_WRITE | IN_MOVED_TO) or len(parts) != 2 or not parts[1].endswith('.json') or not in_range(parts[0]):
+                        continue
+                    if os.path.isfile(path) and self.needs_copy(relative, os.stat(path)):
+                        pending.add(relative)
+                if pending or self.manifest_dirty:
+                    self.sync_files(sorted(pending))
+        finally:
+            watcher.close()
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+def date_range(start, end):
+    return [(start + timedelta(days=offset)).strftime('%Y-%m-%d') for offset in range((end - start).days + 1)]
 
 def copy_json_files():
-    current_date = date.today()
-    date_str = current_date.strftime('%Y-%m-%d')
-    source_path = os.path.join(SOURCE_DIR, date_str)
-    dest_path = os.path.join(DEST_DIR, date_str)
-
-    if os.path.exists(source_path):
-        if not os.path.exists(dest_path):
-            os.makedirs(dest_path)
-
-        for filename in os.listdir(source_path):
-            if filename.endswith('.json'):
-                source_file = os.path.join(source_path, filename)
-                dest_file = os.path.join(dest_path, filename)
-                shutil.copy2(source_file, dest_file)
-                print(f"Copied: {source_file} -> {dest_file}")
-    else:
+    date_str = date.today().strftime('%Y-%m-%d')
+    if not os.path.isdir(os.path.join(SOURCE_DIR, date_str)):
         print(f"No directory found for date: {date_str}")
+        return []
+    return EventSync(SOURCE_DIR, DEST_DIR).sync_dates([date_str])
 
 def main():
-    print("This script will copy JSON files from the local Docker exports to the event-scheduler-input-devices directory for the current day.")
-    copy_json_files()
-    print("File copying complete.")
+    parser = argparse.ArgumentParser(description="Copy exported event JSON files into this project's exports directory")
+    parser.add_argument("--source", default=SOURCE_DIR)
+    parser.add_argument("--dest", default=DEST_DIR)
+    parser.add_argument("--from", dest="start", type=parse_date, help="First date to sync (YYYY-MM-DD, default today)")
+    parser.add_argument("--to", dest="end", type=parse_date, help="Last date to sync (default: same as --from)")
+    parser.add_argument("--workers", type=int, default=8, help="Parallel copies")
+    parser.add_argument("--checksum", action="store_true", help="Compare file hashes when mtime or size changed")
+    parser.add_argument("--follow", action="store_true", help="Keep running and copy new or changed event files as they appear")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="Polling interval when inotify is unavailable")
+    args = parser.parse_args()
+
+    start = args.start or date.today()
+    end = args.end or start
+    if end < start:
+        parser.error("--to must not be before --from")
+
+    sync = EventSync(args.source, args.dest, workers=args.workers, checksum=args.checksum)
+    date_strs = date_range(start, end)
+    copied = sync.sync_dates(date_strs)
+    print(f"Synced {len(copied)} changed file(s) for {date_strs[0]} to {date_strs[-1]}.")
+
+    if args.follow:
+        # Without explicit dates, follow today and anything later as the days roll over
+        if args.start or args.end:
+            in_range = lambda date_str: date_strs[0] <= date_str <= date_strs[-1]
+        else:
+            in_range = lambda date_str: date_str >= date.today().strftime('%Y-%m-%d')
+        try:
+            sync.follow(in_range, args.poll_interval)
+        except KeyboardInterrupt:
+            print("Stopped following.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,87 @@
+import time
+import threading
+
+
+class PeriodicTicker:
+    # Fires on fixed monotonic deadlines, so the time spent handling a tick never shifts the
+    # cadence. While paused the waiting thread sleeps on a condition variable instead of polling.
+    def __init__(self, interval, duration=None, paused=False, skip_missed=True):
+        self.interval = interval
+        self.duration = duration        # Stop by itself this many seconds after the first tick
+        self.skip_missed = skip_missed  # After an overrun, realign to the grid instead of bursting to catch up
+        self.ticks = 0
+        self.missed = 0
+        self._condition = threading.Condition()
+        self._paused = paused
+        self._stopped = False
+        self._origin = None     # Deadlines are origin + n * interval, so rounding never accumulates
+        self._index = 0
+        self._end = None
+
+    @property
+    def paused(self):
+        return self._paused
+
+    @property
+    def stopped(self):
+        return self._stopped
+
+    def pause(self):
+        with self._condition:
+            self._paused = True
+            self._condition.notify_all()
+
+    def resume(self):
+        with self._condition:
+            if self._paused:
+                self._paused = False
+                # Start a fresh cadence rather than firing every tick missed while paused
+                self._origin = None
+                self._condition.notify_all()
+
+    def toggle(self):
+        with self._condition:
+            if self._paused:
+                self.resume()
+            else:
+                self.pause()
+            return not self._paused
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def wait(self):
+        # Blocks until the next tick is due; returns False once the ticker is stopped or expired
+        with self._condition:
+            while True:
+                if self._stopped:
+                    return False
+                if self._paused:
+                    self._condition.wait()
+                    continue
+                now = time.monotonic()
+                if self._origin is None:
+                    self._origin, self._index = now, 0
+                    if self.duration is not None and self._end is None:
+                        self._end = now + self.duration
+                deadline = self._origin + self._index * self.interval
+                if self._end is not None and deadline >= self._end:
+                    self._stopped = True
+                    return False
+                if deadline <= now:
+                    break
+                self._condition.wait(deadline - now)
+
+            self.ticks += 1
+            self._index += 1
+            if self.skip_missed and self._origin + self._index * self.interval <= now:
+                caught_up = int((now - self._origin) // self.interval) + 1
+                self.missed += caught_up - self._index
+                self._index = caught_up
+            return True
+
+    def __iter__(self):
+        while self.wait():
+            yield self.ticks
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import glob
+import json
+import time
+import shlex
+import atexit
+import logging
+import argparse
+import threading
+from config_service import load_config
+
+# Opt-in: with tracing.enabled the scheduler records spans per event and hands the trace
+# directory and event ID to every process it launches through these environment variables.
+# Each process appends to its own JSON-lines file; merge_trace() turns them into one
+# Chrome trace-event file that chrome://tracing or ui.perfetto.dev can open.
+DEFAULT_TRACING = {
+    'enabled': False,
+    'directory': './logs/traces',
+}
+
+TRACE_DIR_ENV = 'CAPTURE_TRACE_DIR'
+TRACE_ID_ENV = 'CAPTURE_TRACE_ID'
+
+
+def tracing_settings(config):
+    settings = dict(DEFAULT_TRACING)
+    settings.update(config.get('tracing', {}))
+    return settings
+
+
+def trace_environment(config, trace_id):
+    settings = tracing_settings(config)
+    if not settings['enabled']:
+        return {}
+    return {TRACE_DIR_ENV: os.path.abspath(settings['directory']), TRACE_ID_ENV: trace_id}
+
+
+def env_prefix(environment):
+    # For commands that go through a shell, such as tmux sessions
+    return ''.join(f"{key}={shlex.quote(value)} " for key, value in environment.items())
+
+
+def now_us():
+    # Wall-clock microseconds so spans from different processes line up
+    return time.time_ns() // 1000
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class NullTracer:
+    enabled = False
+
+    def span(self, name, category='capture', **args):
+        return NULL_SPAN
+
+    def instant(self, name, category='capture', **args):
+        pass
+
+    def close(self):
+        pass
+
+
+class _Span:
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args['error'] = repr(exc)
+        self.tracer.complete(self.name, self.category, self.start, now_us() - self.start, self.args)
+        return False
+
+
+class Tracer:
+    enabled = True
+
+    def __init__(self, directory, trace_id, process_name):
+        self.trace_dir = os.path.join(directory, trace_id)
+        os.makedirs(self.trace_dir, exist_ok=True)
+        self.pid = os.getpid()
+        self.path = os.path.join(self.trace_dir, f"{process_name}_{self.pid}.jsonl")
+        self.lock = threading.Lock()
+        self.file = open(self.path, 'a', buffering=1 << 16)
+        self.threads = set()
+        self._write({'ph': 'M', 'name': 'process_name', 'pid': self.pid, 'tid': 0, 'args': {'name': process_name}})
+
+    def _write(self, record):
+        line = json.dumps(record, default=str) + '\n'
+        with self.lock:
+            if self.file is not None:
+                self.file.write(line)
+
+    def _thread_id(self):
+        tid = threading.get_native_id()
+        if tid not in self.threads:
+            self.threads.add(tid)
+            self._write({'ph': 'M', 'name': 'thread_name', 'pid': self.pid, 'tid': tid, 'args': {'name': threading.current_thread().name}})
+        return tid
+
+    def span(self, name, category='capture', **args):
+        return _Span(self, name, category, args)
+
+    def complete(self, name, category, start_us, duration_us, args=None):
+        self._write({'ph': 'X', 'name': name, 'cat': category, 'ts': start_us, 'dur': duration_us, 'pid': self.pid, 'tid': self._thread_id(), 'args': args or {}})
+
+    def instant(self, name, category='capture', **args):
+        self._write({'ph': 'i', 's': 't', 'name': name, 'cat': category, 'ts': now_us(), 'pid': self.pid, 'tid': self._thread_id(), 'args': args})
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+def open_tracer(config, trace_id, process_name):
+    # For the scheduler, which traces many events from one process
+    settings = tracing_settings(config)
+    if not settings['enabled']:
+        return NullTracer()
+    try:
+        return Tracer(os.path.abspath(settings['directory']), trace_id, process_name)
+    except OSError as e:
+        logging.warning(f"Tracing disabled for {trace_id}: {e}")
+        return NullTracer()
+
+
+_current = None
+
+
+def current_tracer():
+    # For recorder processes: tracing is on when the scheduler passed a trace directory down
+    global _current
+    if _current is None:
+        directory, trace_id = os.environ.get(TRACE_DIR_ENV), os.environ.get(TRACE_ID_ENV)
+        _current = NullTracer()
+        if directory and trace_id:
+            try:
+                _current = Tracer(directory, trace_id, os.path.splitext(os.path.basename(sys.argv[0]))[0] or 'python')
+                atexit.register(_current.close)
+            except OSError as e:
+                logging.warning(f"Tracing disabled: {e}")
+    return _current
+
+
+def merge_trace(trace_dir):
+    # Later runs overwrite the merged file, so it can be rebuilt as more processes finish
+    events = []
+    for path in sorted(glob.glob(os.path.join(glob.escape(trace_dir), '*.jsonl'))):
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    # The last line of a process that was killed mid-write
+                    continue
+    events.sort(key=lambda event: (event.get('ts', 0), event['ph'] != 'M'))
+    output = f"{trace_dir.rstrip(os.sep)}.json"
+    temp_path = f"{output}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+    os.replace(temp_path, output)
+    return output
+
+
+def merge_current():
+    # Called by the last stage of a pipeline once its own spans are flushed
+    tracer = current_tracer()
+    if tracer.enabled:
+        tracer.close()
+        try:
+            logging.info(f"Trace written to {merge_trace(tracer.trace_dir)}")
+        except OSError as e:
+            logging.warning(f"Failed to merge trace {tracer.trace_dir}: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge per-process capture traces into Chrome trace-event JSON")
+    parser.add_argument("trace_ids", nargs="*", help="Event IDs to merge (default: list the available traces)")
+    parser.add_argument("--directory", help="Trace directory (default: tracing.directory)")
+    args = parser.parse_args()
+
+    directory = args.directory or tracing_settings(load_config())['directory']
+    if not args.trace_ids:
+        traces = sorted(name for name in os.listdir(directory) if os.path.isdir(os.path.join(directory, name))) if os.path.isdir(directory) else []
+        print('\n'.join(traces) if traces else f"No traces in {directory}")
+        sys.exit(0)
+    for trace_id in args.trace_ids:
+        trace_dir = os.path.join(directory, trace_id)
+        if not os.path.isdir(trace_dir):
+            sys.exit(f"No trace for {trace_id} in {directory}")
+        print(merge_trace(trace_dir))
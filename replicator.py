@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+import threading
+from config_service import load_config
+
+# Defaults for storage in recording_config.json. In "tiered" mode recorders only write to the
+# primary (local) output directory and finished files are queued for copying to the others.
+DEFAULT_STORAGE = {
+    'mode': 'direct',                   # direct or tiered
+    'primary': None,                    # Defaults to the first output directory
+    'spool_dir': './jobs/replication_spool',
+    'rate_limit_mb_s': 8,               # 0 disables the limit
+    'chunk_kb': 1024,
+    'verify': True,                     # Re-read each copy and compare checksums before publishing it
+    'poll_interval': 10,
+    'retry_delay': 60,
+}
+
+
+def storage_settings(config):
+    settings = dict(DEFAULT_STORAGE)
+    settings.update(config.get('storage', {}))
+    if settings['mode'] not in ('direct', 'tiered'):
+        raise ValueError(f"Unsupported storage mode: {settings['mode']}")
+    return settings
+
+
+def primary_directory(config):
+    settings = storage_settings(config)
+    return os.path.abspath(settings['primary'] or config['output_directories'][0])
+
+
+def recording_directories(config):
+    # Where recorders write: every output directory, or only the primary one in tiered mode
+    if storage_settings(config)['mode'] != 'tiered':
+        return config.get('output_directories', [])
+    return [primary_directory(config)]
+
+
+def secondary_directories(config):
+    primary = primary_directory(config)
+    return [os.path.abspath(path) for path in config.get('output_directories', []) if os.path.abspath(path) != primary]
+
+
+def write_json_atomic(path, data):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(temp_path, path)
+
+
+def enqueue_replication(config, paths):
+    # Called by recorders once a file is complete; a no-op outside tiered mode
+    settings = storage_settings(config)
+    if settings['mode'] != 'tiered':
+        return []
+    primary = primary_directory(config)
+    destinations = secondary_directories(config)
+    spool_dir = os.path.abspath(settings['spool_dir'])
+    os.makedirs(spool_dir, exist_ok=True)
+
+    queued = []
+    for path in paths:
+        source = os.path.abspath(path)
+        relative = os.path.relpath(source, primary)
+        if relative.startswith(os.pardir):
+            logging.warning(f"Not replicating {source}: outside the primary directory {primary}")
+            continue
+        name = f"{time.time_ns()}_{hashlib.sha1(source.encode()).hexdigest()[:8]}.json"
+        write_json_atomic(os.path.join(spool_dir, name), {
+            'source': source,
+            'relative': relative,
+            'destinations': destinations,
+            'attempts': 0,
+            'next_attempt': 0,
+        })
+        queued.append(source)
+        logging.info(f"Queued {relative} for replication to {len(destinations)} destination(s)")
+    return queued
+
+
+def file_sha256(path, chunk_size):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return digest.hexdigest()
+            digest.update(chunk)
+
+
+def copy_file(source, destination, settings, stop_event=None):
+    # Copies into <destination>.part, resuming after whatever an earlier attempt left there.
+    # The source checksum is computed in the same pass, so the local file is read only once.
+    chunk_size = settings['chunk_kb'] * 1024
+    rate_limit = settings['rate_limit_mb_s'] * 1024 * 1024
+    part_path = f"{destination}.part"
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+
+    resume_from = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    if resume_from > os.path.getsize(source):
+        resume_from = 0
+    digest = hashlib.sha256()
+    copied = 0
+    started = time.monotonic()
+    with open(source, 'rb') as src, open(part_path, 'r+b' if resume_from else 'wb') as dst:
+        remaining = resume_from
+        while remaining:
+            chunk = src.read(min(chunk_size, remaining))
+            digest.update(chunk)
+            remaining -= len(chunk)
+        dst.seek(resume_from)
+        dst.truncate()
+        while True:
+            chunk = src.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+            dst.write(chunk)
+            copied += len(chunk)
+            if stop_event is not None and stop_event.is_set():
+                # The partial copy stays in place and the next attempt resumes from it
+                raise InterruptedError(f"Stopped copying {source} at {resume_from + copied} bytes")
+            if rate_limit:
+                ahead = copied / rate_limit - (time.monotonic() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+        dst.flush()
+        os.fsync(dst.fileno())
+
+    checksum = digest.hexdigest()
+    if settings['verify'] and file_sha256(part_path, chunk_size) != checksum:
+        os.remove(part_path)
+        raise IOError(f"Checksum mismatch copying {source} to {destination}")
+    os.replace(part_path, destination)
+    if resume_from:
+        logging.info(f"Resumed {destination} at {resume_from} bytes")
+    return checksum
+
+
+class Replicator:
+    # Drains the spool directory; safe to run as a thread in the scheduler or as its own process
+    def __init__(self, config):
+        self.settings = storage_settings(config)
+        self.spool_dir = os.path.abspath(self.settings['spool_dir'])
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def pending(self):
+        if not os.path.isdir(self.spool_dir):
+            return []
+        return sorted(os.path.join(self.spool_dir, name) for name in os.listdir(self.spool_dir) if name.endswith('.json'))
+
+    def process_entry(self, entry_path):
+        with open(entry_path, 'r') as f:
+            entry = json.load(f)
+        if entry['next_attempt'] > time.time():
+            return False
+        if not os.path.exists(entry['source']):
+            logging.error(f"Replication source {entry['source']} is gone, dropping {os.path.basename(entry_path)}")
+            os.remove(entry_path)
+            return False
+
+        remaining = []
+        for destination_dir in entry['destinations']:
+            destination = os.path.join(destination_dir, entry['relative'])
+            try:
+                started = time.monotonic()
+                checksum = copy_file(entry['source'], destination, self.settings, self.stop_event)
+                logging.info(f"Replicated {entry['relative']} to {destination_dir} in {time.monotonic() - started:.1f}s (sha256 {checksum[:12]})")
+            except InterruptedError as e:
+                logging.info(str(e))
+                remaining.append(destination_dir)
+            except Exception as e:
+                logging.error(f"Failed to replicate {entry['relative']} to {destination_dir}: {e}")
+                remaining.append(destination_dir)
+
+        if not remaining:
+            os.remove(entry_path)
+            return True
+        entry['destinations'] = remaining
+        entry['attempts'] += 1
+        entry['next_attempt'] = time.time() + self.settings['retry_delay'] * min(entry['attempts'], 10)
+        write_json_atomic(entry_path, entry)
+        return False
+
+    def run_once(self):
+        replicated = 0
+        for entry_path in self.pending():
+            if self.stop_event.is_set():
+                break
+            try:
+                replicated += self.process_entry(entry_path)
+            except Exception as e:
+                logging.error(f"Failed to process replication entry {entry_path}: {e}")
+                logging.debug("Exception details:", exc_info=True)
+        return replicated
+
+    def run(self):
+        logging.info(f"Replicator watching {self.spool_dir}")
+        while not self.stop_event.is_set():
+            self.run_once()
+            self.stop_event.wait(self.settings['poll_interval'])
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="replicator", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+
+def start_replicator(config):
+    if storage_settings(config)['mode'] != 'tiered':
+        return None
+    return Replicator(config).start()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Copy finished recordings from the primary output directory to the others")
+    parser.add_argument("--once", action="store_true", help="Process the queue once and exit")
+    parser.add_argument("--enqueue", nargs="+", metavar="FILE", help="Queue existing files under the primary directory")
+    args = parser.parse_args()
+
+    config = load_config()
+    if storage_settings(config)['mode'] != 'tiered':
+        logging.warning("storage.mode is not 'tiered'; recorders are writing every destination directly")
+    if args.enqueue:
+        settings = dict(config.get('storage', {}), mode='tiered')
+        enqueue_replication(dict(config, storage=settings), args.enqueue)
+
+    replicator = Replicator(config)
+    if args.once:
+        replicator.run_once()
+        sys.exit(1 if replicator.pending() else 0)
+    try:
+        replicator.run()
+    except KeyboardInterrupt:
+        replicator.stop()
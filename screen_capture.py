@@ -1,18 +1,39 @@
 #!/usr/bin/env python3
 
-import pyautogui
 import time
 import os
 import sys
+from image_encoder import ImageEncoder, encoding_settings, EXTENSIONS
+from screen_timeline import TimelineWriter, TimelineSink
+from capture_backends import screen_backend
+from periodic_ticker import PeriodicTicker
+from capture_metrics import start_metrics
+from pipeline_trace import current_tracer
+from config_service import load_config
 
 def capture_screen(output_dir, duration, interval):
-    start_time = time.time()
+    config = load_config()
+    settings = encoding_settings(config)
+    screen = screen_backend(config)
+    sink = None
+    if config.get('screen_capture', {}).get('storage', 'images') == 'timeline':
+        # One seekable container per event instead of a file per screenshot
+        sink = TimelineSink([TimelineWriter(os.path.join(output_dir, "screen.timeline"), EXTENSIONS[settings['codec']])])
     count = 0
-    while time.time() - start_time < duration:
-        screenshot = pyautogui.screenshot()
-        screenshot.save(os.path.join(output_dir, f"screenshot_{count:06d}.png"))
-        count += 1
-        time.sleep(interval)
+    trace = current_tracer()
+    ticker = PeriodicTicker(interval, duration=duration)
+    with start_metrics(config, f"screen_{os.path.basename(os.path.normpath(output_dir))}_{os.getpid()}") as metrics, ImageEncoder(settings, sink=sink) as encoder:
+        screen_metrics = metrics.stream('screen')
+        screen_metrics.set_gauge('missed_ticks', lambda: ticker.missed)
+        screen_metrics.set_gauge('encoder_dropped', lambda: encoder.dropped)
+        screen_metrics.set_gauge('encoder_queue_depth', encoder.queue.qsize)
+        for _ in ticker:
+            captured_at = time.time()
+            with screen_metrics.timed('grab_latency'), trace.span('grab'):
+                screenshot = screen.screenshot()
+            encoder.submit(screenshot, [os.path.join(output_dir, f"screenshot_{count:06d}")], timestamp=captured_at)
+            screen_metrics.increment('frames_grabbed')
+            count += 1
 
 if __name__ == "__main__":
     if len(sys.argv) != 4:
@@ -5,12 +5,15 @@ import json
 from datetime import datetime, timedelta
 import sys
 import logging
-from logging.handlers import RotatingFileHandler
 import argparse
-from apscheduler.schedulers.background import BackgroundScheduler
 import time
 import psutil
 import subprocess
+from capture_kinds import build_single_capture_command
+from job_store import create_scheduler, start_scheduler
+from event_model import Event, local_now
+from structured_logging import setup_logging
+from config_service import load_config, watch_config, ConfigError
 
 # Configuration
 CONFIG = {
@@ -18,26 +21,10 @@ CONFIG = {
     'CHECK_INTERVAL': 60,
     'MIN_DISK_SPACE': 1000000000,  # 1 GB in bytes
     'MAX_CPU_USAGE': 90,  # 90%
+    'SINGLE_CAPTURE': False,  # One x11grab per event, fanned out to every output directory
 }
 
-# Ensure the logs directory exists
-if not os.path.exists('./logs/'):
-    os.makedirs('./logs/')
-
-# Configure logging with rotation
-log_handler = RotatingFileHandler('./logs/screen_capture_log.txt', maxBytes=10000000, backupCount=5)
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        log_handler,
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-
-def load_config():
-    with open('recording_config.json', 'r') as f:
-        return json.load(f)
+setup_logging('screen_capture_log.txt')
 
 def load_events(batch_size=100):
     export_dir = os.path.abspath(os.path.join('.', 'media', 'exports'))
@@ -54,15 +41,14 @@ def load_events(batch_size=100):
             if file.endswith('.json'):
                 file_path = os.path.join(root, file)
                 try:
-                    with open(file_path, 'r') as f:
-                        event = json.load(f)
-                    event['title'] = event['title'].strip().replace(' ', '_')
-                    batch.append(event)
+                    batch.append(Event.load(file_path))
                     if len(batch) >= batch_size:
                         yield batch
                         batch = []
                 except json.JSONDecodeError as e:
                     logging.error(f"Error decoding JSON from {file_path}: {e}")
+                except ValueError as e:
+                    logging.error(f"Invalid event in {file_path}: {e}")
                 except Exception as e:
                     logging.error(f"Unexpected error loading {file_path}: {e}")
         if batch:
@@ -79,62 +65,86 @@ def check_system_resources():
         return False
     return True
 
-def run_screen_capture(event):
+def run_single_screen_capture(event, duration, config):
+    screen_config = config['screen_capture']
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_paths = []
+    for output_dir in config['output_directories']:
+        event_dir = os.path.join(output_dir, 'screen_captures', event.title)
+        os.makedirs(event_dir, exist_ok=True)
+        output_paths.append(os.path.join(event_dir, f"{event.title}_{timestamp}.{screen_config.get('output_format', 'mp4')}"))
+
+    capture_command = build_single_capture_command(screen_config, output_paths, duration)
+    logging.debug(f"Screen capture command: {capture_command}")
+    subprocess.Popen(capture_command, stdin=subprocess.DEVNULL)
+    logging.info(f"Started single screen capture for event: {event.title} writing to: {', '.join(output_paths)}")
+
+def run_screen_capture(event_id, event_path):
+    # Jobs carry only the event ID and its export path so they can live in the persistent job store
     try:
-        start_time = datetime.strptime(f"{event['start_date']} {event['start_time']}", "%Y-%m-%d %H:%M:%S")
-        end_time = datetime.strptime(f"{event['end_date']} {event['end_time']}", "%Y-%m-%d %H:%M:%S")
-        duration = (end_time - start_time).total_seconds()
+        event = Event.load(event_path)
+    except Exception as e:
+        logging.error(f"Could not load event {event_id} from {event_path}: {e}")
+        return
+
+    try:
+        duration = event.remaining()
         logging.debug(f"Event duration calculated: {duration} seconds")
 
         config = load_config()
+        if CONFIG['SINGLE_CAPTURE'] or config['screen_capture'].get('single_capture', False):
+            run_single_screen_capture(event, duration, config)
+            return
+
         output_directories = config['output_directories']
 
         for output_dir in output_directories:
-            event_dir = os.path.join(output_dir, 'screen_captures', event['title'])
+            event_dir = os.path.join(output_dir, 'screen_captures', event.title)
             os.makedirs(event_dir, exist_ok=True)
 
             # Start screen capture process
-            capture_command = f"python3 ffmpeg_screen_capture.py {event_dir} {duration} {event['title']}"
+            capture_command = f"python3 ffmpeg_screen_capture.py {event_dir} {duration} {event.title}"
             subprocess.Popen(capture_command, shell=True)
 
-            logging.info(f"Started screen capture for event: {event['title']} in directory: {event_dir}")
+            logging.info(f"Started screen capture for event: {event.title} in directory: {event_dir}")
 
     except Exception as e:
-        logging.error(f"Error running screen capture for event '{event['title']}': {e}")
+        logging.error(f"Error running screen capture for event '{event.title}': {e}")
         logging.debug("Exception details:", exc_info=True)
 
-def schedule_events():
-    scheduler = BackgroundScheduler()
-    current_time = datetime.now()
+def schedule_events(scheduler):
+    current_time = local_now()
     scheduled_count = 0
 
     for batch in load_events():
-        for event in sorted(batch, key=lambda x: datetime.strptime(f"{x['start_date']} {x['start_time']}", "%Y-%m-%d %H:%M:%S")):
-            start_time = datetime.strptime(f"{event['start_date']} {event['start_time']}", "%Y-%m-%d %H:%M:%S")
-            if start_time < current_time:
+        for event in sorted(batch, key=lambda event: event.start):
+            if event.start < current_time:
                 continue
 
             scheduler.add_job(
                 run_screen_capture,
                 'date',
-                run_date=start_time,
-                args=[event],
-                id=event['title'] + "_" + start_time.strftime("%Y%m%d_%H%M%S")
+                run_date=event.start,
+                args=[event.event_id, event.source_path],
+                id=event.event_id,
+                replace_existing=True
             )
-            logging.info(f"Scheduled screen capture for '{event['title']}' at {start_time}")
+            logging.info(f"Scheduled screen capture for '{event.title}' at {event.start}")
 
             scheduled_count += 1
             if scheduled_count >= CONFIG['EVENT_LIMIT']:
                 logging.info(f"Reached scheduled events limit of {CONFIG['EVENT_LIMIT']}")
-                return scheduler, scheduled_count
+                return scheduled_count
 
     logging.info(f"Total events scheduled: {scheduled_count}")
-    return scheduler, scheduled_count
+    return scheduled_count
 
 def main(args):
     logging.info("Starting screen capture scheduler")
-    scheduler, scheduled_count = schedule_events()
-    scheduler.start()
+    # Destination edits apply from the next event on
+    watch_config()
+    scheduler = create_scheduler(load_config(), 'screen_jobs')
+    start_scheduler(scheduler, schedule_events, rescan=args.rescan)
     logging.info("Scheduler started. Waiting for events...")
 
     try:
@@ -151,11 +161,19 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Screen Capture Scheduler")
     parser.add_argument("--event-limit", type=int, help="Maximum number of events to schedule")
     parser.add_argument("--check-interval", type=int, help="Interval to check for completed events (seconds)")
+    parser.add_argument("--rescan", action="store_true", help="Drop the stored jobs and rebuild the schedule from the export tree")
+    parser.add_argument("--single-capture", action="store_true", help="Grab the screen once per event and write every output directory from it")
     args = parser.parse_args()
 
     if args.event_limit:
         CONFIG['EVENT_LIMIT'] = args.event_limit
     if args.check_interval:
         CONFIG['CHECK_INTERVAL'] = args.check_interval
+    if args.single_capture:
+        CONFIG['SINGLE_CAPTURE'] = True
+    try:
+        load_config()
+    except ConfigError as e:
+        sys.exit(str(e))
 
     main(args)
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import mmap
+import struct
+import hashlib
+import threading
+import logging
+import argparse
+from datetime import datetime
+
+# A timeline is two files per event:
+#   <name>.timeline      container magic followed by encoded frames, back to back
+#   <name>.timeline.idx  index header followed by fixed-size records, one per captured frame
+# Index records are (timestamp, offset, length, flags). A frame identical to the previous
+# keyframe is not stored again; its record points at that keyframe with the flag cleared.
+CONTAINER_MAGIC = b'SCRTL\x00\x01\x00'
+INDEX_MAGIC = b'SCRIDX\x00\x01'
+INDEX_HEADER = struct.Struct('<8s8s')  # magic, image extension
+INDEX_RECORD = struct.Struct('<dQIB3x')  # timestamp, offset, length, flags
+FLAG_KEYFRAME = 1
+
+
+def index_path(timeline_path):
+    return f"{timeline_path}.idx"
+
+
+class TimelineWriter:
+    def __init__(self, path, extension):
+        self.path = path
+        self.extension = extension
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.container = open(path, 'ab')
+        self.index = open(index_path(path), 'ab')
+        if self.container.tell() == 0:
+            self.container.write(CONTAINER_MAGIC)
+        if self.index.tell() == 0:
+            self.index.write(INDEX_HEADER.pack(INDEX_MAGIC, extension.encode('ascii')))
+        self.offset = self.container.tell()
+        self.last_keyframe = None  # (digest, offset, length)
+        self.last_timestamp = None
+        self.frames = 0
+
+    def append(self, timestamp, data):
+        if self.last_timestamp is not None and timestamp < self.last_timestamp:
+            raise ValueError(f"Timeline frames must be appended in time order ({timestamp} < {self.last_timestamp})")
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        if self.last_keyframe and self.last_keyframe[0] == digest:
+            _, offset, length = self.last_keyframe
+            flags = 0
+        else:
+            offset, length = self.offset, len(data)
+            self.container.write(data)
+            self.container.flush()
+            self.offset += length
+            self.last_keyframe = (digest, offset, length)
+            flags = FLAG_KEYFRAME
+        # The container is flushed first so the index never points past written data
+        self.index.write(INDEX_RECORD.pack(timestamp, offset, length, flags))
+        self.index.flush()
+        self.last_timestamp = timestamp
+        self.frames += 1
+
+    def close(self):
+        self.container.close()
+        self.index.close()
+        logging.info(f"Timeline closed: {self.path} ({self.frames} frames appended)")
+
+
+class TimelineSink:
+    # Encoder workers finish out of order; frames are released to the writers in submission order
+    def __init__(self, writers):
+        self.writers = writers
+        self.pending = {}
+        self.next_seq = 0
+        self._lock = threading.Lock()
+
+    def write(self, seq, timestamp, data):
+        # data is None when encoding failed; the sequence slot is still consumed
+        with self._lock:
+            self.pending[seq] = (timestamp, data)
+            while self.next_seq in self.pending:
+                timestamp, data = self.pending.pop(self.next_seq)
+                self.next_seq += 1
+                if data is None:
+                    continue
+                for writer in self.writers:
+                    try:
+                        writer.append(timestamp, data)
+                    except Exception as e:
+                        logging.error(f"Failed to append frame to timeline {writer.path}: {e}")
+
+    def close(self):
+        for writer in self.writers:
+            writer.close()
+
+
+class TimelineReader:
+    def __init__(self, path):
+        self.path = path
+        self.container = open(path, 'rb')
+        if self.container.read(len(CONTAINER_MAGIC)) != CONTAINER_MAGIC:
+            raise ValueError(f"Not a screen timeline: {path}")
+        with open(index_path(path), 'rb') as f:
+            header = f.read(INDEX_HEADER.size)
+            magic, extension = INDEX_HEADER.unpack(header)
+            if magic != INDEX_MAGIC:
+                raise ValueError(f"Not a screen timeline index: {index_path(path)}")
+            self.extension = extension.rstrip(b'\x00').decode('ascii')
+            size = os.fstat(f.fileno()).st_size
+            # A trailing partial record (crash mid-write) is ignored
+            self.count = (size - INDEX_HEADER.size) // INDEX_RECORD.size
+            self.index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.count else None
+
+    def __len__(self):
+        return self.count
+
+    def entry(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        timestamp, offset, length, flags = INDEX_RECORD.unpack_from(self.index, INDEX_HEADER.size + i * INDEX_RECORD.size)
+        return timestamp, offset, length, bool(flags & FLAG_KEYFRAME)
+
+    def timestamp(self, i):
+        return struct.unpack_from('<d', self.index, INDEX_HEADER.size + i * INDEX_RECORD.size)[0]
+
+    def find(self, timestamp):
+        # Binary search straight over the mapped index: last frame captured at or before timestamp
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamp(mid) <= timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo - 1 if lo else None
+
+    def read(self, i):
+        timestamp, offset, length, _ = self.entry(i)
+        self.container.seek(offset)
+        return timestamp, self.container.read(length)
+
+    def frame_at(self, timestamp):
+        i = self.find(timestamp)
+        if i is None:
+            return None
+        return self.read(i)
+
+    def frames(self, keyframes_only=False):
+        for i in range(self.count):
+            timestamp, offset, length, keyframe = self.entry(i)
+            if keyframes_only and not keyframe:
+                continue
+            self.container.seek(offset)
+            yield timestamp, self.container.read(length)
+
+    def close(self):
+        if self.index is not None:
+            self.index.close()
+        self.container.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def frame_filename(timestamp, extension):
+    # Microsecond resolution so exported names never collide within a second
+    return f"{datetime.fromtimestamp(timestamp).strftime('%Y%m%d_%H%M%S_%f')}.{extension}"
+
+
+def export_images(timeline_path, output_dir, keyframes_only=False):
+    os.makedirs(output_dir, exist_ok=True)
+    exported = 0
+    with TimelineReader(timeline_path) as reader:
+        for timestamp, data in reader.frames(keyframes_only=keyframes_only):
+            with open(os.path.join(output_dir, frame_filename(timestamp, reader.extension)), 'wb') as f:
+                f.write(data)
+            exported += 1
+    logging.info(f"Exported {exported} frames from {timeline_path} to {output_dir}")
+    return exported
+
+
+def parse_time(value):
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Inspect and export screen timelines")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    info_parser = subparsers.add_parser("info", help="Show frame count and time span")
+    info_parser.add_argument("timeline")
+
+    at_parser = subparsers.add_parser("at", help="Write the frame on screen at a given time")
+    at_parser.add_argument("timeline")
+    at_parser.add_argument("time", help="Epoch seconds or ISO datetime (e.g. 2024-07-25T10:15:00)")
+    at_parser.add_argument("output", help="Output image path")
+
+    export_parser = subparsers.add_parser("export", help="Export frames back to individual images")
+    export_parser.add_argument("timeline")
+    export_parser.add_argument("output_dir")
+    export_parser.add_argument("--keyframes-only", action="store_true", help="Skip frames identical to the previous one")
+
+    args = parser.parse_args()
+
+    if args.command == "info":
+        with TimelineReader(args.timeline) as reader:
+            if not len(reader):
+                print(f"{args.timeline}: empty")
+                sys.exit(0)
+            keyframes = sum(1 for i in range(len(reader)) if reader.entry(i)[3])
+            first, last = reader.timestamp(0), reader.timestamp(len(reader) - 1)
+            print(f"{args.timeline}: {len(reader)} frames ({keyframes} keyframes), {reader.extension}")
+            print(f"From {datetime.fromtimestamp(first)} to {datetime.fromtimestamp(last)}")
+    elif args.command == "at":
+        with TimelineReader(args.timeline) as reader:
+            frame = reader.frame_at(parse_time(args.time))
+        if frame is None:
+            print(f"No frame captured at or before {args.time}")
+            sys.exit(1)
+        timestamp, data = frame
+        with open(args.output, 'wb') as f:
+            f.write(data)
+        print(f"Frame captured at {datetime.fromtimestamp(timestamp)} written to {args.output}")
+    else:
+        export_images(args.timeline, args.output_dir, keyframes_only=args.keyframes_only)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import copy
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+
+# Recorders configure file logging under ./logs at import time
+os.makedirs('./logs/', exist_ok=True)
+os.environ['CAPTURE_BACKEND'] = 'synthetic'
+
+from ubuntu_create_local_singular_video_recording import record_video_and_audio, load_config
+from ubuntu_create_local_singular_audio_recording import record_audio
+from combine_audio_video import combine_audio_video
+
+
+def stress_config(output_dir, args):
+    # The loaded configuration is shared with the recorders, so adjust a copy
+    config = copy.deepcopy(load_config())
+    config['output_directories'] = [output_dir]
+    config['capture_backend'] = {
+        'type': 'synthetic',
+        'synthetic': {
+            'width': args.width,
+            'height': args.height,
+            'fps': args.fps,
+            'audio_source': args.audio_source,
+            'realtime': not args.unpaced,
+        },
+    }
+    return config
+
+
+def run_stress(args):
+    output_dir = tempfile.mkdtemp(prefix="capture_stress_")
+    config = stress_config(output_dir, args)
+    results = {}
+
+    def run_video():
+        started = time.perf_counter()
+        results['video'] = record_video_and_audio(args.duration, "stress_video", config)
+        results['video_wall_s'] = time.perf_counter() - started
+
+    def run_audio():
+        started = time.perf_counter()
+        results['audio'] = record_audio(args.duration, "stress_audio", config)
+        results['audio_wall_s'] = time.perf_counter() - started
+
+    # Video and audio-only recorders run side by side as they do under the scheduler
+    threads = [threading.Thread(target=run_video), threading.Thread(target=run_audio)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    report = {'width': args.width, 'height': args.height, 'fps': args.fps, 'duration_s': args.duration, 'paced': not args.unpaced}
+    for recording in results.get('video', []):
+        expected = int(args.fps * args.duration)
+        report.update({
+            'frames_written': recording['frames'],
+            'frames_expected': expected,
+            'frames_dropped': max(0, expected - recording['frames']) if not args.unpaced else None,
+            'write_fps': round(recording['frames'] / results['video_wall_s'], 2),
+            'video_bytes': os.path.getsize(recording['video_file']),
+            'audio_bytes': os.path.getsize(recording['audio_file']),
+        })
+        if not args.skip_combine:
+            combined = os.path.join(output_dir, "combined_stress.mp4")
+            started = time.perf_counter()
+            combine_audio_video(recording['video_file'], recording['audio_file'], combined)
+            report['combine_s'] = round(time.perf_counter() - started, 2)
+            report['combined_bytes'] = os.path.getsize(combined)
+    for audio_file in results.get('audio', []):
+        report['audio_only_bytes'] = os.path.getsize(audio_file)
+    report['video_wall_s'] = round(results.get('video_wall_s', 0), 2)
+    report['audio_wall_s'] = round(results.get('audio_wall_s', 0), 2)
+
+    if args.keep:
+        report['output_dir'] = output_dir
+    else:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stress the record -> write -> combine path with synthetic capture backends")
+    parser.add_argument("--duration", type=float, default=30, help="Recording length in seconds")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--audio-source", choices=['tone', 'noise'], default='tone')
+    parser.add_argument("--unpaced", action="store_true", help="Generate frames as fast as possible to find the pipeline ceiling")
+    parser.add_argument("--skip-combine", action="store_true")
+    parser.add_argument("--keep", action="store_true", help="Keep the recorded files")
+    args = parser.parse_args()
+
+    report = run_stress(args)
+    print(json.dumps(report, indent=2))
+    if report.get('frames_dropped'):
+        sys.exit(2)
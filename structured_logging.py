@@ -0,0 +1,194 @@
+import os
+import sys
+import copy
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+import config_service
+
+# Overridden by the "logging" block in recording_config.json
+DEFAULT_LOGGING = {
+    'level': 'DEBUG',
+    'log_dir': './logs',       # Relative paths are taken from the scripts' directory, not the cwd
+    'file_format': 'json',    # One JSON object per line in the log files
+    'console_format': 'text',
+    'max_bytes': 10000000,
+    'backup_count': 5,
+    'queue_size': 10000,       # Records beyond this are dropped rather than blocking the caller
+    'rate_limit_interval_s': 10,
+    'rate_limit_burst': 5,     # Per call site and interval; the rest are counted and summarised
+}
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else was passed through extra= and goes into the JSON
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+_listener = None
+
+
+def load_config():
+    # Logging has to come up even when the configuration is broken, so it can report that
+    try:
+        return config_service.load_config()
+    except (OSError, ValueError):
+        return {}
+
+
+def logging_settings(config):
+    settings = dict(DEFAULT_LOGGING)
+    settings.update(config.get('logging', {}))
+    return settings
+
+
+class RateLimitFilter(logging.Filter):
+    # Keyed by call site rather than message text, since the messages are f-strings and a
+    # repeating warning usually differs only in the numbers it carries
+    def __init__(self, interval, burst):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._windows = {}
+
+    def filter(self, record):
+        if record.levelno >= logging.CRITICAL:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+            elif window[1] < self.burst:
+                window[1] += 1
+                suppressed = 0
+            else:
+                window[2] += 1
+                return False
+        if suppressed:
+            record.suppressed = suppressed
+            record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+            'process': record.process,
+            'thread': record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key not in entry:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+    def formatTime(self, record, datefmt=None):
+        return time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created)) + f".{int(record.msecs):03d}"
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    # The default handler reports a full queue through handleError on every record; here the
+    # record is just dropped and counted, so a stalled disk never stalls a capture loop
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # Resolve the message and traceback in the caller so the record pickles and its args
+        # cannot change under the listener, but keep the traceback out of the message itself
+        message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record = copy.copy(record)
+        record.message = record.msg = message
+        record.args = None
+        record.exc_info = None
+        if self.dropped:
+            record.msg = f"{record.msg} ({self.dropped} log records dropped, queue full)"
+            self.dropped = 0
+        return record
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # Shutdown must not be lost to a full queue; waiting here is fine, the capture is over
+        self.queue.put(self._sentinel)
+
+
+def make_formatter(kind):
+    return JsonFormatter() if kind == 'json' else logging.Formatter(TEXT_FORMAT)
+
+
+def setup_logging(log_file=None, config=None, level=None):
+    # Handlers that touch the disk or the terminal run on the listener thread; the calling
+    # threads only format the message and put it on a bounded queue, so neither a capture loop
+    # nor the scheduler ever waits on a slow disk. Repeats from one call site are rate limited.
+    global _listener
+    settings = logging_settings(config if config is not None else load_config())
+    level = level if level is not None else getattr(logging, str(settings['level']).upper(), logging.DEBUG)
+
+    handlers = []
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(make_formatter(settings['console_format']))
+    handlers.append(console)
+    if log_file:
+        if not os.path.isabs(log_file) and os.path.dirname(log_file) == '':
+            log_file = os.path.normpath(os.path.join(config_service.SCRIPT_DIR, settings['log_dir'], log_file))
+        os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+        file_handler = RotatingFileHandler(log_file, maxBytes=settings['max_bytes'], backupCount=settings['backup_count'])
+        file_handler.setFormatter(make_formatter(settings['file_format']))
+        handlers.append(file_handler)
+
+    stop_logging()
+    log_queue = queue.Queue(maxsize=settings['queue_size'])
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    if settings['rate_limit_burst']:
+        queue_handler.addFilter(RateLimitFilter(settings['rate_limit_interval_s'], settings['rate_limit_burst']))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = _Listener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    # Drains whatever is still queued; registered at exit so the last records reach the file
+    global _listener
+    if _listener is not None:
+        listener, _listener = _listener, None
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+atexit.register(stop_logging)
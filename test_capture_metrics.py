@@ -0,0 +1,40 @@
+import os
+import json
+import tempfile
+import unittest
+from capture_metrics import MetricsPublisher, LatencyStats
+
+class TestCaptureMetrics(unittest.TestCase):
+    def test_percentiles_cover_the_recent_window(self):
+        stats = LatencyStats(window=100)
+        for ms in range(1, 201):
+            stats.add(ms / 1000)
+        summary = stats.summary()
+        self.assertEqual(summary['count'], 200)
+        self.assertEqual(summary['max_ms'], 200)
+        self.assertEqual(summary['p50_ms'], 151)
+        self.assertEqual(summary['p99_ms'], 200)
+
+    def test_published_file_has_counters_gauges_and_rates(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'video.json')
+            publisher = MetricsPublisher(path, interval=3600)
+            video = publisher.stream('video')
+            queue_depth = [3]
+            video.set_gauge('queue_depth', lambda: queue_depth[0])
+            video.increment('frames_written', 10)
+            publisher.publish()
+            video.increment('frames_written', 5)
+            video.increment('frames_dropped')
+            with video.timed('write_latency'):
+                pass
+            publisher.close()
+            with open(path) as f:
+                streams = json.load(f)['streams']
+        self.assertEqual(streams['video']['counters'], {'frames_written': 15, 'frames_dropped': 1})
+        self.assertEqual(streams['video']['gauges']['queue_depth'], 3)
+        self.assertEqual(streams['video']['latency']['write_latency']['count'], 1)
+        self.assertIn('frames_written', streams['video']['rates'])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from datetime import timedelta
+import capture_scheduler
+from capture_scheduler import control_handlers, event_index, active_sessions, extensions
+from control_socket import CommandError
+from event_model import Event, local_now
+
+class StubScheduler:
+    state = None
+
+    def __init__(self):
+        self.jobs = []
+
+    def add_job(self, job, trigger, **options):
+        self.jobs.append(options)
+
+    def get_jobs(self):
+        return []
+
+def job(event_id, event_path=None):
+    pass
+
+class TestControlHandlers(unittest.TestCase):
+    def setUp(self):
+        now = local_now()
+        self.event = Event('Standup_1', 'Standup', now + timedelta(minutes=30), now + timedelta(minutes=60))
+        event_index.events[self.event.event_id] = self.event
+        self.scheduler = StubScheduler()
+        self.handlers = control_handlers(self.scheduler, job)
+
+    def tearDown(self):
+        event_index.events.clear()
+        active_sessions.clear()
+        extensions.clear()
+
+    def test_start_indexed_event_early(self):
+        result = self.handlers['start'](event_id='Standup_1')
+        self.assertEqual(result['end'], self.event.end)
+        self.assertEqual(self.scheduler.jobs[0]['id'], 'Standup_1')
+        # Recorded from now until the planned end
+        self.assertLessEqual(event_index.events['Standup_1'].start, local_now())
+        with self.assertRaisesRegex(CommandError, "Unknown event"):
+            self.handlers['start'](event_id='Missing_1')
+
+    def test_start_ad_hoc_capture(self):
+        result = self.handlers['start'](title='Customer call!', minutes=15, capture=['audio'])
+        event = event_index.events[result['event_id']]
+        self.assertTrue(result['event_id'].startswith('Customer_call_'))
+        self.assertEqual(event.capture, ('audio',))
+        self.assertEqual(event.end - event.start, timedelta(minutes=15))
+        self.assertEqual(self.scheduler.jobs[0]['args'], [result['event_id'], None])
+        with self.assertRaisesRegex(CommandError, "Unknown capture kinds: hologram"):
+            self.handlers['start'](title='Demo', minutes=5, capture=['hologram'])
+        with self.assertRaisesRegex(CommandError, "positive number of minutes"):
+            self.handlers['start'](title='Demo', minutes=0)
+
+    def test_start_refuses_a_recording_event(self):
+        active_sessions['Standup_1'] = {'audio': 'audio_Standup_1'}
+        with self.assertRaisesRegex(CommandError, "already recording"):
+            self.handlers['start'](event_id='Standup_1')
+
+    def test_extend_event(self):
+        # Not yet running: only the planned end moves
+        result = self.handlers['extend-event']('Standup_1', 300)
+        self.assertEqual(result['pending_extension_s'], 0)
+        self.assertEqual(event_index.events['Standup_1'].end, self.event.end + timedelta(seconds=300))
+
+        # Running: the extra time is recorded as another segment
+        active_sessions['Standup_1'] = {'audio': 'audio_Standup_1'}
+        self.handlers['extend-event']('Standup_1', 60)
+        result = self.handlers['extend-event']('Standup_1', 60)
+        self.assertEqual(result['pending_extension_s'], 120)
+        self.assertEqual(capture_scheduler.extensions['Standup_1'], 120)
+
+        with self.assertRaisesRegex(CommandError, "Unknown event"):
+            self.handlers['extend-event']('Missing_1', 60)
+        with self.assertRaisesRegex(CommandError, "must be positive"):
+            self.handlers['extend-event']('Standup_1', 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import os
+import tempfile
+import unittest
+from capture_timestamps import TimestampWriter, CaptureTimestamps
+
+class TestCaptureTimestamps(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "video.timestamps")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_measured_samplerate_follows_the_card_clock(self):
+        # A card nominally at 48 kHz that really delivers 48048 samples a second, with callback jitter
+        writer = TimestampWriter(self.path, 48000)
+        for index in range(2000):
+            jitter_ns = (index % 7 - 3) * 200000
+            writer.audio_block(1024, timestamp_ns=10**9 + int(index * 1024 * 1e9 / 48048) + jitter_ns)
+            writer.frame(timestamp_ns=10**9 + index * 33333333)
+        writer.close()
+        writer.close()
+
+        timestamps = CaptureTimestamps.load(self.path)
+        self.assertEqual(len(timestamps.audio_blocks), 2000)
+        self.assertAlmostEqual(timestamps.measured_samplerate(), 48048, delta=1)
+        self.assertAlmostEqual(timestamps.measured_fps(), 30, delta=0.01)
+        self.assertAlmostEqual(timestamps.audio_offset(), -0.0006, delta=1e-6)
+
+    def test_too_few_blocks(self):
+        writer = TimestampWriter(self.path, 48000)
+        writer.audio_block(1024, timestamp_ns=10**9)
+        writer.close()
+        self.assertIsNone(CaptureTimestamps.load(self.path).measured_samplerate())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import json
+import time
+import tempfile
+import unittest
+from config_service import ConfigService, ConfigError, validate
+
+CONFIG = {'output_directories': ['/recordings'], 'audio_output': {'codec': 'flac'}, 'video_recording': {'camera': {'device_path': '/dev/video2'}}}
+
+def write_config(path, config):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(config, f)
+    os.replace(temp_path, path)
+
+class TestConfigService(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'recording_config.json')
+        write_config(self.path, CONFIG)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_wrong_types_are_errors_and_unknown_keys_warnings(self):
+        config = dict(CONFIG, audio_output={'codec': 'mp3', 'queue_blocks': True}, video_recording={'camera': {'device_pth': '/dev/video0'}})
+        errors, warnings = validate(config)
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(warnings, ['video_recording.camera.device_pth: unknown key'])
+        self.assertEqual(validate({})[0], ['output_directories: missing'])
+
+    def test_parsed_once_and_replaced_on_reload(self):
+        service = ConfigService(self.path)
+        config = service.get()
+        self.assertIs(service.get(), config)
+        self.assertFalse(service.reload())
+        write_config(self.path, dict(CONFIG, output_directories=['/elsewhere']))
+        self.assertTrue(service.reload())
+        self.assertEqual(config['output_directories'], ['/recordings'])
+        self.assertEqual(service.get()['output_directories'], ['/elsewhere'])
+        self.assertEqual(service.version, 2)
+
+    def test_invalid_edit_keeps_last_good_config(self):
+        service = ConfigService(self.path)
+        service.get()
+        with open(self.path, 'w') as f:
+            f.write('{"output_directories": [')
+        self.assertFalse(service.reload())
+        write_config(self.path, dict(CONFIG, audio_output={'codec': 'ogg'}))
+        self.assertFalse(service.reload())
+        self.assertEqual(service.get()['audio_output']['codec'], 'flac')
+        with self.assertRaises(ConfigError):
+            ConfigService(self.path).get()
+
+    def test_watch_picks_up_edits(self):
+        service = ConfigService(self.path)
+        seen = []
+        service.subscribe(seen.append)
+        service.get()
+        service.watch(poll_interval=0.1)
+        try:
+            write_config(self.path, dict(CONFIG, video_recording={'camera': {'device_path': '/dev/video4'}}))
+            deadline = time.monotonic() + 5
+            while not seen and time.monotonic() < deadline:
+                time.sleep(0.05)
+        finally:
+            service.stop()
+        self.assertEqual(service.get()['video_recording']['camera']['device_path'], '/dev/video4')
+        self.assertEqual(len(seen), 1)
+
+if __name__ == "__main__":
+    unittest.main()
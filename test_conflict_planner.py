@@ -0,0 +1,56 @@
+import random
+import unittest
+from datetime import datetime, timedelta, timezone
+from event_model import Event
+from conflict_planner import IntervalTree, find_conflicts, find_short_gaps, plan
+
+BASE = datetime(2026, 3, 2, 9, 0, tzinfo=timezone.utc)
+
+def make_event(title, start_min, end_min, capture=('webcam',)):
+    return Event(title, title, BASE + timedelta(minutes=start_min), BASE + timedelta(minutes=end_min), capture)
+
+class TestConflictPlanner(unittest.TestCase):
+    def setUp(self):
+        self.config = {'scheduler': {'capture_kinds': ['audio'], 'device_reset_s': {'camera': 90}}}
+
+    def test_tree_query_matches_brute_force(self):
+        rng = random.Random(7)
+        intervals = []
+        for i in range(300):
+            start = rng.randrange(0, 1000)
+            intervals.append((start, start + rng.randrange(1, 60), i))
+        tree = IntervalTree(intervals)
+        for _ in range(200):
+            start = rng.randrange(-20, 1050)
+            end = start + rng.randrange(1, 80)
+            expected = sorted((item for item in intervals if item[0] < end and item[1] > start), key=lambda item: (item[0], item[1]))
+            self.assertEqual(sorted(tree.overlapping(start, end), key=lambda item: item[2]), sorted(expected, key=lambda item: item[2]))
+
+    def test_conflicts_match_brute_force(self):
+        rng = random.Random(7)
+        intervals = []
+        for i in range(300):
+            start = rng.randrange(0, 1000)
+            intervals.append((start, start + rng.randrange(1, 60), i))
+        expected = {frozenset((a[2], b[2])) for a in intervals for b in intervals if a[2] < b[2] and a[0] < b[1] and b[0] < a[1]}
+        found = [frozenset((first, second)) for first, second, _ in find_conflicts(IntervalTree(intervals))]
+        self.assertEqual(len(found), len(expected))
+        self.assertEqual(set(found), expected)
+
+    def test_conflicts_and_short_gaps_per_device(self):
+        events = [make_event('a', 0, 60), make_event('b', 30, 90), make_event('c', 91, 120), make_event('d', 0, 30, ('audio',))]
+        camera = IntervalTree([(event.start, event.end, event) for event in events[:3]])
+        conflicts = find_conflicts(camera)
+        self.assertEqual([(first.title, second.title) for first, second, _ in conflicts], [('a', 'b')])
+        self.assertEqual(conflicts[0][2], timedelta(minutes=30))
+        gaps = find_short_gaps(camera, 90)
+        self.assertEqual([(first.title, second.title, gap) for first, second, gap in gaps], [('b', 'c', 60.0)])
+
+        report = plan(events, self.config)
+        self.assertEqual(len(report['devices']['camera']['conflicts']), 1)
+        self.assertEqual(report['devices']['mic_array']['events'], 1)
+        # d ends as b starts, so at most two recorders run at once
+        self.assertEqual(report['peak_streams'], 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from control_socket import ControlServer, CommandError, send_command
+
+class TestControlSocket(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "control.sock")
+        self.servers = []
+
+    def tearDown(self):
+        for server in self.servers:
+            server.stop()
+        self.tmpdir.cleanup()
+
+    def start_server(self, handlers):
+        server = ControlServer(self.path, handlers).start()
+        self.servers.append(server)
+        return server
+
+    def test_round_trip_and_errors(self):
+        def fail():
+            raise CommandError("Event sync_1 is not recording")
+        self.start_server({'echo': lambda value: {'value': value}, 'fail': fail})
+        self.assertEqual(send_command(self.path, 'ping'), 'pong')
+        self.assertEqual(send_command(self.path, 'echo', value=3), {'value': 3})
+        with self.assertRaisesRegex(CommandError, "Unknown command 'status'"):
+            send_command(self.path, 'status')
+        with self.assertRaisesRegex(CommandError, "unexpected keyword argument 'seconds'"):
+            send_command(self.path, 'echo', value=3, seconds=10)
+        with self.assertRaisesRegex(CommandError, "not recording"):
+            send_command(self.path, 'fail')
+
+    def test_refuses_a_live_socket(self):
+        self.start_server({})
+        with self.assertRaises(RuntimeError):
+            ControlServer(self.path, {})
+        self.assertEqual(send_command(self.path, 'ping'), 'pong')
+
+    def test_replaces_a_stale_socket(self):
+        # Left behind by a daemon that died without removing it
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as dead:
+            dead.bind(self.path)
+        self.start_server({})
+        self.assertEqual(send_command(self.path, 'ping'), 'pong')
+
+    def test_replaces_a_socket_answered_by_another_program(self):
+        other = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        other.bind(self.path)
+        other.listen(1)
+
+        def answer():
+            connection, _ = other.accept()
+            with connection:
+                connection.recv(1024)
+                connection.sendall(b"HTTP/1.0 400 Bad Request\n")
+        thread = threading.Thread(target=answer, daemon=True)
+        thread.start()
+        try:
+            self.start_server({})
+        finally:
+            thread.join()
+            other.close()
+        self.assertEqual(send_command(self.path, 'ping'), 'pong')
+
+if __name__ == "__main__":
+    unittest.main()
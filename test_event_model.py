@@ -0,0 +1,34 @@
+import unittest
+from event_model import Event
+
+def export(**overrides):
+    data = {'title': 'Weekly sync', 'start_date': '2026-03-02', 'start_time': '09:30:00', 'end_date': '2026-03-02', 'end_time': '10:15:00'}
+    data.update(overrides)
+    return data
+
+class TestEventModel(unittest.TestCase):
+    def test_parses_times_once_with_timezone(self):
+        event = Event.from_dict(export(timezone='Europe/Berlin'), source_path='/exports/sync.json')
+        self.assertEqual(event.event_id, 'Weekly_sync_20260302_093000')
+        self.assertEqual(event.start.utcoffset().total_seconds(), 3600)
+        self.assertEqual(event.duration, 45 * 60)
+        self.assertEqual(event.source_path, '/exports/sync.json')
+
+    def test_title_is_safe_for_sessions_and_paths(self):
+        self.assertEqual(Event.from_dict(export(title=' Deal: ACME / Q1 ')).title, 'Deal_ACME_Q1')
+
+    def test_invalid_events_are_rejected(self):
+        with self.assertRaises(ValueError):
+            Event.from_dict(export(end_time='09:00:00'))
+        with self.assertRaises(ValueError):
+            Event.from_dict(export(start_date=None))
+
+    def test_events_are_immutable_and_slotted(self):
+        event = Event.from_dict(export(capture=['audio', 'screen']))
+        self.assertEqual(event.capture, ('audio', 'screen'))
+        self.assertFalse(hasattr(event, '__dict__'))
+        with self.assertRaises(AttributeError):
+            event.title = 'other'
+
+if __name__ == "__main__":
+    unittest.main()
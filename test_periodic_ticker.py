@@ -0,0 +1,71 @@
+import time
+import threading
+import unittest
+from periodic_ticker import PeriodicTicker
+
+class TestPeriodicTicker(unittest.TestCase):
+    def test_cadence_does_not_drift(self):
+        # Each tick does some work; the deadlines stay on the grid regardless
+        ticker = PeriodicTicker(0.02, duration=0.2)
+        times = []
+        for _ in ticker:
+            times.append(time.monotonic())
+            time.sleep(0.008)
+        self.assertEqual(len(times), 10)
+        self.assertEqual(ticker.missed, 0)
+        self.assertAlmostEqual(times[-1] - times[0], 0.18, delta=0.015)
+        self.assertTrue(ticker.stopped)
+
+    def test_overrun_skips_missed_ticks(self):
+        ticker = PeriodicTicker(0.05)
+        ticker.wait()
+        started = time.monotonic()
+        time.sleep(0.275)
+        ticker.wait()  # Overdue: returns at once and realigns to the grid
+        self.assertEqual(ticker.ticks, 2)
+        self.assertEqual(ticker.missed, 4)
+        ticker.wait()
+        self.assertAlmostEqual(time.monotonic() - started, 0.3, delta=0.02)
+
+    def test_overrun_catches_up_without_skipping(self):
+        ticker = PeriodicTicker(0.05, skip_missed=False)
+        ticker.wait()
+        time.sleep(0.275)
+        started = time.monotonic()
+        for _ in range(5):
+            ticker.wait()
+        # The five ticks that were due fire back to back
+        self.assertLess(time.monotonic() - started, 0.02)
+        self.assertEqual(ticker.missed, 0)
+
+    def test_pause_resume_and_stop_wake_a_blocked_waiter(self):
+        ticker = PeriodicTicker(0.01, paused=True)
+        ticks = []
+        thread = threading.Thread(target=lambda: ticks.extend(ticker))
+        thread.start()
+        time.sleep(0.1)
+        self.assertEqual(ticks, [])
+
+        ticker.resume()
+        time.sleep(0.1)
+        self.assertGreater(len(ticks), 3)
+
+        ticker.pause()
+        time.sleep(0.03)
+        paused_at = len(ticks)
+        time.sleep(0.1)
+        self.assertEqual(len(ticks), paused_at)
+
+        ticker.stop()
+        thread.join(timeout=1)
+        self.assertFalse(thread.is_alive())
+
+    def test_toggle(self):
+        ticker = PeriodicTicker(1.0, paused=True)
+        self.assertTrue(ticker.toggle())
+        self.assertFalse(ticker.paused)
+        self.assertFalse(ticker.toggle())
+        self.assertTrue(ticker.paused)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import os
+import json
+import tempfile
+import unittest
+from pipeline_trace import Tracer, merge_trace, trace_environment, env_prefix
+
+class TestPipelineTrace(unittest.TestCase):
+    def test_spans_from_several_processes_merge_into_one_trace(self):
+        with tempfile.TemporaryDirectory() as directory:
+            scheduler = Tracer(directory, 'Weekly_sync_20260302_093000', 'scheduler')
+            recorder = Tracer(directory, 'Weekly_sync_20260302_093000', 'video_recorder')
+            with scheduler.span('tmux_spawn', kind='webcam'):
+                with recorder.span('grab'):
+                    pass
+            scheduler.close()
+            recorder.close()
+            with open(os.path.join(directory, 'Weekly_sync_20260302_093000', 'scheduler_%d.jsonl' % os.getpid()), 'a') as f:
+                f.write('{"ph": "X", "name": "trunc')
+            with open(merge_trace(os.path.join(directory, 'Weekly_sync_20260302_093000'))) as f:
+                events = json.load(f)['traceEvents']
+        spans = {event['name']: event for event in events if event['ph'] == 'X'}
+        self.assertEqual(set(spans), {'tmux_spawn', 'grab'})
+        self.assertEqual(spans['tmux_spawn']['args'], {'kind': 'webcam'})
+        self.assertLessEqual(spans['tmux_spawn']['ts'], spans['grab']['ts'])
+        self.assertGreaterEqual(spans['tmux_spawn']['dur'], spans['grab']['dur'])
+        names = {event['args']['name'] for event in events if event['ph'] == 'M' and event['name'] == 'process_name'}
+        self.assertEqual(names, {'scheduler', 'video_recorder'})
+
+    def test_tracing_is_opt_in(self):
+        self.assertEqual(trace_environment({}, 'event'), {})
+        environment = trace_environment({'tracing': {'enabled': True, 'directory': '/tmp/traces'}}, "Deal's_review")
+        self.assertEqual(env_prefix(environment), "CAPTURE_TRACE_DIR=/tmp/traces CAPTURE_TRACE_ID='Deal'\"'\"'s_review' ")
+
+if __name__ == "__main__":
+    unittest.main()
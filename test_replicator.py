@@ -0,0 +1,50 @@
+import os
+import unittest
+import tempfile
+from replicator import Replicator, copy_file, enqueue_replication, recording_directories, DEFAULT_STORAGE
+
+class TestReplicator(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.primary = os.path.join(self.tmpdir.name, "local")
+        self.secondary = os.path.join(self.tmpdir.name, "drive")
+        self.config = {
+            'output_directories': [self.primary, self.secondary],
+            'storage': {'mode': 'tiered', 'spool_dir': os.path.join(self.tmpdir.name, "spool"), 'rate_limit_mb_s': 0, 'chunk_kb': 64},
+        }
+        self.source = os.path.join(self.primary, "2026-01-01", "audio.flac")
+        os.makedirs(os.path.dirname(self.source))
+        self.data = os.urandom(300 * 1024)
+        with open(self.source, 'wb') as f:
+            f.write(self.data)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_tiered_mode_records_to_primary_only(self):
+        self.assertEqual(recording_directories(self.config), [self.primary])
+        self.assertEqual(recording_directories(dict(self.config, storage={})), [self.primary, self.secondary])
+
+    def test_queued_file_is_copied_to_secondary(self):
+        enqueue_replication(self.config, [self.source])
+        replicator = Replicator(self.config)
+        self.assertEqual(replicator.run_once(), 1)
+        self.assertEqual(replicator.pending(), [])
+        self.assertEqual(self.read(os.path.join(self.secondary, "2026-01-01", "audio.flac")), self.data)
+
+    def test_partial_copy_is_resumed(self):
+        destination = os.path.join(self.secondary, "audio.flac")
+        os.makedirs(self.secondary)
+        with open(f"{destination}.part", 'wb') as f:
+            f.write(self.data[:100 * 1024])
+        settings = dict(DEFAULT_STORAGE, rate_limit_mb_s=0, chunk_kb=64)
+        copy_file(self.source, destination, settings)
+        self.assertEqual(self.read(destination), self.data)
+        self.assertFalse(os.path.exists(f"{destination}.part"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import unittest
+import tempfile
+from screen_timeline import TimelineWriter, TimelineReader, TimelineSink, export_images
+
+class TestScreenTimeline(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "event", "screen.timeline")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_frames(self, frames):
+        writer = TimelineWriter(self.path, 'png')
+        for timestamp, data in frames:
+            writer.append(timestamp, data)
+        writer.close()
+
+    def test_lookup_returns_frame_on_screen_at_time(self):
+        self.write_frames([(100.0, b'a'), (101.0, b'b'), (102.5, b'c')])
+        with TimelineReader(self.path) as reader:
+            self.assertEqual(len(reader), 3)
+            self.assertIsNone(reader.frame_at(99.9))
+            self.assertEqual(reader.frame_at(100.0), (100.0, b'a'))
+            self.assertEqual(reader.frame_at(102.4), (101.0, b'b'))
+            self.assertEqual(reader.frame_at(500.0), (102.5, b'c'))
+
+    def test_identical_frames_are_stored_once(self):
+        self.write_frames([(1.0, b'same'), (2.0, b'same'), (3.0, b'other')])
+        with TimelineReader(self.path) as reader:
+            self.assertEqual([reader.entry(i)[3] for i in range(3)], [True, False, True])
+            self.assertEqual(reader.entry(0)[1], reader.entry(1)[1])
+            self.assertEqual(reader.frame_at(2.5), (2.0, b'same'))
+        self.assertEqual(os.path.getsize(self.path), 8 + len(b'same') + len(b'other'))
+
+    def test_reopening_appends_to_existing_timeline(self):
+        self.write_frames([(1.0, b'a')])
+        self.write_frames([(2.0, b'b')])
+        with TimelineReader(self.path) as reader:
+            self.assertEqual(list(reader.frames()), [(1.0, b'a'), (2.0, b'b')])
+
+    def test_sink_restores_submission_order(self):
+        writer = TimelineWriter(self.path, 'png')
+        sink = TimelineSink([writer])
+        sink.write(1, 2.0, b'b')
+        sink.write(2, 3.0, None)  # failed encode
+        sink.write(0, 1.0, b'a')
+        sink.write(3, 4.0, b'd')
+        sink.close()
+        with TimelineReader(self.path) as reader:
+            self.assertEqual([timestamp for timestamp, _ in reader.frames()], [1.0, 2.0, 4.0])
+
+    def test_export_writes_unique_image_names(self):
+        self.write_frames([(1000.1, b'a'), (1000.2, b'b'), (1000.3, b'b')])
+        export_dir = os.path.join(self.tmpdir.name, "export")
+        self.assertEqual(export_images(self.path, export_dir), 3)
+        self.assertEqual(len(os.listdir(export_dir)), 3)
+        self.assertEqual(export_images(self.path, os.path.join(self.tmpdir.name, "keys"), keyframes_only=True), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import json
+import logging
+import unittest
+from structured_logging import RateLimitFilter, JsonFormatter, NonBlockingQueueHandler
+
+def record(message, lineno=10, **extra):
+    entry = logging.LogRecord('capture', logging.WARNING, '/src/recorder.py', lineno, message, (), None)
+    entry.__dict__.update(extra)
+    return entry
+
+class TestStructuredLogging(unittest.TestCase):
+    def test_repeats_from_one_call_site_are_limited_and_counted(self):
+        limiter = RateLimitFilter(interval=60, burst=2)
+        passed = [limiter.filter(record("Failed to capture video frame")) for _ in range(5)]
+        self.assertEqual(passed, [True, True, False, False, False])
+        self.assertTrue(limiter.filter(record("Other warning", lineno=11)))
+        limiter._windows[('/src/recorder.py', 10)][0] -= 60
+        summary = record("Failed to capture video frame")
+        self.assertTrue(limiter.filter(summary))
+        self.assertEqual(summary.suppressed, 3)
+
+    def test_json_lines_carry_extra_fields(self):
+        entry = json.loads(JsonFormatter().format(record("Frame dropped", event_id='sync_1')))
+        self.assertEqual(entry['message'], "Frame dropped")
+        self.assertEqual(entry['level'], 'WARNING')
+        self.assertEqual(entry['event_id'], 'sync_1')
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        import queue
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+        handler.handle(record("first"))
+        handler.handle(record("second"))
+        self.assertEqual(handler.dropped, 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+import numpy as np
+from voice_activity import BlockVAD, BackgroundVAD
+
+SAMPLERATE = 16000
+
+def noise(seconds, rng):
+    return rng.normal(0, 0.003, int(seconds * SAMPLERATE))
+
+def voiced(seconds, rng):
+    t = np.arange(int(seconds * SAMPLERATE)) / SAMPLERATE
+    tone = np.sin(2 * np.pi * 150 * t) + 0.5 * np.sin(2 * np.pi * 300 * t) + 0.3 * np.sin(2 * np.pi * 450 * t)
+    return 0.2 * tone * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t)) + noise(seconds, rng)
+
+class TestVoiceActivity(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        signal = np.concatenate([noise(5, rng), voiced(20, rng), noise(5, rng)])
+        self.audio = (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+
+    def segments(self, vad, blocksize):
+        for start in range(0, len(self.audio), blocksize):
+            vad.feed(self.audio[start:start + blocksize])
+        return vad.index()['segments']
+
+    def test_segments_do_not_depend_on_blocksize(self):
+        # A long stretch of speech must not be absorbed into the noise floor with small blocks
+        for blocksize in (512, 4800, 16000, 160000):
+            with self.subTest(blocksize=blocksize):
+                self.assertEqual(self.segments(BlockVAD(SAMPLERATE), blocksize), [[4.48, 25.52]])
+
+    def test_background_vad_matches_inline(self):
+        self.assertEqual(self.segments(BackgroundVAD(SAMPLERATE), 512), self.segments(BlockVAD(SAMPLERATE), 512))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,20 +1,29 @@
 import subprocess
 import time
-import json
 import os
 import logging
 import sounddevice as sd
-
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+from config_service import config_service
 
 class TmuxSessionManager:
-    def __init__(self, config_path='recording_config.json'):
-        with open(config_path, 'r') as f:
-            self.config = json.load(f)
+    def __init__(self, config_path=None):
+        # Devices are looked up on use, so a daemon watching the configuration follows edits
+        self.config_service = config_service(config_path)
+        self.config_service.get()
         logging.info("TmuxSessionManager initialized with config")
         self.devices_in_use = set()
-        self.audio_device_index = self.config['audio_only_recording']['device']['device_index']
-        self.video_device_path = self.config['video_recording']['camera']['device_path']
+
+    @property
+    def config(self):
+        return self.config_service.get()
+
+    @property
+    def audio_device_index(self):
+        return self.config['audio_only_recording']['device']['device_index']
+
+    @property
+    def video_device_path(self):
+        return self.config['video_recording']['camera']['device_path']
 
     def create_session(self, session_name, command):
         logging.info(f"Creating tmux session: {session_name}")
@@ -131,11 +140,11 @@ class TmuxSessionManager:
         time.sleep(2)  # Longer delay for force release
 
 
-    def start_combination_process(self, video_file, audio_file, output_file):
+    def start_combination_process(self, video_file, audio_file, output_file, env_prefix=''):
         logging.info("Starting combination process")
         session_name = f"combine_{os.path.basename(output_file)}"
         script_path = os.path.abspath("combine_audio_video.py")
-        command = f"python3 {script_path} {video_file} {audio_file} {output_file}"
+        command = f"{env_prefix}python3 {script_path} {video_file} {audio_file} {output_file}"
         logging.info(f"Combination command: {command}")
         self.create_session(session_name, command)
         return session_name
@@ -2,17 +2,17 @@
 
 import subprocess
 import os
-import json
+import sys
 import logging
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from display_geometry import capture_region, x11grab_input
+from config_service import load_config
+
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def load_config():
-    with open('recording_config.json', 'r') as f:
-        return json.load(f)
-
 def screen_capture(output_dir, duration, event_title):
     config = load_config()
     screen_config = config['screen_capture']
@@ -21,12 +21,16 @@ def screen_capture(output_dir, duration, event_title):
     output_filename = f"{event_title}_{timestamp}.{screen_config['output_format']}"
     output_path = os.path.join(output_dir, output_filename)
     
+    # Read the real display size instead of assuming 1920x1080
+    display = screen_config['display']
+    width, height, x, y = capture_region(display, screen_config.get('monitor', 'all'))
+    
     ffmpeg_command = [
         "ffmpeg",
         "-f", "x11grab",
         "-framerate", str(screen_config['framerate']),
-        "-video_size", "1920x1080",  # Adjust if your resolution is different
-        "-i", screen_config['display'],
+        "-video_size", f"{width}x{height}",
+        "-i", x11grab_input(display, x, y),
         "-t", str(duration),
         "-c:v", "libx264",
         "-preset", "ultrafast",
@@ -43,7 +47,6 @@ def screen_capture(output_dir, duration, event_title):
         logging.error(f"Error during screen capture: {e}")
 
 if __name__ == "__main__":
-    import sys
     if len(sys.argv) != 4:
         print("Usage: python ffmpeg_screen_capture.py <output_directory> <duration> <event_title>")
         sys.exit(1)
@@ -4,22 +4,29 @@ import time
 import tty
 import termios
 from datetime import datetime
-import json
 import threading
 import mss
-import mss.tools
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from image_encoder import ImageEncoder, encoding_settings, EXTENSIONS
+from screen_timeline import TimelineWriter, TimelineSink
+from periodic_ticker import PeriodicTicker
+from config_service import load_config
 
 # Load configuration
-with open('recording_config.json', 'r') as f:
-    config = json.load(f)
+config = load_config()
 
 OUTPUT_DIRS = config['output_directories']
+ENCODING = encoding_settings(config)
+STORAGE = config.get('screen_capture', {}).get('storage', 'images')  # images or timeline
 CAPTURE_INTERVAL = 1  # 1 second between captures
 BATCH_SIZE = 5  # Number of images per folder
 
 is_capturing = False
 capture_thread = None
 stop_event = threading.Event()
+# Paused until the first toggle; the capture thread sleeps on it instead of spinning
+ticker = PeriodicTicker(CAPTURE_INTERVAL, paused=True)
 event_folder_name = None
 
 def create_output_dirs(folder_name):
@@ -30,27 +37,33 @@ def capture_screen(output_dirs):
     image_count = 0
     batch_count = 0
     
-    with mss.mss() as sct:
+    sink = None
+    if STORAGE == 'timeline':
+        sink = TimelineSink([TimelineWriter(os.path.join(dir, "screen.timeline"), EXTENSIONS[ENCODING['codec']]) for dir in output_dirs])
+    
+    with mss.mss() as sct, ImageEncoder(ENCODING, sink=sink) as encoder:
         monitor = sct.monitors[0]  # Capture the primary monitor
         
-        while not stop_event.is_set():
-            if is_capturing:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                
-                if image_count % BATCH_SIZE == 0:
-                    batch_count += 1
-                    batch_dirs = [os.path.join(dir, f"batch_{batch_count:04d}") for dir in output_dirs]
-                    for dir in batch_dirs:
-                        os.makedirs(dir, exist_ok=True)
-                
-                screenshot = sct.grab(monitor)
-                
+        for _ in ticker:
+            captured_at = time.time()
+            timestamp = datetime.fromtimestamp(captured_at).strftime("%Y%m%d_%H%M%S_%f")
+            
+            if sink is None and image_count % BATCH_SIZE == 0:
+                batch_count += 1
+                batch_dirs = [os.path.join(dir, f"batch_{batch_count:04d}") for dir in output_dirs]
                 for dir in batch_dirs:
-                    mss.tools.to_png(screenshot.rgb, screenshot.size, output=os.path.join(dir, f"{timestamp}.png"))
-                
-                image_count += 1
-                print(f"Captured image {image_count} in batch {batch_count}")  # Debug output
-                time.sleep(CAPTURE_INTERVAL)
+                    os.makedirs(dir, exist_ok=True)
+            
+            screenshot = sct.grab(monitor)
+            
+            # Encoding and the writes happen on the encoder threads
+            if sink is None:
+                encoder.submit(screenshot, [os.path.join(dir, timestamp) for dir in batch_dirs], timestamp=captured_at)
+            else:
+                encoder.submit(screenshot, timestamp=captured_at)
+            
+            image_count += 1
+            print(f"Captured image {image_count}")  # Debug output
 
 def toggle_capture():
     global is_capturing, capture_thread, event_folder_name
@@ -58,12 +71,14 @@ def toggle_capture():
     is_capturing = not is_capturing
     if is_capturing:
         print(f"Screen capture started. Saving to folder: {event_folder_name}")
+        ticker.resume()
         
         if not capture_thread or not capture_thread.is_alive():
             output_dirs = create_output_dirs(event_folder_name)
             capture_thread = threading.Thread(target=capture_screen, args=(output_dirs,))
             capture_thread.start()
     else:
+        ticker.pause()
         print("Screen capture paused")
 
 def getch():
@@ -105,12 +120,14 @@ def main():
                 print("Fn+F10 pressed")
                 print("Stopping screen capture")
                 stop_event.set()
+                ticker.stop()
                 if capture_thread and capture_thread.is_alive():
                     capture_thread.join()
                 break
         elif char == '\x03':  # Ctrl+C
             print("Ctrl+C pressed. Exiting.")
             stop_event.set()
+            ticker.stop()
             if capture_thread and capture_thread.is_alive():
                 capture_thread.join()
             break
@@ -1,16 +1,17 @@
 import os
 import sys
-import time
 import tty
 import termios
 from datetime import datetime
-import json
 import threading
 import subprocess
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from periodic_ticker import PeriodicTicker
+from config_service import load_config
+
 # Load configuration
-with open('recording_config.json', 'r') as f:
-    config = json.load(f)
+config = load_config()
 
 OUTPUT_DIRS = config['output_directories']
 CAPTURE_INTERVAL = 1  # 1 second between captures
@@ -19,6 +20,8 @@ BATCH_SIZE = 5  # Number of images per folder
 is_capturing = False
 capture_thread = None
 stop_event = threading.Event()
+# Paused until the first toggle; the capture thread sleeps on it instead of spinning
+ticker = PeriodicTicker(CAPTURE_INTERVAL, paused=True)
 event_folder_name = None
 
 def create_output_dirs(folder_name):
@@ -29,26 +32,24 @@ def capture_screen(output_dirs):
     image_count = 0
     batch_count = 0
     
-    while not stop_event.is_set():
-        if is_capturing:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            
-            if image_count % BATCH_SIZE == 0:
-                batch_count += 1
-                batch_dirs = [os.path.join(dir, f"batch_{batch_count:04d}") for dir in output_dirs]
-                for dir in batch_dirs:
-                    os.makedirs(dir, exist_ok=True)
-            
+    for _ in ticker:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        if image_count % BATCH_SIZE == 0:
+            batch_count += 1
+            batch_dirs = [os.path.join(dir, f"batch_{batch_count:04d}") for dir in output_dirs]
             for dir in batch_dirs:
-                filename = os.path.join(dir, f"{timestamp}.png")
-                try:
-                    subprocess.run(['scrot', '-z', filename], check=True)
-                    print(f"Captured image {image_count + 1} in batch {batch_count}")
-                except subprocess.CalledProcessError as e:
-                    print(f"Error capturing screenshot: {e}")
-            
-            image_count += 1
-            time.sleep(CAPTURE_INTERVAL)
+                os.makedirs(dir, exist_ok=True)
+        
+        for dir in batch_dirs:
+            filename = os.path.join(dir, f"{timestamp}.png")
+            try:
+                subprocess.run(['scrot', '-z', filename], check=True)
+                print(f"Captured image {image_count + 1} in batch {batch_count}")
+            except subprocess.CalledProcessError as e:
+                print(f"Error capturing screenshot: {e}")
+        
+        image_count += 1
 
 def toggle_capture():
     global is_capturing, capture_thread, event_folder_name
@@ -56,12 +57,14 @@ def toggle_capture():
     is_capturing = not is_capturing
     if is_capturing:
         print(f"Screen capture started. Saving to folder: {event_folder_name}")
+        ticker.resume()
         
         if not capture_thread or not capture_thread.is_alive():
             output_dirs = create_output_dirs(event_folder_name)
             capture_thread = threading.Thread(target=capture_screen, args=(output_dirs,))
             capture_thread.start()
     else:
+        ticker.pause()
         print("Screen capture paused")
 
 def getch():
@@ -103,12 +106,14 @@ def main():
                 print("Fn+F10 pressed")
                 print("Stopping screen capture")
                 stop_event.set()
+                ticker.stop()
                 if capture_thread and capture_thread.is_alive():
                     capture_thread.join()
                 break
         elif char == '\x03':  # Ctrl+C
             print("Ctrl+C pressed. Exiting.")
             stop_event.set()
+            ticker.stop()
             if capture_thread and capture_thread.is_alive():
                 capture_thread.join()
             break
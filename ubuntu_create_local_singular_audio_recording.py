@@ -1,42 +1,39 @@
 #!/usr/bin/env python3
 
 import sys
-import wave
 import logging
 import os
 from datetime import datetime
-import json
-import sounddevice as sd
-import numpy as np
-
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('./logs/audio_recording_log.txt'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-
-def load_config():
-    config_file = os.path.join(os.path.dirname(__file__), 'recording_config.json')
-    with open(config_file, 'r') as f:
-        return json.load(f)
-
-def record_audio(total_duration, event_title):
+import threading
+from capture_backends import audio_backend
+from audio_processing import ChannelProcessor, processing_settings
+from audio_encoder import StreamingAudioWriter, audio_output_settings, codec_for_directory
+from voice_activity import BackgroundVAD, vad_settings, write_speech_index, trim_silence
+from replicator import recording_directories, enqueue_replication
+from capture_metrics import start_metrics
+from pipeline_trace import current_tracer
+from structured_logging import setup_logging
+from config_service import load_config
+
+setup_logging('audio_recording_log.txt')
+
+def record_audio(total_duration, event_title, config=None):
     logging.info(f"Starting audio-only recording for event: {event_title}")
 
-    config = load_config()
-    output_directories = config.get("output_directories", [])
+    config = config or load_config()
+    output_directories = recording_directories(config)
     audio_config = config.get("audio_only_recording", {})
 
     device_index = audio_config.get('device', {}).get('device_index')
     if device_index is None:
         logging.error("No audio device index specified in configuration for ReSpeaker.")
-        return
+        return []
 
+    saved_files = []
+    writers = []
+    trace = current_tracer()
     try:
+        sd = audio_backend(config)
         device_info = sd.query_devices(device_index, 'input')
         samplerate = int(device_info['default_samplerate'])
         channels = device_info['max_input_channels']
@@ -44,40 +41,105 @@ def record_audio(total_duration, event_title):
         logging.info(f"Audio-only recording started for {total_duration} seconds using ReSpeaker")
         logging.info(f"Device: {device_info['name']}, Sample rate: {samplerate}, Channels: {channels}")
 
-        recording = sd.rec(int(total_duration * samplerate), samplerate=samplerate, channels=channels, dtype='int16', device=device_index)
-        sd.wait()
-
-        logging.info("Audio-only recording completed")
-
+        # Channel selection and downmix run on each block as it arrives, and the kept audio
+        # streams straight into one encoder per output directory instead of being buffered
+        processor = ChannelProcessor(channels, processing_settings(config))
+        output_settings = audio_output_settings(config)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Live counters for this recording, rewritten to logs/metrics while it runs
+        metrics = start_metrics(config, f"audio_only_{event_title}_{timestamp}")
+        input_metrics = metrics.stream('audio_input')
 
         for output_dir in output_directories:
             try:
                 output_dir = os.path.abspath(output_dir)
                 date_folder = datetime.now().strftime("%Y-%m-%d")
                 output_folder = os.path.join(output_dir, date_folder)
-                output_filename = os.path.join(output_folder, f"audio_only_{event_title}_{timestamp}.wav")
-
                 os.makedirs(output_folder, exist_ok=True)
                 logging.info(f"Output folder ensured at: {output_folder}")
 
-                wf = wave.open(output_filename, 'wb')
-                wf.setnchannels(channels)
-                wf.setsampwidth(2)  # 16-bit
-                wf.setframerate(samplerate)
-                wf.writeframes(recording.tobytes())
-                wf.close()
-                logging.info(f"Audio-only recording saved to: {output_filename}")
+                base_path = os.path.join(output_folder, f"audio_only_{event_title}_{timestamp}")
+                codec = codec_for_directory(output_settings, output_dir)
+                writers.append(StreamingAudioWriter(base_path, codec, samplerate, processor.output_channels, output_settings, metrics=metrics.stream(f"audio_writer_{codec}_{len(writers)}")))
+            except Exception as e:
+                logging.error(f"Failed to open audio-only output in {output_dir}: {e}")
+                logging.debug("Exception details:", exc_info=True)
 
+        speech_settings = vad_settings(config)
+        # Speech detection runs on its own thread; the callback only hands it the block
+        vad = BackgroundVAD(samplerate, speech_settings) if speech_settings['enabled'] else None
+
+        target_frames = int(total_duration * samplerate)
+        captured = [0]
+        done = threading.Event()
+
+        def audio_callback(indata, frames, time, status):
+            input_metrics.increment('blocks')
+            if status:
+                input_metrics.increment('status_events')
+                if getattr(status, 'input_overflow', False):
+                    input_metrics.increment('input_overflows')
+                logging.warning(f"Audio input status: {status}")
+            if done.is_set():
+                return
+            with input_metrics.timed('process_latency'), trace.span('process_block'):
+                block = processor.process(indata[:target_frames - captured[0]])
+                for writer in writers:
+                    writer.write(block)
+                if vad is not None:
+                    vad.feed(block)
+            captured[0] += len(block)
+            input_metrics.increment('frames_captured', len(block))
+            if captured[0] >= target_frames:
+                done.set()
+
+        with trace.span('open_audio_stream', device=device_index):
+            stream = sd.InputStream(samplerate=samplerate, device=device_index, channels=channels, dtype='int16', callback=audio_callback)
+        with stream:
+            done.wait(total_duration + 10)
+
+        logging.info(f"Audio-only recording completed: {captured[0]} frames, {processor.output_channels} channels kept")
+
+        for writer in writers:
+            try:
+                with trace.span('close_audio', path=writer.path):
+                    saved_files.append(writer.close())
+                logging.info(f"Audio-only recording saved to: {writer.path}")
             except Exception as e:
-                logging.error(f"Failed to save audio-only recording to {output_filename}: {e}")
+                logging.error(f"Failed to save audio-only recording to {writer.path}: {e}")
                 logging.debug("Exception details:", exc_info=True)
+        metrics.close()
+
+        finished_files = list(saved_files)
+        if vad is not None:
+            speech_index = vad.index()
+            for audio_file in saved_files:
+                try:
+                    finished_files.append(write_speech_index(audio_file, speech_index))
+                    if speech_settings['trim']:
+                        with trace.span('trim_silence'):
+                            trimmed_file = trim_silence(audio_file, speech_index)
+                        if trimmed_file:
+                            finished_files.append(trimmed_file)
+                except Exception as e:
+                    logging.error(f"Failed to write speech index for {audio_file}: {e}")
+                    logging.debug("Exception details:", exc_info=True)
+        enqueue_replication(config, finished_files)
 
     except Exception as e:
         logging.error(f"Failed to record audio-only using ReSpeaker: {e}")
         logging.debug("Exception details:", exc_info=True)
+    finally:
+        # Otherwise a failed capture leaves the ffmpeg encoders running
+        for writer in writers:
+            if not writer.closed:
+                try:
+                    writer.close()
+                except Exception as e:
+                    logging.error(f"Failed to close audio writer for {writer.path}: {e}")
 
     logging.info("Audio-only recording process completed")
+    return saved_files
 
 if __name__ == "__main__":
     logging.info(f"Script called with args: {sys.argv}")
@@ -5,12 +5,16 @@ import json
 from datetime import datetime, timedelta
 import sys
 import logging
-from logging.handlers import RotatingFileHandler
 import argparse
-from apscheduler.schedulers.background import BackgroundScheduler
 import time
 from tmux_session_manager import TmuxSessionManager
+from job_store import create_scheduler, start_scheduler
+from audio_encoder import audio_output_settings, codec_for_directory, audio_path
+from replicator import recording_directories
+from event_model import Event, local_now
 import psutil
+from structured_logging import setup_logging
+from config_service import load_config, watch_config, ConfigError
 
 # Configuration
 CONFIG = {
@@ -21,25 +25,7 @@ CONFIG = {
     'MAX_CPU_USAGE': 90,  # 90%
 }
 
-# Ensure the logs directory exists
-if not os.path.exists('./logs/'):
-    os.makedirs('./logs/')
-
-# Configure logging with rotation
-log_handler = RotatingFileHandler('./logs/scheduling_log.txt', maxBytes=10000000, backupCount=5)
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        log_handler,
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-
-def load_config():
-    config_file = os.path.join(os.path.dirname(__file__), 'recording_config.json')
-    with open(config_file, 'r') as f:
-        return json.load(f)
+setup_logging('scheduling_log.txt')
 
 def load_events(batch_size=100):
     export_dir = os.path.abspath(os.path.join('.', 'media', 'exports'))
@@ -56,15 +42,14 @@ def load_events(batch_size=100):
             if file.endswith('.json'):
                 file_path = os.path.join(root, file)
                 try:
-                    with open(file_path, 'r') as f:
-                        event = json.load(f)
-                    event['title'] = event['title'].strip().replace(' ', '_')
-                    batch.append(event)
+                    batch.append(Event.load(file_path))
                     if len(batch) >= batch_size:
                         yield batch
                         batch = []
                 except json.JSONDecodeError as e:
                     logging.error(f"Error decoding JSON from {file_path}: {e}")
+                except ValueError as e:
+                    logging.error(f"Invalid event in {file_path}: {e}")
                 except Exception as e:
                     logging.error(f"Unexpected error loading {file_path}: {e}")
         if batch:
@@ -81,11 +66,21 @@ def check_system_resources():
         return False
     return True
 
-def run_recording(event, tmux_manager):
+tmux_manager = None
+
+def run_recording(event_id, event_path):
+    # Jobs carry only the event ID and its export path so they can live in the persistent job store
+    try:
+        event = Event.load(event_path)
+    except Exception as e:
+        logging.error(f"Could not load event {event_id} from {event_path}: {e}")
+        return
+
     try:
-        start_time = datetime.strptime(f"{event['start_date']} {event['start_time']}", "%Y-%m-%d %H:%M:%S")
-        end_time = datetime.strptime(f"{event['end_date']} {event['end_time']}", "%Y-%m-%d %H:%M:%S")
-        duration = (end_time - start_time).total_seconds()
+        duration = event.remaining()
+        if duration <= 0:
+            logging.warning(f"Event {event_id} already ended, skipping")
+            return
         logging.debug(f"Event duration calculated: {duration} seconds")
 
         # Terminate any existing sessions
@@ -95,8 +90,8 @@ def run_recording(event, tmux_manager):
         tmux_manager.force_release_all_devices()
 
         # Start both audio and video recordings
-        audio_session = tmux_manager.start_audio_recording(duration, event['title'])
-        video_session = tmux_manager.start_video_recording(duration, event['title'])
+        audio_session = tmux_manager.start_audio_recording(duration, event.title)
+        video_session = tmux_manager.start_video_recording(duration, event.title)
 
         # Wait for both sessions to finish or timeout
         recording_start_time = time.time()
@@ -120,62 +115,65 @@ def run_recording(event, tmux_manager):
         # Release devices after recording
         tmux_manager.release_devices()
 
-        logging.info(f"Completed event: {event['title']}. Duration: {actual_duration:.2f}s")
+        logging.info(f"Completed event: {event.title}. Duration: {actual_duration:.2f}s")
 
         # Start combination process
         config = load_config()
-        output_directories = config.get("output_directories", [])
+        output_directories = recording_directories(config)
+        output_settings = audio_output_settings(config)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         date_folder = datetime.now().strftime("%Y-%m-%d")
 
         for output_dir in output_directories:
             output_folder = os.path.join(output_dir, date_folder)
-            video_file = os.path.join(output_folder, f"video_{event['title']}_{timestamp}.mp4")
-            audio_file = os.path.join(output_folder, f"audio_{event['title']}_{timestamp}.wav")
-            output_file = os.path.join(output_folder, f"combined_{event['title']}_{timestamp}.mp4")
+            video_file = os.path.join(output_folder, f"video_{event.title}_{timestamp}.mp4")
+            audio_file = audio_path(os.path.join(output_folder, f"audio_{event.title}_{timestamp}"), codec_for_directory(output_settings, output_dir))
+            output_file = os.path.join(output_folder, f"combined_{event.title}_{timestamp}.mp4")
             
             combine_session = tmux_manager.start_combination_process(video_file, audio_file, output_file)
-            logging.info(f"Started combination process for {event['title']} in session {combine_session}")
+            logging.info(f"Started combination process for {event.title} in session {combine_session}")
 
     except Exception as e:
-        logging.error(f"Error running recording for event '{event['title']}': {e}")
+        logging.error(f"Error running recording for event '{event.title}': {e}")
         logging.debug("Exception details:", exc_info=True)
         # Ensure devices are released even if an error occurs
         tmux_manager.force_release_all_devices()
 
-def schedule_events(tmux_manager):
-    scheduler = BackgroundScheduler()
-    current_time = datetime.now()
+def schedule_events(scheduler):
+    current_time = local_now()
     scheduled_count = 0
 
     for batch in load_events():
-        for event in sorted(batch, key=lambda x: datetime.strptime(f"{x['start_date']} {x['start_time']}", "%Y-%m-%d %H:%M:%S")):
-            start_time = datetime.strptime(f"{event['start_date']} {event['start_time']}", "%Y-%m-%d %H:%M:%S")
-            if start_time < current_time:
+        for event in sorted(batch, key=lambda event: event.start):
+            if event.start < current_time:
                 continue
 
             scheduler.add_job(
                 run_recording,
                 'date',
-                run_date=start_time,
-                args=[event, tmux_manager],
-                id=event['title'] + "_" + start_time.strftime("%Y%m%d_%H%M%S")
+                run_date=event.start,
+                args=[event.event_id, event.source_path],
+                id=event.event_id,
+                replace_existing=True
             )
-            logging.info(f"Scheduled recording for '{event['title']}' at {start_time}")
+            logging.info(f"Scheduled recording for '{event.title}' at {event.start}")
 
             scheduled_count += 1
             if scheduled_count >= CONFIG['EVENT_LIMIT']:
                 logging.info(f"Reached scheduled events limit of {CONFIG['EVENT_LIMIT']}")
-                return scheduler, scheduled_count
+                return scheduled_count
 
     logging.info(f"Total events scheduled: {scheduled_count}")
-    return scheduler, scheduled_count
+    return scheduled_count
 
 def main(args):
+    global tmux_manager
     logging.info("Starting recording scheduler")
+    # Device and destination edits apply from the next event on
+    watch_config()
     tmux_manager = TmuxSessionManager()
-    scheduler, scheduled_count = schedule_events(tmux_manager)
-    scheduler.start()
+    scheduler = create_scheduler(load_config(), 'recording_jobs')
+    start_scheduler(scheduler, schedule_events, rescan=args.rescan)
     logging.info("Scheduler started. Waiting for events...")
 
     try:
@@ -193,11 +191,16 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Recording Scheduler")
     parser.add_argument("--event-limit", type=int, help="Maximum number of events to schedule")
     parser.add_argument("--check-interval", type=int, help="Interval to check for completed events (seconds)")
+    parser.add_argument("--rescan", action="store_true", help="Drop the stored jobs and rebuild the schedule from the export tree")
     args = parser.parse_args()
 
     if args.event_limit:
         CONFIG['EVENT_LIMIT'] = args.event_limit
     if args.check_interval:
         CONFIG['CHECK_INTERVAL'] = args.check_interval
+    try:
+        load_config()
+    except ConfigError as e:
+        sys.exit(str(e))
 
     main(args)
@@ -1,35 +1,26 @@
 #!/usr/bin/env python3
 
 import cv2
-import sounddevice as sd
-import numpy as np
 import sys
 import logging
 import os
 from datetime import datetime
-import json
-import scipy.io.wavfile as wavfile
-
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('./logs/video_recording_log.txt'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-
-def load_config():
-    config_file = os.path.join(os.path.dirname(__file__), 'recording_config.json')
-    with open(config_file, 'r') as f:
-        return json.load(f)
-
-def record_video_and_audio(total_duration, event_name):
+from capture_backends import open_camera, audio_backend
+from audio_encoder import StreamingAudioWriter, audio_output_settings, codec_for_directory
+from capture_timestamps import TimestampWriter, timestamps_path
+from replicator import recording_directories, enqueue_replication
+from capture_metrics import start_metrics
+from pipeline_trace import current_tracer
+from structured_logging import setup_logging
+from config_service import load_config
+
+setup_logging('video_recording_log.txt')
+
+def record_video_and_audio(total_duration, event_name, config=None):
     logging.info(f"Starting video and audio recording for event: {event_name}")
 
-    config = load_config()
-    output_directories = config.get("output_directories", [])
+    config = config or load_config()
+    output_directories = recording_directories(config)
     video_config = config.get("video_recording", {})
 
     video_device = video_config.get('camera', {}).get('device_path')
@@ -37,13 +28,17 @@ def record_video_and_audio(total_duration, event_name):
 
     if not video_device or audio_device_index is None:
         logging.error("Video device or audio device index not specified in configuration.")
-        return
+        return []
 
+    recordings = []
+    trace = current_tracer()
     try:
-        cap = cv2.VideoCapture(video_device)
+        with trace.span('open_camera', device=video_device):
+            cap = open_camera(config, video_device)
+        sd = audio_backend(config)
         if not cap.isOpened():
             logging.error(f"Failed to open video device: {video_device}")
-            return
+            return recordings
 
         width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
@@ -58,8 +53,16 @@ def record_video_and_audio(total_duration, event_name):
         logging.info(f"Audio capture initialized: Device index {audio_device_index}, Sample rate: {samplerate}")
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-        for output_dir in output_directories:
+        output_settings = audio_output_settings(config)
+        # Live counters for this recording, rewritten to logs/metrics while it runs
+        metrics = start_metrics(config, f"video_{event_name}_{timestamp}")
+        video_metrics = metrics.stream('video')
+        video_metrics.set_gauge('nominal_fps', fps)
+        audio_metrics = metrics.stream('audio_input')
+
+        for index, output_dir in enumerate(output_directories):
+            audio_writer = None
+            timestamps = None
             try:
                 output_dir = os.path.abspath(output_dir)
                 date_folder = datetime.now().strftime("%Y-%m-%d")
@@ -67,44 +70,74 @@ def record_video_and_audio(total_duration, event_name):
                 os.makedirs(output_folder, exist_ok=True)
 
                 video_filename = os.path.join(output_folder, f"video_{event_name}_{timestamp}.mp4")
-                audio_filename = os.path.join(output_folder, f"audio_{event_name}_{timestamp}.wav")
+                audio_base = os.path.join(output_folder, f"audio_{event_name}_{timestamp}")
 
                 fourcc = cv2.VideoWriter_fourcc(*'mp4v')
                 out = cv2.VideoWriter(video_filename, fourcc, fps, (width, height))
 
+                # Audio is encoded while it is captured; the callback only queues the block
+                codec = codec_for_directory(output_settings, output_dir)
+                audio_writer = StreamingAudioWriter(audio_base, codec, samplerate, channels, output_settings, metrics=metrics.stream(f"audio_writer_{codec}_{index}"))
+                # The writer stamps frames at the nominal fps; the real capture times go into a sidecar for the combine step
+                timestamps = TimestampWriter(timestamps_path(video_filename), samplerate)
+
                 def audio_callback(indata, frames, time, status):
+                    audio_metrics.increment('blocks')
                     if status:
-                        print(status)
-                    audio_frames.append(indata.copy())
-
-                audio_frames = []
-
-                with sd.InputStream(samplerate=samplerate, device=audio_device_index, channels=channels, callback=audio_callback):
+                        audio_metrics.increment('status_events')
+                        if getattr(status, 'input_overflow', False):
+                            audio_metrics.increment('input_overflows')
+                        logging.warning(f"Audio input status: {status}")
+                    timestamps.audio_block(frames)
+                    audio_writer.write(indata.copy())
+
+                with trace.span('open_audio_stream', device=audio_device_index):
+                    stream = sd.InputStream(samplerate=samplerate, device=audio_device_index, channels=channels, dtype='int16', callback=audio_callback)
+                with stream:
                     start_time = datetime.now()
                     frame_count = 0
                     while (datetime.now() - start_time).total_seconds() < total_duration:
-                        ret, frame = cap.read()
+                        with trace.span('grab'):
+                            ret, frame = cap.read()
                         if ret:
-                            out.write(frame)
+                            video_metrics.increment('frames_grabbed')
+                            timestamps.frame()
+                            with video_metrics.timed('write_latency'), trace.span('write_frame'):
+                                out.write(frame)
+                            video_metrics.increment('frames_written')
                             frame_count += 1
                         else:
+                            video_metrics.increment('frames_dropped')
                             logging.warning("Failed to capture video frame")
 
-                out.release()
+                with trace.span('release_video'):
+                    out.release()
+                timestamps.close()
                 logging.info(f"Video saved to: {video_filename}")
                 logging.info(f"Total frames recorded: {frame_count}")
 
-                audio_data = np.concatenate(audio_frames, axis=0)
-                wavfile.write(audio_filename, samplerate, audio_data)
-                logging.info(f"Audio saved to: {audio_filename}")
+                with trace.span('close_audio'):
+                    audio_filename = audio_writer.close()
 
                 actual_fps = frame_count / total_duration
                 logging.info(f"Actual FPS: {actual_fps:.2f}")
+                recordings.append({'video_file': video_filename, 'audio_file': audio_filename, 'frames': frame_count, 'nominal_fps': fps, 'actual_fps': actual_fps})
+                enqueue_replication(config, [video_filename, audio_filename, timestamps.path])
 
             except Exception as e:
                 logging.error(f"Failed to save recordings for event '{event_name}': {e}")
                 logging.debug("Exception details:", exc_info=True)
-
+            finally:
+                # Otherwise a failed capture loop leaves the ffmpeg encoder running and the sidecar unflushed
+                if timestamps is not None:
+                    timestamps.close()
+                if audio_writer is not None and not audio_writer.closed:
+                    try:
+                        audio_writer.close()
+                    except Exception as e:
+                        logging.error(f"Failed to close audio writer for event '{event_name}': {e}")
+
+        metrics.close()
         cap.release()
 
     except Exception as e:
@@ -112,6 +145,7 @@ def record_video_and_audio(total_duration, event_name):
         logging.debug("Exception details:", exc_info=True)
 
     logging.info(f"Video and audio recording process completed for event: {event_name}")
+    return recordings
 
 
 if __name__ == "__main__":
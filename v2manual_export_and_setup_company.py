@@ -1,7 +1,8 @@
 import os
 import django
 import sys
-from datetime import date, timedelta
+import argparse
+from datetime import date, datetime, timedelta
 import json
 
 # Set up Django environment
@@ -49,6 +50,45 @@ def load_events_from_json(export_dir):
                     events.append(event_data)
     return events
 
+def export_dir_for(export_date):
+    return os.path.join(settings.BASE_DIR, 'media', 'exports', export_date.strftime('%Y-%m-%d'))
+
+def date_range(start_date, end_date):
+    return [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+
+def has_exported_events(export_dir):
+    # A directory listing is enough to decide whether a date needs jobs; nothing is parsed
+    if not os.path.isdir(export_dir):
+        return False
+    return any(entry.name.endswith('.json') for entry in os.scandir(export_dir))
+
+def run_batch(start_date, end_date, quiet=False):
+    # One export call for the whole range, then job setup only for the dates that got events
+    exported_count = export_events_for_date_range(start_date, end_date)
+    dates = [export_date for export_date in date_range(start_date, end_date) if has_exported_events(export_dir_for(export_date))]
+    if not quiet:
+        print(f"Exported {exported_count} events for {start_date} to {end_date}")
+        for export_date in dates:
+            print_event_details(load_events_from_json(export_dir_for(export_date)))
+
+    for export_date in dates:
+        setup_recording_jobs(export_date, settings.BASE_DIR)
+
+    if not quiet:
+        print(f"Set up recording jobs for {len(dates)} of {len(date_range(start_date, end_date))} dates.")
+    return exported_count
+
+def parse_date_arg(value):
+    # YYYY-MM-DD, or a day offset from today such as 0, 1 or -7 (handy in crontabs)
+    try:
+        return date.today() + timedelta(days=int(value))
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected YYYY-MM-DD or a day offset, got {value!r}")
+
 def export_and_print_events(start_date, end_date):
     exported_count = export_events_for_date_range(start_date, end_date)
     print(f"Exported {exported_count} events for the date range")
@@ -61,7 +101,7 @@ def export_and_print_events(start_date, end_date):
     print_event_details(events)
     return exported_count
 
-def main():
+def interactive():
     choice = get_user_choice()
     today = date.today()
 
@@ -112,6 +152,24 @@ def main():
 
     print(f"Manual export and setup completed. Total events exported: {total_exported}")
 
+def main():
+    parser = argparse.ArgumentParser(description="Export calendar events and set up recording jobs")
+    parser.add_argument("--from", dest="start", type=parse_date_arg, help="First date (YYYY-MM-DD or day offset from today); runs without the menu")
+    parser.add_argument("--to", dest="end", type=parse_date_arg, help="Last date (default: same as --from)")
+    parser.add_argument("--quiet", action="store_true", help="Only report errors")
+    args = parser.parse_args()
+
+    if args.start is None:
+        if args.end is not None:
+            parser.error("--to needs --from")
+        interactive()
+        return
+
+    end_date = args.end or args.start
+    if end_date < args.start:
+        parser.error("--to must not be before --from")
+    run_batch(args.start, end_date, quiet=args.quiet)
+
 if __name__ == "__main__":
     main()
 
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import queue
+import logging
+import argparse
+import threading
+import subprocess
+import numpy as np
+
+# Defaults for audio_only_recording.vad in recording_config.json
+DEFAULT_VAD = {
+    'enabled': True,
+    'trim': False,           # Also write <name>_trimmed.<ext> without the leading and trailing silence
+    'frame_ms': 30,
+    'threshold_db': -50.0,   # Frames quieter than this (dBFS) are never speech
+    'margin_db': 12.0,       # Speech must also sit this far above the tracked noise floor
+    'zcr_max': 0.35,         # Quiet frames crossing zero more often than this are treated as hiss
+    'loud_db': 10.0,         # Frames this far above the floor count regardless of zero crossings
+    'min_speech_s': 0.3,
+    'min_silence_s': 1.0,    # Shorter pauses are bridged into one segment
+    'padding_s': 0.5,
+    'floor_window_s': 1.0,   # Frames are analysed in windows of this length, whatever the capture block size
+    'floor_rise_db_s': 0.5,  # How fast the noise floor may rise; it drops to a quieter window at once
+}
+
+
+def vad_settings(config):
+    settings = dict(DEFAULT_VAD)
+    settings.update(config.get('audio_only_recording', {}).get('vad', {}))
+    return settings
+
+
+class BlockVAD:
+    # Energy / zero-crossing detector fed with capture blocks; all per-frame maths is vectorized.
+    # Blocks are regrouped into fixed windows, so the result does not depend on the blocksize.
+    def __init__(self, samplerate, settings=None):
+        self.settings = dict(DEFAULT_VAD)
+        self.settings.update(settings or {})
+        self.samplerate = samplerate
+        self.frame_len = max(1, int(samplerate * self.settings['frame_ms'] / 1000))
+        self.window_len = self.frame_len * max(1, round(self.settings['floor_window_s'] * 1000 / self.settings['frame_ms']))
+        self.pending = []
+        self.pending_samples = 0
+        self.noise_floor_db = None
+        self.decisions = []
+        self.total_samples = 0
+
+    def feed(self, block):
+        samples = block.astype(np.float32)
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1)
+        if block.dtype == np.int16:
+            samples /= 32768.0
+        self.total_samples += len(samples)
+        self.pending.append(samples)
+        self.pending_samples += len(samples)
+        if self.pending_samples < self.window_len:
+            return
+        samples = np.concatenate(self.pending)
+        windows = len(samples) // self.window_len
+        for index in range(windows):
+            self.analyze(samples[index * self.window_len:(index + 1) * self.window_len])
+        rest = samples[windows * self.window_len:]
+        self.pending = [rest]
+        self.pending_samples = len(rest)
+
+    def flush(self):
+        # Analyses the last partial window; whatever is left is shorter than a frame
+        if self.pending_samples >= self.frame_len:
+            samples = np.concatenate(self.pending)
+            frame_count = len(samples) // self.frame_len
+            self.analyze(samples[:frame_count * self.frame_len])
+            self.pending = [samples[frame_count * self.frame_len:]]
+            self.pending_samples = len(self.pending[0])
+
+    def analyze(self, samples):
+        frame_count = len(samples) // self.frame_len
+        frames = samples.reshape(frame_count, self.frame_len)
+
+        energy_db = 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-12)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_len - 1 or 1)
+
+        # The floor follows the quiet end of each window and only creeps upwards, at a rate set
+        # in dB per second so a long stretch of speech is not absorbed into it
+        window_floor = float(np.percentile(energy_db, 10))
+        if self.noise_floor_db is None or window_floor < self.noise_floor_db:
+            self.noise_floor_db = window_floor
+        else:
+            max_rise = self.settings['floor_rise_db_s'] * len(samples) / self.samplerate
+            self.noise_floor_db += min(window_floor - self.noise_floor_db, max_rise)
+
+        above_floor = energy_db - self.noise_floor_db
+        speech = (energy_db > self.settings['threshold_db']) & (above_floor > self.settings['margin_db']) & (
+            (zcr < self.settings['zcr_max']) | (above_floor > self.settings['margin_db'] + self.settings['loud_db']))
+        self.decisions.append(speech)
+
+    def segments(self):
+        self.flush()
+        if not self.decisions:
+            return []
+        speech = np.concatenate(self.decisions).astype(np.int8)
+        frame_s = self.frame_len / self.samplerate
+        edges = np.diff(np.concatenate([[0], speech, [0]]))
+        starts = np.flatnonzero(edges == 1) * frame_s
+        ends = np.flatnonzero(edges == -1) * frame_s
+
+        segments = []
+        for start, end in zip(starts, ends):
+            if segments and start - segments[-1][1] < self.settings['min_silence_s']:
+                segments[-1][1] = end
+            else:
+                segments.append([start, end])
+        duration = self.total_samples / self.samplerate
+        padding = self.settings['padding_s']
+        return [[round(max(0.0, start - padding), 3), round(min(duration, end + padding), 3)]
+                for start, end in segments if end - start >= self.settings['min_speech_s']]
+
+    def index(self):
+        segments = self.segments()
+        return {
+            'samplerate': self.samplerate,
+            'duration_s': round(self.total_samples / self.samplerate, 3),
+            'speech_s': round(sum(end - start for start, end in segments), 3),
+            'segments': segments,
+        }
+
+
+class BackgroundVAD:
+    # Runs a BlockVAD on its own thread so the audio callback only queues the block. The queue is
+    # unbounded: a dropped block would shift every later segment, and the analysis runs far
+    # faster than real time.
+    def __init__(self, samplerate, settings=None):
+        self.vad = BlockVAD(samplerate, settings)
+        self.queue = queue.Queue()
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="vad", daemon=True)
+        self.thread.start()
+
+    def feed(self, block):
+        self.queue.put_nowait(block)
+
+    def _run(self):
+        while True:
+            block = self.queue.get()
+            if block is None:
+                return
+            if self.error:
+                continue
+            try:
+                self.vad.feed(block)
+            except Exception as e:
+                self.error = e
+                logging.error(f"Speech detection failed: {e}")
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+
+    def index(self):
+        self.close()
+        if self.error:
+            raise RuntimeError(f"Speech detection failed: {self.error}")
+        return self.vad.index()
+
+
+def sidecar_path(audio_file):
+    return f"{os.path.splitext(audio_file)[0]}.speech.json"
+
+
+def write_speech_index(audio_file, index):
+    path = sidecar_path(audio_file)
+    with open(path, 'w') as f:
+        json.dump(index, f, indent=2)
+    logging.info(f"Speech index saved to: {path} ({len(index['segments'])} segments, {index['speech_s']}s of speech)")
+    return path
+
+
+def trim_silence(audio_file, index):
+    # Cuts the dead air before the first and after the last speech segment, without re-encoding
+    if not index['segments']:
+        logging.info(f"No speech found in {audio_file}, nothing to trim")
+        return None
+    start, end = index['segments'][0][0], index['segments'][-1][1]
+    base, extension = os.path.splitext(audio_file)
+    trimmed_file = f"{base}_trimmed{extension}"
+    command = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-ss", str(start), "-i", audio_file, "-t", str(round(end - start, 3)), "-c", "copy", trimmed_file]
+    subprocess.run(command, check=True)
+    logging.info(f"Trimmed recording saved to: {trimmed_file} ({start}s to {end}s of {index['duration_s']}s)")
+    return trimmed_file
+
+
+def analyze_file(audio_file, settings=None, block_seconds=10):
+    # Offline pass for existing recordings; decodes through ffmpeg so any codec we write works
+    samplerate = 16000
+    command = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", audio_file, "-f", "s16le", "-ac", "1", "-ar", str(samplerate), "pipe:1"]
+    vad = BlockVAD(samplerate, settings)
+    process = subprocess.Popen(command, stdout=subprocess.PIPE)
+    block_bytes = samplerate * block_seconds * 2
+    while True:
+        data = process.stdout.read(block_bytes)
+        if not data:
+            break
+        vad.feed(np.frombuffer(data[:len(data) - len(data) % 2], dtype=np.int16))
+    if process.wait() != 0:
+        raise RuntimeError(f"ffmpeg could not decode {audio_file}")
+    return vad.index()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Build speech-segment sidecars for existing recordings")
+    parser.add_argument("audio_files", nargs="+")
+    parser.add_argument("--trim", action="store_true", help="Also write a copy without leading and trailing silence")
+    args = parser.parse_args()
+
+    failed = False
+    for audio_file in args.audio_files:
+        try:
+            index = analyze_file(audio_file)
+            write_speech_index(audio_file, index)
+            if args.trim:
+                trim_silence(audio_file, index)
+        except Exception as e:
+            logging.error(f"Failed to analyze {audio_file}: {e}")
+            failed = True
+    sys.exit(1 if failed else 0)
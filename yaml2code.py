@@ -1,8 +1,26 @@
 import os
+import sys
+import json
+import hashlib
 import datetime
-import pyperclip
+import argparse
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import yaml
 
+EXCLUDE_EXTENSIONS = [".pyc", ".pyo", ".exe", ".dll", ".so", ".o", ".a", ".bin", ".dat", ".jpeg"]
+SNAPSHOT_NAME = ".yaml2code_snapshot.json"
+EXCLUDE_FILES = ["code2send_full.py", "code2text.txt", "code2send.py", "copy_to_clipboard.sh", "send2code.py", SNAPSHOT_NAME]
+EXCLUDE_PATTERNS = ["pack-"]
+EXCLUDE_CONTENT_PATTERNS = ["DIRC", "Q¨×6HÌ¦", "z÷ÈsxÚ", "lancedb", "ÿØÿà"]
+SKIPPED_DIRS = ["Fastly_Opportunities"]
+
+# Streaming mode only looks at the start of a file to decide whether it is binary
+HEADER_BYTES = 8192
+DEFAULT_MAX_FILE_KB = 512
+YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
 def get_user_excluded_dirs():
     dirs = [d for d in os.listdir('.') if os.path.isdir(d)]
     print("Available directories:")
@@ -21,13 +39,13 @@ def get_user_excluded_dirs():
 
 def process_directory(path, exclude_extensions=None, exclude_files=None, exclude_patterns=None, exclude_content_patterns=None, exclude_dirs=None):
     if exclude_extensions is None:
-        exclude_extensions = [".pyc", ".pyo", ".exe", ".dll", ".so", ".o", ".a", ".bin", ".dat", ".jpeg"]
+        exclude_extensions = EXCLUDE_EXTENSIONS
     if exclude_files is None:
-        exclude_files = ["code2send_full.py", "code2text.txt", "code2send.py", "copy_to_clipboard.sh", "send2code.py"]
+        exclude_files = EXCLUDE_FILES
     if exclude_patterns is None:
-        exclude_patterns = ["pack-"]
+        exclude_patterns = EXCLUDE_PATTERNS
     if exclude_content_patterns is None:
-        exclude_content_patterns = ["DIRC", "Q¨×6HÌ¦", "z÷ÈsxÚ", "lancedb", "ÿØÿà"]
+        exclude_content_patterns = EXCLUDE_CONTENT_PATTERNS
     if exclude_dirs is None:
         exclude_dirs = []
 
@@ -71,6 +89,223 @@ def process_directory(path, exclude_extensions=None, exclude_files=None, exclude
 
     return tree
 
+def is_excluded_name(filename):
+    return any(filename.endswith(ext) for ext in EXCLUDE_EXTENSIONS) or filename in EXCLUDE_FILES or any(pattern in filename for pattern in EXCLUDE_PATTERNS)
+
+def git_listed_files(path):
+    # Tracked plus untracked-but-not-ignored files, so .gitignore (and .git itself) is honoured
+    try:
+        result = subprocess.run(["git", "-C", path, "ls-files", "--cached", "--others", "--exclude-standard", "-z"], capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return [name for name in result.stdout.decode("utf-8", "surrogateescape").split("\0") if name]
+
+def walked_files(path):
+    files = []
+    for root, dirs, filenames in os.walk(path):
+        dirs[:] = [d for d in dirs if d != ".git"]
+        for filename in filenames:
+            files.append(os.path.relpath(os.path.join(root, filename), path))
+    return files
+
+def list_files(path, exclude_dirs=(), use_gitignore=True):
+    files = git_listed_files(path) if use_gitignore else None
+    if files is None:
+        if use_gitignore:
+            print(f"{path} is not a git checkout, .gitignore is not applied", file=sys.stderr)
+        files = walked_files(path)
+    skipped = set(exclude_dirs) | set(SKIPPED_DIRS)
+    selected = []
+    for relative_path in files:
+        parts = relative_path.split("/") if "/" in relative_path else relative_path.split(os.sep)
+        if skipped.intersection(parts[:-1]) or is_excluded_name(parts[-1]):
+            continue
+        # git lists files that are deleted in the working tree but not yet staged
+        if os.path.isfile(os.path.join(path, *parts)):
+            selected.append(parts)
+    return selected
+
+def ordered_entries(files):
+    # Same key order as yaml.dump of the nested dict: names sorted at every level, files and
+    # directories interleaved. Yields (depth, name, parts), with parts None for a directory.
+    tree = {}
+    for parts in files:
+        level = tree
+        for part in parts[:-1]:
+            level = level.setdefault(part, {})
+        level[parts[-1]] = parts
+
+    def walk(level, depth):
+        for name in sorted(level):
+            node = level[name]
+            if isinstance(node, dict):
+                yield depth, name, None
+                yield from walk(node, depth + 1)
+            else:
+                yield depth, name, node
+    return walk(tree, 0)
+
+def read_file(file_path, max_bytes):
+    # Returns the text to show, or None when the file should be left out entirely like the
+    # content patterns do in process_directory
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as file:
+        header = file.read(HEADER_BYTES)
+        if b"\0" in header:
+            return "[Binary file content not displayed]"
+        if any(pattern in header.decode("latin-1") for pattern in EXCLUDE_CONTENT_PATTERNS):
+            return None
+        if size > max_bytes:
+            return f"[File of {size // 1024} KB not displayed, larger than {max_bytes // 1024} KB]"
+        data = header + file.read()
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
+
+def yaml_key(name):
+    return yaml.dump({name: 0}, Dumper=YAML_DUMPER, allow_unicode=True)[:-len(": 0\n")]
+
+def render_file(path, depth, name, parts, max_bytes):
+    if "objects" in parts[:-1]:
+        content = "[Content not displayed for objects directory]"
+    else:
+        try:
+            content = read_file(os.path.join(path, *parts), max_bytes)
+        except OSError as e:
+            content = f"[File could not be read: {e.strerror}]"
+        if content is None:
+            return ""
+    text = yaml.dump({name: content}, Dumper=YAML_DUMPER, default_flow_style=False, allow_unicode=True)
+    indent = "  " * depth
+    return "".join(indent + line for line in text.splitlines(True)) if depth else text
+
+def stream_files(path, files, write, max_bytes, workers=8, depth=0):
+    # Files are read and rendered on a thread pool a bounded window ahead of the writer, and
+    # each chunk is written as soon as everything before it is out, so memory stays flat
+    entries = ordered_entries(files)
+    window = max(1, workers) * 4
+    pending = deque()
+    written = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        def drain(limit):
+            nonlocal written
+            while len(pending) > limit:
+                chunk = pending.popleft()
+                chunk = chunk if isinstance(chunk, str) else chunk.result()
+                if chunk:
+                    write(chunk)
+                    written += 1
+        for entry_depth, name, parts in entries:
+            if parts is None:
+                # Directory headers go out in order with the files around them
+                pending.append(f"{'  ' * (depth + entry_depth)}{yaml_key(name)}:\n")
+            else:
+                pending.append(executor.submit(render_file, path, depth + entry_depth, name, parts, max_bytes))
+            drain(window)
+        drain(0)
+    return written
+
+def stream_yaml(path, write, exclude_dirs=(), use_gitignore=True, max_file_kb=DEFAULT_MAX_FILE_KB, workers=8):
+    return stream_files(path, list_files(path, exclude_dirs, use_gitignore), write, max_file_kb * 1024, workers)
+
+def file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_snapshot(snapshot_path):
+    try:
+        with open(snapshot_path, "r", encoding="utf-8") as file:
+            return json.load(file)["files"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+def save_snapshot(snapshot_path, files):
+    temp_path = f"{snapshot_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump({"created": datetime.datetime.now().isoformat(timespec="seconds"), "files": files}, file)
+    os.replace(temp_path, snapshot_path)
+
+def diff_snapshot(path, files, previous, workers=8):
+    # A file whose size and mtime match the snapshot is taken as unchanged without opening it;
+    # anything else is hashed, so a file that was only touched still counts as unchanged
+    current = {}
+    to_hash = []
+    for parts in files:
+        key = "/".join(parts)
+        stat = os.stat(os.path.join(path, *parts))
+        entry = previous.get(key)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            current[key] = entry
+        else:
+            to_hash.append((key, parts, stat))
+
+    def hash_file(item):
+        try:
+            return file_sha256(os.path.join(path, *item[1]))
+        except OSError:
+            return None
+
+    added, changed = [], []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for (key, parts, stat), digest in zip(to_hash, executor.map(hash_file, to_hash)):
+            current[key] = [stat.st_size, stat.st_mtime_ns, digest]
+            if key not in previous:
+                added.append(parts)
+            elif digest is None or previous[key][2] != digest:
+                changed.append(parts)
+    removed = sorted(set(previous) - set(current))
+    return added, changed, removed, current
+
+def diff_yaml(path, write, snapshot_path, exclude_dirs=(), use_gitignore=True, max_file_kb=DEFAULT_MAX_FILE_KB, workers=8):
+    # Emits only what differs from the last snapshot and returns the new one; the caller saves
+    # it once the output has actually gone out
+    previous = load_snapshot(snapshot_path)
+    files = list_files(path, exclude_dirs, use_gitignore)
+    added, changed, removed, current = diff_snapshot(path, files, previous, workers)
+    for section, section_files in (("added", added), ("changed", changed)):
+        if section_files:
+            write(f"{section}:\n")
+            stream_files(path, section_files, write, max_file_kb * 1024, workers, depth=1)
+    if removed:
+        write(yaml.dump({"removed": removed}, Dumper=YAML_DUMPER, default_flow_style=False, allow_unicode=True))
+    return len(added), len(changed), len(removed), current
+
+def copy_to_clipboard(content):
+    import pyperclip
+    pyperclip.copy(content)
+
+def emit(args, produce):
+    if args.clipboard:
+        chunks = []
+        result = produce(chunks.append)
+        if chunks:
+            copy_to_clipboard("".join(chunks))
+            print("Content copied to clipboard", file=sys.stderr)
+        return result
+    try:
+        result = produce(sys.stdout.write)
+        sys.stdout.flush()
+        return result
+    except BrokenPipeError:
+        # Output piped into head or a pager that quit early
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+
+def stream_main(args):
+    # No interactive prompt here, it would end up in the YAML on stdout
+    exclude_dirs = args.exclude_dir or []
+    if args.diff:
+        snapshot_path = args.snapshot or os.path.join(args.path, SNAPSHOT_NAME)
+        added, changed, removed, current = emit(args, lambda write: diff_yaml(args.path, write, snapshot_path, exclude_dirs, not args.no_gitignore, args.max_file_kb, args.workers))
+        save_snapshot(snapshot_path, current)
+        print(f"{added} added, {changed} changed, {removed} removed since the last snapshot", file=sys.stderr)
+    else:
+        emit(args, lambda write: stream_yaml(args.path, write, exclude_dirs, not args.no_gitignore, args.max_file_kb, args.workers))
+
 def main():
     root_directory = "."  # Replace with the root directory of your project
     timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
@@ -87,7 +322,7 @@ def main():
     # Copying the content of the output file to the clipboard
     with open(output_file, "r", encoding="utf-8") as file:
         content = file.read()
-    pyperclip.copy(content)
+    copy_to_clipboard(content)
     print(f"Content copied to clipboard")
 
     # Deleting the output file after copying content to clipboard
@@ -96,4 +331,19 @@ def main():
         print(f"{output_file} has been deleted.")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Dump a source tree and its file contents as YAML")
+    parser.add_argument("--stream", action="store_true", help="Stream YAML to stdout as files are read instead of building it in memory")
+    parser.add_argument("--diff", action="store_true", help="Only emit files added, changed or removed since the last --diff run (implies --stream)")
+    parser.add_argument("--snapshot", help=f"Snapshot file for --diff (default: {SNAPSHOT_NAME} in --path)")
+    parser.add_argument("--clipboard", action="store_true", help="With --stream, copy the YAML to the clipboard instead of printing it")
+    parser.add_argument("--path", default=".", help="Root directory for --stream")
+    parser.add_argument("--exclude-dir", action="append", help="With --stream, a directory name to skip (repeatable)")
+    parser.add_argument("--no-gitignore", action="store_true", help="Include files that .gitignore excludes")
+    parser.add_argument("--max-file-kb", type=int, default=DEFAULT_MAX_FILE_KB, help="Larger files are listed with a placeholder instead of their content")
+    parser.add_argument("--workers", type=int, default=8, help="Threads reading files")
+    args = parser.parse_args()
+
+    if args.stream or args.diff:
+        stream_main(args)
+    else:
+        main()